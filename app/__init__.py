@@ -72,11 +72,53 @@ def create_app() -> Flask:
     app.engine = engine
     app.session = SessionLocal
 
-    # 4. Register your blueprints/routes
+    # 4. Load the reference CSVs (salaries, taxes, housing) once for every request
+    from .services.reference_data import ReferenceRegistry
+    app.reference_data = ReferenceRegistry(app.root_path)
+
+    # Identical simulation requests are served from cache; reloading the CSVs invalidates it
+    from .services.simulation_cache import SimulationCache
+    app.simulation_cache = SimulationCache(
+        max_entries=settings.SIMULATION_CACHE_SIZE,
+        ttl_seconds=settings.SIMULATION_CACHE_TTL,
+    )
+    app.reference_data.on_reload(app.simulation_cache.clear)
+
+    # Per-sample upstream results (salaries, taxes, housing) so slider changes to
+    # children / savings only redo the cash-flow stage; bounded by bytes as well as
+    # entries, since every entry holds num_samples-long vectors
+    app.simulation_stage_cache = SimulationCache(
+        max_entries=settings.SIMULATION_STAGE_CACHE_SIZE,
+        ttl_seconds=settings.SIMULATION_CACHE_TTL,
+        copy_values=False,
+        max_bytes=int(settings.SIMULATION_STAGE_CACHE_MB * 2**20),
+    )
+    app.reference_data.on_reload(app.simulation_stage_cache.clear)
+
+    # Precomputed /simulation/run results (built by app/scripts/build_simulation_grid.py), if any;
+    # a grid built from other CSVs is ignored, and reloading picks up a rebuilt one
+    from .services.simulation_grid import SimulationGrid
+    app.simulation_grid = SimulationGrid.load(app.root_path)
+    app.reference_data.on_reload(lambda _data: setattr(app, "simulation_grid", SimulationGrid.load(app.root_path)))
+
+    # Per-machine engine cost model for deadline_ms runs, calibrated now rather than on a request
+    from .services.cost_model import default_cost_model
+    reference = app.reference_data.data
+    default_cost_model(reference.tax_tables.for_state(None), reference.home_values)
+
+    # Long simulations run as background jobs (Celery if USE_CELERY, else a local thread pool)
+    from .workers.simulation_tasks import create_job_executor
+    app.simulation_jobs = create_job_executor(settings.USE_CELERY)
+
+    # Per-stage Server-Timing headers for the simulation routes (off unless SERVER_TIMING is set)
+    from .api.timing import init_server_timing
+    init_server_timing(app, settings.SERVER_TIMING)
+
+    # 5. Register your blueprints/routes
     from .api import register_blueprints
     register_blueprints(app)
 
-    # 5. Clean up sessions after each request
+    # 6. Clean up sessions after each request
     @app.teardown_appcontext
     def shutdown_session(exception=None):
         SessionLocal.remove()
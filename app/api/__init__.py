@@ -16,6 +16,7 @@ from .routes.courses import courses_bp
 from .routes.quiz_store import quiz_store_bp
 from .routes.scraping_events import scraping_events_bp
 from .routes.jobs import jobs_bp
+from .routes.portfolios import portfolios_bp
 # from .routes.advising import advising_bp
 
 def register_blueprints(app):
@@ -29,4 +30,5 @@ def register_blueprints(app):
     app.register_blueprint(scraping_events_bp, url_prefix="/api/v1")
     app.register_blueprint(jobs_bp, url_prefix="/api/v1")
     app.register_blueprint(quiz_store_bp, url_prefix="/api/v1")
+    app.register_blueprint(portfolios_bp, url_prefix="/api/v1")
     # register others as you implement them
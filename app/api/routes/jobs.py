@@ -1,6 +1,5 @@
 from flask import jsonify, Blueprint, current_app
 import pandas as pd
-import os
 
 jobs_bp = Blueprint('jobs', __name__)
 
@@ -31,7 +30,7 @@ CATEGORY_MAPPING = {
 @jobs_bp.route("/jobs/<category>", methods=["GET"])
 def get_jobs_by_category(category):
     """
-    Get all jobs for a specific career category from CSV.
+    Get all jobs for a specific career category from the salary table.
 
     Args:
         category: Career category (e.g., 'management', 'healthcare', 'math_computers')
@@ -49,28 +48,24 @@ def get_jobs_by_category(category):
                 "message": f"Category '{category}' not found"
             }), 400
 
-        # Load CSV file
-        csv_path = os.path.join(current_app.root_path, "salary_table.csv")
-        df = pd.read_csv(csv_path)
-
-        # Filter jobs by category
-        category_jobs = df[df['Category'] == csv_category]
+        # Look up the category in the reference tables loaded at startup
+        category_jobs = current_app.reference_data.data.careers_by_category.get(csv_category, [])
 
         # Convert to list of dicts
         jobs_list = []
-        for _, row in category_jobs.iterrows():
+        for job in category_jobs:
             # Skip rows with unknown or missing data
-            if pd.isna(row['Career_Title']) or row['Career_Title'] == 'Unknown Title':
+            if pd.isna(job.title) or job.title == 'Unknown Title':
                 continue
-            if pd.isna(row['Starting Salary']) or row['Starting Salary'] == 'Unknown start':
+            if job.starting_salary is None:
                 continue
 
             jobs_list.append({
-                "id": str(row['Career_ID']),
-                "title": row['Career_Title'],
-                "value": row['Career_Title'].lower().replace(" ", "_").replace(",", ""),
-                "starting_salary": int(row['Starting Salary']),
-                "growth_rate": float(row['Salary_growth_mean'])
+                "id": job.career_id,
+                "title": job.title,
+                "value": job.title.lower().replace(" ", "_").replace(",", ""),
+                "starting_salary": int(job.starting_salary),
+                "growth_rate": job.salary_growth_mean
             })
 
         # Always add "Other" option at the end
@@ -88,11 +83,6 @@ def get_jobs_by_category(category):
             "count": len(jobs_list) - 1  # Exclude "Other" from count
         }), 200
 
-    except FileNotFoundError:
-        return jsonify({
-            "error": "Data file not found",
-            "message": "salary_table.csv not found"
-        }), 500
     except Exception as e:
         return jsonify({
             "error": "Failed to fetch jobs",
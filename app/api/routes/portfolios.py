@@ -0,0 +1,109 @@
+from flask import Blueprint, jsonify, request, current_app
+from sqlalchemy import select
+from sqlalchemy.exc import SQLAlchemyError
+
+from app.models import FinStatements, User
+from app.api.routes.simulations import cached_simulate_core, get_params
+from app.api.timing import stage, stage_timings, timings_requested
+from app.services.monte_carlo import SimulationOptions, run_size
+from app.services.statement_projection import StatementArrays, project_statements, shift_summary
+
+portfolios_bp = Blueprint("portfolios", __name__)
+
+
+def load_statements(session, user_id: int) -> StatementArrays:
+    """All of a user's statement rows in one query, as column arrays."""
+    rows = session.execute(
+        select(
+            FinStatements.id,
+            FinStatements.name,
+            FinStatements.valuation,
+            FinStatements.growth,
+            FinStatements.term,
+            FinStatements.liab_status,
+        )
+        .where(FinStatements.user_id == user_id)
+        .order_by(FinStatements.id)
+    ).all()
+    return StatementArrays.from_rows(rows)
+
+
+@portfolios_bp.route("/portfolios/<int:user_id>/projection", methods=["POST"])
+def project_portfolio(user_id):
+    """
+    POST /api/v1/portfolios/<user_id>/projection
+
+    Projects the user's stored assets and liabilities (the statements table)
+    over the horizon and adds them to the salary Monte Carlo for the same
+    years. Expects the /simulation/run JSON body (career_id, location,
+    num_children, spending, years, num_samples, ...).
+
+    Returns the combined net worth distribution ("net_worth": final mean,
+    stdev and per-year percentile bands), the yearly statement totals and
+    every item's final value and annual payment, or 404 for an unknown user.
+    """
+    data = request.get_json() or {}
+
+    try:
+        with stage("params"):
+            years, num_samples = run_size(data)
+            params, tax_brackets, home_values = get_params(data)
+            options = SimulationOptions.from_request({**data, "percentiles": data.get("percentiles") or True})
+    except Exception as e:
+        return jsonify({"error": str(e)}), 400
+
+    try:
+        with stage("statements"):
+            if current_app.session.get(User, user_id) is None:
+                return jsonify({"error": "User does not exist"}), 404
+            statements = load_statements(current_app.session, user_id)
+    except SQLAlchemyError as exc:
+        current_app.session.rollback()
+        return jsonify({"error": "Database error", "detail": str(exc)}), 500
+
+    try:
+        with stage("project"):
+            projection = project_statements(statements, years)
+        with stage("simulate"):
+            summary = cached_simulate_core(
+                params=params,
+                tax_brackets=tax_brackets,
+                home_values=home_values,
+                num_samples=num_samples,
+                years=years,
+                options=options,
+            )
+    except Exception as e:
+        return jsonify({"error": str(e)}), 400
+
+    is_liability = statements.is_liability.tolist()
+    body = {
+        "user_id": user_id,
+        "years": years,
+        "net_worth": shift_summary(summary, projection["networth_shift"]),
+        "statements": {
+            name: [float(v) for v in projection[name]]
+            for name in ("assets", "liabilities", "payments", "cumulative_payments")
+        },
+        "items": [
+            {
+                "id": item_id,
+                "name": name,
+                "kind": "liability" if liability else "asset",
+                "final_value": final_value,
+                "annual_payment": annual_payment,
+            }
+            for item_id, name, liability, final_value, annual_payment in zip(
+                statements.ids.tolist(),
+                statements.names,
+                is_liability,
+                projection["final_values"].tolist(),
+                projection["annual_payments"].tolist(),
+            )
+        ],
+        "params": params,
+    }
+    if timings_requested(data):
+        body["timings"] = stage_timings()
+    with stage("serialize"):
+        return jsonify(body)
@@ -1,249 +1,267 @@
-from flask import Flask, request, jsonify, current_app, Blueprint
-from sqlalchemy.orm import Session
-from sqlalchemy import select
+from flask import Response, request, jsonify, current_app, Blueprint
 import numpy as np
 import pandas as pd
-import os
+import json
+
+from app.services.monte_carlo import (
+    BLOCK_SIZE,
+    DEFAULT_SEED,
+    STREAM_BLOCK_SIZE,
+    IncomePaths,
+    NetworthBase,
+    SimulationOptions,
+    fits_in_one_pass,
+    run_size,
+    samples_per_block,
+    simulate_deadline,
+    simulate_sharded,
+    simulate_adaptive,
+    simulate_bands,
+    simulate_networth_base,
+    simulate_networths,
+    stream_progress,
+    summarize_networths,
+    upstream_params,
+)
+# defined in this module before the engine moved; still importable from here
+from app.services.monte_carlo import get_home_payment  # noqa: F401
+from app.api.timing import stage, stage_timings, timings_requested
+from app.config import Settings
+from app.services.batch_simulation import MAX_BATCH_CONFIGS, get_process_pool, run_batch
+from app.services.cost_model import default_cost_model
+from app.services.goal_seek import GoalSpec, seek_goal
+from app.services.home_values import HomeValueTable
+from app.services.lifecycle import MAX_LIFECYCLE_PROFILES, project_profiles
+from app.services.networth_regression import fast_summary
+from app.services.param_resolver import ResolvedParams, default_resolver
+from app.services.reference_data import ReferenceData
+from app.services.sampling import ShockSampler
+from app.services.scenario_comparison import MAX_COMPARE_VARIANTS, SHARED_RUN_FIELDS, compare_scenarios
+from app.services.simulation_cache import make_cache_key
+from app.services.tax_tables import NATIONAL_STATE, TaxBrackets, TaxTables
+
 simulation_bp = Blueprint('simulation', __name__)
 
 #from .schema import UserInfo, Asset, Liability
 
+def get_reference_data() -> ReferenceData:
+    """Reference tables loaded once by create_app()."""
+    return current_app.reference_data.data
+
 def get_tax_value(locations_df, state, salary):
-    if (state == None):
-        state_name = "United States overall"
-    else:
-        state_name = state
-
-    # obtains the tax brackets for the users location and gets rid of any brakets which the user does not quaify for
-    brackets = locations_df[locations_df["State"] == state_name].copy()
-    brackets["Income range"] = pd.to_numeric(brackets["Income range"], errors="coerce")
-    eligible_brackets = brackets[brackets["Income range"] <= salary]
-    
-    total_tax = 0
-    remaining_salary = salary
-    # starting at the highest bracket eligible, goes through all of the brackets compounding the correct tax on the taxable income in that bracket
-    for i in reversed(range(len(eligible_brackets))):
-        lower_bound = eligible_brackets.iloc[i]["Income range"]
-        rate = eligible_brackets.iloc[i]["tax rate"]
-        if (remaining_salary > lower_bound):
-            taxable_amount = remaining_salary - lower_bound
-            total_tax += taxable_amount * rate
-            remaining_salary = lower_bound
-    return total_tax
-
-# gets a yearly home payment based on the principal 
-def get_home_payment(principal):
-    term_years = 30
-    annual_rate = 0.05
-    yearly_payment_num = annual_rate * ((1 + annual_rate) ** term_years)
-    yearly_payment_denom = ((1 + annual_rate) ** term_years) - 1
-    yearly_payment = principal * (yearly_payment_num / yearly_payment_denom)
-    return yearly_payment
-
-def get_params(data):
-     # Extracting all the data from the csv.
-    # data will be in the following form: 
+    # compiles the brackets for the users location only and applies them progressively to the salary
+    state_name = NATIONAL_STATE if state is None else state
+    brackets = locations_df[locations_df["State"] == state_name]
+    return TaxTables.from_locations_df(brackets).tax(state, salary)
+
+def get_params(data, reference: ReferenceData = None):
+    # Resolves the request into the engine's params dict.
+    # data will be in the following form:
     # {
-    #     "job_id" : career_id              (if id data is not sent, then there would be a category and job field)
+    #     "career_id" : career_id
     #     "location" : location,
     #     "num_children" : num_children
     #     "spending" : eager/conservative
+    #     "years" : years                   (optional, echoed back in params)
     # }
+    # Lookups and tax math are memoized per career/location/children/spending.
+    if reference is None:
+        reference = get_reference_data()
 
-    # extracting input fields
-    career_id = data.get("career_id")
-    location = data.get("location")
-    num_children = data.get("num_children")
-    spending_type = data.get("spending")
-    years = data.get("years")
-
-    # defining paths to the parameter tables
-    salaries_path = os.path.join(current_app.root_path, "salary_table.csv")
-    home_and_child_path = os.path.join(current_app.root_path, "State-Specific Home Data & Child Data - Sheet1.csv")
-    home_and_rental_path = os.path.join(current_app.root_path, "Home Value & Rent Value Table - Sheet1.csv")
-    locations_path = os.path.join(current_app.root_path, "locations_table.csv")
-
-    # reading data from the csvs 
-    salary_table = pd.read_csv(salaries_path)
-    locations_table = pd.read_csv(locations_path)
-    home_and_rental_table = pd.read_csv(home_and_rental_path)
-    home_and_child_table = pd.read_csv(home_and_child_path)
-
-    # extracting relevant salary information
-    salary_row = salary_table[salary_table["Career_ID"] == career_id] # extracts the row with the matching career_id
-    if salary_row.empty:
-        raise ValueError(f"Unknown career_id: {career_id}")
-    starting_salary = float(salary_row["Starting Salary"].iloc[0])
-    salary_mu = float(salary_row["Salary_growth_mean"].iloc[0])
-    salary_sigma = float(salary_row["salary_growth_sd"] .iloc[0])
-    job_name = salary_row["Career_Title"].iloc[0]
-
-    # extracting relavant location information and adjusts the starting salary based on location
-    locations_df = locations_table[locations_table["State"] == location]
-    starting_salary *= float(locations_df["inc-nat ratio"].iloc[0])
-    home_and_child_df = home_and_child_table[home_and_child_table["State"] == location]
-    home_growth_rate = float(home_and_child_df["Average Home Growth Rate"].iloc[0]) / 100
-    salary_to_buy_house = float(home_and_child_df["Salary Needed to Buy a House"].iloc[0])
-    annual_child_cost = float(home_and_child_df["Cost of Raising Child"].iloc[0])
-
-    # extracting tax rates
-    effective_tax_rate_100k = float(locations_df["eff_tax_rate_100k"].iloc[0])
-    effective_tax_rate_starting = (get_tax_value(locations_df, location, starting_salary)) / starting_salary
-
-    if (spending_type == "eager"): 
-        savings_rate = 0.2
-        hv_to_salary_rat = 3
-
-    else:
-        savings_rate = 0.3
-        hv_to_salary_rat = 2
-
-    params = {
-                "starting_salary": starting_salary, # slider
-                "salary_growth_mean" : salary_mu,
-                "salary_growth_sd" : salary_sigma, 
-
-                "rent_pc_baseline" : 0.3,
-                "salary_to_buy_house": salary_to_buy_house,
-                "hv_to_salary_ratio" : hv_to_salary_rat,    # slider
-                "home_growth_rate": home_growth_rate,
-
-                "savings_rate" : savings_rate,      # slider
-
-                "num_children" : num_children,       # slider
-                "annual_child_cost" : annual_child_cost,
-
-                "effective_tax_rate_100k" : effective_tax_rate_100k,
-                "effective_tax_rate_starting" : effective_tax_rate_starting,
-                                # 🔹 these two are what run_simulation expects but your dict is missing
-                "location": location,
-                "spending_type": spending_type,
-
-                "years" : years,
-                "job_name" : job_name
-    
-            }
-    return params, locations_df, home_and_rental_table
+    resolved = default_resolver.resolve_request(data, reference)
+    params = resolved.as_dict(years=data.get("years"))
+    return params, reference.tax_tables.for_state(resolved.location), reference.home_values
 
 
 def simulate_core(
     params: dict,
-    locations_df: pd.DataFrame,
-    home_and_rental_table: pd.DataFrame,
+    tax_brackets: TaxBrackets,
+    home_values: HomeValueTable,
     num_samples: int = 100,
     years: int = 20,
+    options: SimulationOptions = None,
+    memory_limit_mb: float = None,
+    pool=None,
 ) -> dict:
     """
     Pure Python core simulation (no Flask / jsonify).
-    Returns {"mean": float, "stdev": float}.
-    """
-
-    rng = np.random.default_rng(seed=42)
-
-    starting_salary = params["starting_salary"]
-    salary_mu = params["salary_growth_mean"]
-    salary_sigma = params["salary_growth_sd"]
-
-    home_growth_rate = params["home_growth_rate"]
-    salary_to_buy_house = params["salary_to_buy_house"]
-    annual_child_cost = params["annual_child_cost"]
-    savings_rate = params["savings_rate"]  # not heavily used yet but good to carry
-    num_children = params["num_children"]
-
-    location = params["location"]
-    spending_type = params["spending_type"]
-
-    networths = []
-
-    for _ in range(num_samples):
-        local_salary = starting_salary
-        total_cash = 0.0
-
-        bought_a_house = False
-        home_value = 0.0
-        principal = 0.0
-        annual_payment = 0.0
-        mortgage_balance = 0.0
-
-
-        for _year in range(years):
-            # salary evolution
-            growth = rng.normal(salary_mu, salary_sigma)
-            local_salary *= (1.0 + growth)
-
-            # housing logic
-            if not bought_a_house:
-                if local_salary < salary_to_buy_house:
-                    rent_or_mortgage_payment = 0.3 * local_salary
-                else:
-                    rounded_salary = round(local_salary / 20_000) * 20_000
-
-                    home_and_rent_df = home_and_rental_table[
-                        home_and_rental_table["Starting Salary"] == rounded_salary
-                    ]
+    Runs on the vectorized engine in app/services/monte_carlo.py.
+    Returns {"mean": float, "stdev": float}. With options it can also return
+    per-year percentile bands, or pick the sample count adaptively
+    (num_samples is then ignored in favour of options.max_samples).
 
-                    if home_and_rent_df.empty:
-                        home_and_rent_df = home_and_rental_table.iloc[[0]]
+    Path matrices never exceed memory_limit_mb (SIMULATION_MEMORY_LIMIT_MB by
+    default): runs that would are split into blocks whose statistics are
+    merged exactly, so they return the same summary as one big pass.
 
-                    if spending_type == "eager":
-                        hv_col = "Home Value (3x) (eager spending)"
-                    else:
-                        hv_col = "Home Value (2.5x) (conservative spending)"
+    With options.shards > 1 the samples are split into independently seeded
+    shards (see simulate_sharded), run on `pool` when one is given.
 
-                    home_value = float(home_and_rent_df[hv_col].iloc[0])
-
-                    principal = 0.91 * home_value
-                    down_payment = 0.09 * home_value
-
-                    annual_payment = get_home_payment(principal)
-                    mortgage_balance = principal
-
-                    bought_a_house = True
-                    rent_or_mortgage_payment = down_payment
-            else:
-                home_value *= (1.0 + home_growth_rate)
-
-                if mortgage_balance > 0:
-                    annual_rate = 0.05
-                    interest = mortgage_balance * annual_rate
-                    principal_paid = annual_payment - interest
+    With options.deadline_ms the sample count is fitted to the latency budget
+    (num_samples is then ignored, options.max_samples caps it) and the summary
+    reports samples_used and standard_error.
+    """
 
-                    if principal_paid > mortgage_balance:
-                        principal_paid = mortgage_balance
-                        effective_payment = interest + principal_paid
-                    else:
-                        effective_payment = annual_payment
+    rng = np.random.default_rng(seed=DEFAULT_SEED)
+    options = options or SimulationOptions()
+    if memory_limit_mb is None:
+        memory_limit_mb = Settings().SIMULATION_MEMORY_LIMIT_MB
 
-                    mortgage_balance -= principal_paid
-                    rent_or_mortgage_payment = effective_payment
-                else:
-                    rent_or_mortgage_payment = 0.0
+    if options.deadline_ms is not None:
+        return simulate_deadline(
+            params,
+            tax_brackets,
+            home_values,
+            years=years,
+            rng=rng,
+            deadline_ms=options.deadline_ms,
+            cost_model=default_cost_model(tax_brackets, home_values),
+            max_samples=options.max_samples,
+            rel_tol=options.rel_tol,
+            percentiles=options.percentiles,
+            sampling=options.sampling,
+            block_size=samples_per_block(years, memory_limit_mb, options.precision),
+            precision=options.precision,
+        )
 
-            tax_payment = get_tax_value(locations_df, location, local_salary)
-            after_tax_income = local_salary - tax_payment
+    if options.shards > 1:
+        return simulate_sharded(
+            params,
+            tax_brackets,
+            home_values,
+            num_samples=num_samples,
+            years=years,
+            shards=options.shards,
+            block_size=samples_per_block(years, memory_limit_mb, options.precision, BLOCK_SIZE),
+            percentiles=options.percentiles,
+            sampling=options.sampling,
+            precision=options.precision,
+            pool=pool,
+        )
 
-            if spending_type == "eager":
-                yearly_spending = 0.5 * after_tax_income
-            else:
-                yearly_spending = 0.4 * after_tax_income
+    if options.adaptive:
+        return simulate_adaptive(
+            params,
+            tax_brackets,
+            home_values,
+            years=years,
+            rng=rng,
+            rel_tol=options.rel_tol,
+            max_samples=options.max_samples,
+            percentiles=options.percentiles,
+            sampling=options.sampling,
+            block_size=samples_per_block(years, memory_limit_mb, options.precision, BLOCK_SIZE),
+            precision=options.precision,
+        )
 
-            child_cost_total = annual_child_cost * num_children
+    if options.percentiles or not fits_in_one_pass(num_samples, years, options, memory_limit_mb):
+        # oversized plain runs go through the largest blocks that fit
+        block_size = samples_per_block(
+            years, memory_limit_mb, options.precision, BLOCK_SIZE if options.percentiles else None
+        )
+        return simulate_bands(
+            params,
+            tax_brackets,
+            home_values,
+            num_samples=num_samples,
+            years=years,
+            rng=rng,
+            percentiles=options.percentiles,
+            block_size=block_size,
+            sampling=options.sampling,
+            precision=options.precision,
+        )
 
-            cash_this_year = (
-                after_tax_income
-                - rent_or_mortgage_payment
-                - yearly_spending
-                - child_cost_total
+    networths = simulate_networths(
+        params,
+        tax_brackets,
+        home_values,
+        num_samples=num_samples,
+        years=years,
+        shocks=ShockSampler(rng, years, options.sampling).draw(num_samples),
+    )
+    return summarize_networths(networths)
+
+def cached_simulate_core(
+    params: dict,
+    tax_brackets: TaxBrackets,
+    home_values: HomeValueTable,
+    num_samples: int = 100,
+    years: int = 20,
+    options: SimulationOptions = None,
+) -> dict:
+    """
+    simulate_core behind the app's result cache. The engine is deterministic
+    (fixed seed), so the summary only depends on the params, num_samples,
+    years, options and engine version that make up the key. Sharded runs
+    are spread over the app's process pool.
+    """
+    options = options or SimulationOptions()
+    if options.deadline_ms is not None:
+        # how many samples fit depends on the machine and its load: never cached
+        return simulate_core(params, tax_brackets, home_values, num_samples=num_samples, years=years, options=options)
+    key = make_cache_key(params, num_samples=num_samples, years=years, **options.cache_fields())
+
+    def compute():
+        if options.shards > 1:
+            return simulate_core(
+                params, tax_brackets, home_values, num_samples=num_samples, years=years, options=options,
+                pool=get_process_pool(Settings().SIMULATION_POOL_WORKERS),
             )
-            total_cash += cash_this_year
+        # large runs skip the stage cache, which would hold their per-sample vectors
+        if options.adaptive or options.percentiles or not fits_in_one_pass(
+            num_samples, years, options, Settings().SIMULATION_MEMORY_LIMIT_MB
+        ):
+            return simulate_core(
+                params, tax_brackets, home_values, num_samples=num_samples, years=years, options=options
+            )
+        return incremental_simulate_core(params, tax_brackets, home_values, num_samples, years, options)
 
-        local_networth = total_cash + home_value - mortgage_balance
-        networths.append(local_networth)
+    return current_app.simulation_cache.get_or_compute(key, compute)
 
-    mean_networth = float(np.mean(networths))
-    stdev_networth = float(np.std(networths))
+def incremental_simulate_core(
+    params: dict,
+    tax_brackets: TaxBrackets,
+    home_values: HomeValueTable,
+    num_samples: int,
+    years: int,
+    options: SimulationOptions,
+) -> dict:
+    """
+    Plain {"mean", "stdev"} summary that reuses the salary, tax and housing
+    stages cached for any earlier run whose params differed only in
+    DOWNSTREAM_PARAMS (children, savings rate, ...). Slider drags on those
+    only redo the cash-flow stage, an O(num_samples) step.
+    """
+    base = cached_networth_base(params, tax_brackets, home_values, num_samples, years, options.sampling)
+    return summarize_networths(base.networths(params))
+
+def cached_networth_base(
+    params: dict,
+    tax_brackets: TaxBrackets,
+    home_values: HomeValueTable,
+    num_samples: int,
+    years: int,
+    sampling: str,
+) -> NetworthBase:
+    """The NetworthBase for params' upstream stages, from the app's stage cache."""
+    key = make_cache_key(
+        upstream_params(params), num_samples=num_samples, years=years,
+        stage="networth_base", sampling=sampling,
+    )
+
+    def compute_base():
+        rng = np.random.default_rng(seed=DEFAULT_SEED)
+        return simulate_networth_base(
+            params,
+            tax_brackets,
+            home_values,
+            num_samples=num_samples,
+            years=years,
+            shocks=ShockSampler(rng, years, sampling).draw(num_samples),
+        )
 
-    return {"mean": mean_networth, "stdev": stdev_networth}
+    return current_app.simulation_stage_cache.get_or_compute(key, compute_base)
 
 @simulation_bp.route("/simulation/run", methods=["POST"])
 def simulation_run():
@@ -258,70 +276,443 @@ def simulation_run():
       "spending": "eager" | "conservative",
       "years": <int>  # optional, defaults to 20, 
       "num_samples": <int>  # optional, defaults to 100
+      "percentiles": true | [<float>, ...]  # optional, per-year bands (default p5/p25/p50/p75/p95)
+      "rel_tol": <float>  # optional, adaptive mode: stop once stderr / |mean| <= rel_tol
+      "max_samples": <int>  # optional, adaptive mode cap, defaults to 20000
+      "sampling": "pseudo" | "antithetic" | "qmc"  # optional, variance reduction, defaults to pseudo
+      "precision": "float64" | "float32"  # optional, float32 halves path memory for very large runs
+      "shards": <int>  # optional, split the samples into 1-64 seeded shards run across cores
+      "deadline_ms": <float>  # optional, simulate as many samples (up to max_samples) as fit in this budget
     }
     """
     data = request.get_json() or {}
-    years = int(data.get("years", 20))
 
     try:
-        params, locations_df, home_and_rental_table = get_params(data)
-        summary = simulate_core(params=params,
-            locations_df=locations_df,
-            home_and_rental_table=home_and_rental_table,
-            num_samples=int(data.get("num_samples", 100)),   # lighter for UI; adjust if you want
-            years=years,
-        )
+        with stage("params"):
+            years, num_samples = run_size(data)
+            params, tax_brackets, home_values = get_params(data)
+            options = SimulationOptions.from_request(data)
+
+        # on-grid requests are a single lookup into the precomputed grid
+        grid = current_app.simulation_grid
+        summary = None
+        if grid is not None:
+            with stage("grid"):
+                summary = grid.lookup(get_reference_data(), params, num_samples, years, options)
+        if summary is None:
+            with stage("simulate"):
+                summary = cached_simulate_core(params=params,
+                    tax_brackets=tax_brackets,
+                    home_values=home_values,
+                    num_samples=num_samples,
+                    years=years,
+                    options=options,
+                )
 
         # for debugging, you can also return params if you want to see what was used
-        return jsonify(
-            {
-                "summary": summary,
-                "years": years,
-                "params": params
-            }
-        )
+        body = {
+            "summary": summary,
+            "years": years,
+            "params": params
+        }
+        if timings_requested(data):
+            body["timings"] = stage_timings()
+        with stage("serialize"):
+            return jsonify(body)
     except Exception as e:
         # basic error reporting for now
         return jsonify({"error": str(e)}), 400
 
+def _sse(event: str, body: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(body)}\n\n"
+
+@simulation_bp.route("/simulation/run/stream", methods=["POST"])
+def simulation_run_stream():
+    """
+    POST /api/v1/simulation/run/stream
+
+    Same JSON body as /simulation/run, answered as Server-Sent Events:
+    a "progress" event ({"mean", "stdev", "samples_done", "samples_total"})
+    after every block of samples, then one "result" event with the
+    /simulation/run response body (or an "error" event), which is also
+    cached for /simulation/run. Closing the connection stops the
+    simulation at the next block.
+    """
+    data = request.get_json() or {}
+
+    try:
+        years, num_samples = run_size(data)
+        params, tax_brackets, home_values = get_params(data)
+        options = SimulationOptions.from_request(data)
+        if options.shards > 1 or options.deadline_ms is not None:
+            raise ValueError("shards and deadline_ms are not supported when streaming")
+    except Exception as e:
+        return jsonify({"error": str(e)}), 400
+
+    # same key as cached_simulate_core: a finished stream serves later /simulation/run calls
+    key = make_cache_key(params, num_samples=num_samples, years=years, **options.cache_fields())
+    cache = current_app.simulation_cache  # the generator runs outside the app context
+    cached = cache.get(key)
+
+    def events():
+        if cached is not None:
+            yield _sse("result", {"summary": cached, "years": years, "params": params})
+            return
+        rng = np.random.default_rng(seed=DEFAULT_SEED)
+        try:
+            # the generator is closed when the client goes away, which stops stream_progress too
+            for event, body in stream_progress(
+                params, tax_brackets, home_values, num_samples, years, rng, options,
+                block_size=samples_per_block(
+                    years, Settings().SIMULATION_MEMORY_LIMIT_MB, options.precision, STREAM_BLOCK_SIZE
+                ),
+            ):
+                if event == "result":
+                    cache.put(key, body)
+                    body = {"summary": body, "years": years, "params": params}
+                yield _sse(event, body)
+        except Exception as e:
+            yield _sse("error", {"error": str(e)})
+
+    return Response(
+        events(),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
 @simulation_bp.route("/simulation/sliders", methods=["POST"])
 def run_simulation_sliders():
 
     data = request.get_json() or {}
 
     location = data.get("location")
-    years = int(data.get("years", 20))  # Default to 20 if not provided
 
     # Debug logging
-    print(f"Slider request - location: {location}, years: {years}")
+    print(f"Slider request - location: {location}, years: {data.get('years')}")
     print(f"Full params: {data}")
 
-    salaries_path = os.path.join(current_app.root_path, "salary_table.csv")
-    home_and_rental_path = os.path.join(current_app.root_path, "Home Value & Rent Value Table - Sheet1.csv")
-    locations_path = os.path.join(current_app.root_path, "locations_table.csv")
+    reference = get_reference_data()
+
+    try:
+        # the client sends back a resolved params dict with slider values changed
+        with stage("params"):
+            try:
+                years, num_samples = run_size(data)  # years defaults to 20, num_samples to 100
+                params = ResolvedParams.from_dict(data, reference).as_dict(years=years)
+                options = SimulationOptions.from_request(data)
+            except ValueError as e:
+                return jsonify({"error": str(e)}), 400
+            tax_brackets = reference.tax_tables.for_state(params["location"])
+
+        # mode=fast: answer from the surrogate model when the params are inside its
+        # training envelope, otherwise fall through to the full simulation. The
+        # surrogate only predicts a plain run's mean and stdev, so any option
+        # (bands, sampling, precision, ...) takes the full simulation as well
+        summary = None
+        if data.get("mode") == "fast" and options == SimulationOptions():
+            with stage("surrogate"):
+                summary = fast_summary(params, tax_brackets, years)
+        source = "surrogate" if summary is not None else "monte_carlo"
+        if summary is None:
+            with stage("simulate"):
+                summary = cached_simulate_core(params=params,
+                    tax_brackets=tax_brackets,
+                    home_values=reference.home_values,
+                    num_samples=num_samples,
+                    years=years,
+                    options=options,
+                )
+        body = {
+            "summary": summary,
+            "years": years,
+            "params": params,
+            "source": source,
+        }
+        if timings_requested(data):
+            body["timings"] = stage_timings()
+        with stage("serialize"):
+            return jsonify(body)
+    except Exception as e:
+        print(f"Error in slider simulation: {str(e)}")
+        return jsonify({"error": str(e)}), 500
+    
 
-    # reading data from the csvs
-    locations_table = pd.read_csv(locations_path)
-    home_and_rental_table = pd.read_csv(home_and_rental_path)
-    locations_df = locations_table[locations_table["State"] == location]
+   
+
+@simulation_bp.route("/simulation/batch", methods=["POST"])
+def simulation_batch():
+    """
+    POST /api/v1/simulation/batch
+
+    Expects JSON:
+    {
+      "configs": [ <same body as /simulation/run>, ... ],
+      "parallel": <bool>  # optional, spread the work across a process pool
+    }
+
+    Configs may set sampling, percentiles and precision; rel_tol, shards
+    and deadline_ms are reported as that config's error.
+
+    Returns {"results": [...]} in input order; each entry is either the
+    /simulation/run body or {"error": <str>} for that config.
+    """
+    data = request.get_json() or {}
+    configs = data.get("configs")
+
+    if not isinstance(configs, list) or not configs:
+        return jsonify({"error": "configs must be a non-empty list"}), 400
+    if len(configs) > MAX_BATCH_CONFIGS:
+        return jsonify({"error": f"At most {MAX_BATCH_CONFIGS} configs per batch"}), 400
+
+    pool = None
+    pool_workers = Settings().SIMULATION_POOL_WORKERS
+    if data.get("parallel"):
+        pool = get_process_pool(pool_workers)
+
+    results = run_batch(
+        configs,
+        get_reference_data(),
+        get_params,
+        cache=current_app.simulation_cache,
+        pool=pool,
+        pool_workers=pool_workers,
+        memory_limit_mb=Settings().SIMULATION_MEMORY_LIMIT_MB,
+    )
+    return jsonify({"results": results, "count": len(results)})
+
+@simulation_bp.route("/simulation/compare", methods=["POST"])
+def simulation_compare():
+    """
+    POST /api/v1/simulation/compare
+
+    Expects JSON:
+    {
+      "base": { <same body as /simulation/run> },
+      "variants": [ {"label": <str>, <fields of base to override>}, ... ],
+      "years": <int>  # optional, defaults to 20 (shared by all scenarios)
+      "num_samples": <int>  # optional, defaults to 100 (shared)
+      "sampling": "pseudo" | "antithetic" | "qmc"  # optional (shared)
+    }
+
+    All scenarios run in one pass over the same salary draws, so variants
+    may not set years, num_samples, sampling or percentiles (400). Returns
+    the base and per-variant summaries plus, for every variant, the paired
+    difference variant - base with its standard error.
+    """
+    data = request.get_json() or {}
+    base = data.get("base")
+    variants = data.get("variants")
+
+    if not isinstance(base, dict):
+        return jsonify({"error": "base must be an object"}), 400
+    if not isinstance(variants, list) or not variants or not all(isinstance(v, dict) for v in variants):
+        return jsonify({"error": "variants must be a non-empty list of objects"}), 400
+    if len(variants) > MAX_COMPARE_VARIANTS:
+        return jsonify({"error": f"At most {MAX_COMPARE_VARIANTS} variants per comparison"}), 400
+    for i, variant in enumerate(variants, 1):
+        shared = [field for field in SHARED_RUN_FIELDS if field in variant]
+        if shared:
+            return jsonify(
+                {"error": f"variant {i} sets {', '.join(shared)}; these are shared by every scenario, set them on base"}
+            ), 400
 
     try:
-        summary = simulate_core(params=data,
-                locations_df=locations_df,
-                home_and_rental_table=home_and_rental_table,
-                num_samples=100,   # lighter for UI; adjust if you want
+        years, num_samples = run_size(data, base.get("years", 20), base.get("num_samples", 100))
+        sampling = SimulationOptions.from_request({**base, **data}).sampling
+
+        configs = [base] + [{**base, **variant} for variant in variants]
+        labels = ["base"] + [str(v.get("label") or f"variant_{i}") for i, v in enumerate(variants, 1)]
+        with stage("params"):
+            resolved = [get_params(config) for config in configs]
+        params_list = [params for params, _, _ in resolved]
+
+        with stage("simulate"):
+            comparison = compare_scenarios(
+                params_list,
+                [tax_brackets for _, tax_brackets, _ in resolved],
+                resolved[0][2],
+                num_samples=num_samples,
                 years=years,
+                sampling=sampling,
+                memory_limit_mb=Settings().SIMULATION_MEMORY_LIMIT_MB,
             )
-        return jsonify(
-                {
-                    "summary": summary,
-                    "years": years,
-                    "params": data
-                }
+    except Exception as e:
+        return jsonify({"error": str(e)}), 400
+
+    scenarios = [
+        {"label": label, "summary": summary, "params": params}
+        for label, summary, params in zip(labels, comparison["summaries"], params_list)
+    ]
+    for scenario, difference in zip(scenarios[1:], comparison["differences"]):
+        scenario["difference"] = difference
+
+    body = {"base": scenarios[0], "variants": scenarios[1:], "years": years, "num_samples": num_samples}
+    if timings_requested(data):
+        body["timings"] = stage_timings()
+    with stage("serialize"):
+        return jsonify(body)
+
+@simulation_bp.route("/simulation/goal", methods=["POST"])
+def simulation_goal():
+    """
+    POST /api/v1/simulation/goal
+
+    Expects JSON: the /simulation/run body (or "params": a resolved params
+    dict as sent to /simulation/sliders) plus
+    {
+      "solve": {
+        "parameter": "savings_rate" | "salary_to_buy_house" | "years" | "num_children",
+        "metric": "mean" | "median" | "p<percentile>"  # optional, final net worth, defaults to median
+        "target": <float>,
+        "bounds": [<low>, <high>]  # optional, the range searched
+        "tolerance": <float>  # optional, continuous parameters only
+      }
+    }
+
+    Finds the smallest savings rate or number of years, or the largest
+    number of children or house purchase threshold, whose metric reaches
+    the target in one request. A years answer is checked with runs of
+    exactly that horizon (and the one below), so /simulation/run at the
+    answer reproduces the reported metric. Every step
+    reuses the same draws and cached stages. Returns the value (null when
+    nothing in bounds reaches the target), the metric it achieves and the
+    trace of [value, metric] pairs evaluated.
+    """
+    data = request.get_json() or {}
+
+    try:
+        with stage("params"):
+            years, num_samples = run_size(data)
+            if isinstance(data.get("params"), dict):
+                reference = get_reference_data()
+                params = ResolvedParams.from_dict(data["params"], reference).as_dict(years=years)
+                tax_brackets = reference.tax_tables.for_state(params["location"])
+                home_values = reference.home_values
+            else:
+                params, tax_brackets, home_values = get_params(data)
+            options = SimulationOptions.from_request(data)
+            spec = GoalSpec.from_request(data.get("solve"), params)
+
+        # years are solved from one run as long as the upper bound
+        horizon = spec.bounds[1] if spec.parameter == "years" else years
+        if not fits_in_one_pass(num_samples, horizon, SimulationOptions(), Settings().SIMULATION_MEMORY_LIMIT_MB):
+            raise ValueError("num_samples x years is too large to solve for in one pass")
+
+        with stage("simulate"):
+            if spec.parameter in ("savings_rate", "num_children"):
+                base = cached_networth_base(params, tax_brackets, home_values, num_samples, years, options.sampling)
+                result = seek_goal(spec, params, home_values, networth_base=base)
+            else:
+                rng = np.random.default_rng(seed=DEFAULT_SEED)
+                shocks = ShockSampler(rng, horizon, options.sampling).draw(num_samples)
+                income_paths = IncomePaths.from_params(params, tax_brackets, shocks)
+
+                def run_horizon(years):
+                    # the draws simulate_core makes for a run of exactly `years`
+                    rng = np.random.default_rng(seed=DEFAULT_SEED)
+                    shocks = ShockSampler(rng, years, options.sampling).draw(num_samples)
+                    return simulate_networths(params, tax_brackets, home_values, num_samples, years, shocks=shocks)
+
+                result = seek_goal(spec, params, home_values, income_paths=income_paths, run_horizon=run_horizon)
+    except Exception as e:
+        return jsonify({"error": str(e)}), 400
+
+    body = {"result": result, "years": years, "num_samples": num_samples, "params": params}
+    if timings_requested(data):
+        body["timings"] = stage_timings()
+    with stage("serialize"):
+        return jsonify(body)
+
+@simulation_bp.route("/simulation/lifecycle", methods=["POST"])
+def simulation_lifecycle():
+    """
+    POST /api/v1/simulation/lifecycle
+
+    Projects extended profiles (401k/IRA/taxable balances, loans_json,
+    mortgage, children_years, ...; see app/services/lifecycle.py) from
+    current_age to retire_age. Either JSON:
+    {
+      "profiles": [ {<profile CSV columns>}, ... ],
+      "num_samples": <int>  # optional, defaults to 1000
+    }
+    or a multipart upload of a profile CSV as "file" (num_samples as a form field).
+
+    Returns {"results": [...]} in input order; invalid profiles come back as
+    {"profile_id", "error"}.
+    """
+    try:
+        if "file" in request.files:
+            records = pd.read_csv(request.files["file"], dtype={"profile_id": str}).to_dict("records")
+            num_samples = int(request.form.get("num_samples", 1000))
+        else:
+            data = request.get_json() or {}
+            records = data.get("profiles")
+            num_samples = int(data.get("num_samples", 1000))
+    except Exception as e:
+        return jsonify({"error": str(e)}), 400
+
+    if not isinstance(records, list) or not records:
+        return jsonify({"error": "profiles must be a non-empty list"}), 400
+    if len(records) > MAX_LIFECYCLE_PROFILES:
+        return jsonify({"error": f"At most {MAX_LIFECYCLE_PROFILES} profiles per request"}), 400
+
+    try:
+        with stage("simulate"):
+            results = project_profiles(
+                records, num_samples=num_samples, memory_limit_mb=Settings().SIMULATION_MEMORY_LIMIT_MB
             )
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    return jsonify({"results": results, "count": len(results), "num_samples": num_samples})
+
+@simulation_bp.route("/simulation/jobs", methods=["POST"])
+def submit_simulation_job():
+    """
+    POST /api/v1/simulation/jobs
+
+    Same JSON body as /simulation/run. Validates the params and options,
+    queues the run and returns 202 with a job id to poll at
+    GET /simulation/jobs/<job_id>.
+    """
+    data = request.get_json() or {}
+
+    try:
+        reference = get_reference_data()
+        # fail fast on anything the worker would reject: unknown careers/locations, bad options
+        run_size(data)
+        get_params(data, reference)
+        SimulationOptions.from_request(data)
+        job_id = current_app.simulation_jobs.submit(data, reference)
     except Exception as e:
-        print(f"Error in slider simulation: {str(e)}")
-        return jsonify({"error": str(e)}), 500
-    
+        return jsonify({"error": str(e)}), 400
 
-   
\ No newline at end of file
+    return jsonify(
+        {
+            "job_id": job_id,
+            "status": "pending",
+            "status_url": f"{request.script_root}{request.path}/{job_id}",
+        }
+    ), 202
+
+@simulation_bp.route("/simulation/jobs/<job_id>", methods=["GET"])
+def get_simulation_job(job_id):
+    """
+    GET /api/v1/simulation/jobs/<job_id>
+
+    Returns {"job_id", "status": pending|running|succeeded|failed} plus
+    "result" (the /simulation/run body) once it succeeded, or "error".
+    The Celery backend cannot tell unknown ids apart, so they read as pending.
+    """
+    status = current_app.simulation_jobs.status(job_id)
+    if status is None:
+        return jsonify({"error": f"Unknown job_id: {job_id}"}), 404
+    return jsonify(status)
+
+@simulation_bp.route("/simulation/cache", methods=["GET"])
+def simulation_cache_stats():
+    """GET /api/v1/simulation/cache -> hit/miss counters and size of the result and params caches."""
+    stats = current_app.simulation_cache.stats()
+    stats["param_resolver"] = default_resolver.stats()
+    reference = get_reference_data()
+    stats["cost_model"] = default_cost_model(reference.tax_tables.for_state(None), reference.home_values).to_dict()
+    return jsonify(stats)
@@ -9,4 +9,14 @@ class Settings(BaseModel):
     SECRET_KEY: str = os.getenv("SECRET_KEY")
     DATABASE_URL: str = os.getenv("DATABASE_URL")
     USE_CELERY: str = os.getenv("USE_CELERY")
+    CELERY_BROKER_URL: str = os.getenv("CELERY_BROKER_URL")
+    CELERY_RESULT_BACKEND: str = os.getenv("CELERY_RESULT_BACKEND")
+    CELERY_TASK_ALWAYS_EAGER: str = os.getenv("CELERY_TASK_ALWAYS_EAGER")
     PARAMETER_SET_KEY: str = os.getenv("PARAMETER_SET_KEY")
+    SIMULATION_CACHE_SIZE: int = int(os.getenv("SIMULATION_CACHE_SIZE", "1024"))
+    SIMULATION_CACHE_TTL: float = float(os.getenv("SIMULATION_CACHE_TTL", "3600"))
+    SIMULATION_STAGE_CACHE_SIZE: int = int(os.getenv("SIMULATION_STAGE_CACHE_SIZE", "64"))
+    SIMULATION_STAGE_CACHE_MB: float = float(os.getenv("SIMULATION_STAGE_CACHE_MB", "64"))
+    SERVER_TIMING: bool = os.getenv("SERVER_TIMING", "0").strip().lower() in {"1", "true", "yes", "on"}
+    SIMULATION_POOL_WORKERS: int = int(os.getenv("SIMULATION_POOL_WORKERS", str(os.cpu_count() or 1)))
+    SIMULATION_MEMORY_LIMIT_MB: float = float(os.getenv("SIMULATION_MEMORY_LIMIT_MB", "256"))
@@ -53,7 +53,7 @@ class FinStatements(Base):
     __tablename__ = "statements"
 
     id: Mapped[int] = mapped_column(BigInteger, primary_key=True)
-    user_id: Mapped[int] = mapped_column(BigInteger, ForeignKey('users.id'))
+    user_id: Mapped[int] = mapped_column(BigInteger, ForeignKey('users.id'), index=True)
 
     name: Mapped[str] = mapped_column(String(255))
     valuation: Mapped[int] = mapped_column(BigInteger)
@@ -0,0 +1,166 @@
+"""
+Benchmarks for the simulation hot path: get_tax_value, get_params (a fresh
+resolve, and a memoized one), get_home_payment and simulate_core over a
+num_samples x years sweep.
+
+Runs offline against the reference CSVs in app/ (or --data-dir); their
+checksum is recorded so results are only compared on identical inputs.
+
+    python -m app.scripts.benchmark_simulation --out bench.json
+    python -m app.scripts.benchmark_simulation --compare bench.json   # exit 1 on regressions
+
+Every case reports the median and minimum wall time over repeated runs.
+--compare flags cases whose median got slower than --threshold.
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from app.api.routes.simulations import get_params, get_tax_value, simulate_core
+from app.services.monte_carlo import ENGINE_VERSION, get_home_payment
+from app.services.param_resolver import default_resolver
+from app.services.reference_data import DATA_DIR, LOCATIONS_TABLE, load_reference_data
+
+SAMPLES_SWEEP = (100, 1_000, 10_000, 100_000)
+YEARS_SWEEP = (10, 30, 60)
+QUICK_SAMPLES_SWEEP = (100, 1_000, 10_000)
+QUICK_YEARS_SWEEP = (10, 60)
+
+# a fixed, mid-range configuration so runs are comparable
+BENCH_CONFIG = {
+    "career_id": "15-1250",  # Software and Web Developers
+    "location": "California",
+    "num_children": 1,
+    "spending": "eager",
+}
+
+
+def time_case(fn, min_time: float = 0.2, min_repeats: int = 3, max_repeats: int = 1000) -> dict:
+    """Calls fn once to warm up, then repeatedly until min_time has passed."""
+    fn()
+    times = []
+    started = time.perf_counter()
+    while len(times) < max_repeats and (len(times) < min_repeats or time.perf_counter() - started < min_time):
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+    return {"median_s": statistics.median(times), "min_s": min(times), "repeats": len(times)}
+
+
+def run_benchmarks(data_dir: str, samples_sweep, years_sweep, min_time: float) -> dict:
+    reference = load_reference_data(data_dir)
+    locations_df = pd.read_csv(os.path.join(data_dir, LOCATIONS_TABLE))
+    config = dict(BENCH_CONFIG)
+    if config["career_id"] not in reference.careers:
+        # custom --data-dir without the default career: fall back to the first usable one
+        config["career_id"] = next(c.career_id for c in reference.careers.values() if c.starting_salary)
+    params, tax_brackets, home_values = get_params(config, reference)
+    salaries = np.linspace(20_000, 400_000, 10_000)
+
+    cases = {}
+
+    def bench(name, fn, **meta):
+        result = time_case(fn, min_time=min_time)
+        result.update(meta)
+        cases[name] = result
+        print(f"  {name:<40} median {result['median_s'] * 1e3:10.3f} ms  ({result['repeats']} runs)", file=sys.stderr)
+
+    bench("get_tax_value", lambda: get_tax_value(locations_df, config["location"], 85_000.0))
+    bench("tax_brackets.tax[10k salaries]", lambda: tax_brackets.tax(salaries))
+
+    def resolve_uncached():
+        # get_params memoizes per career/location/children/spending: time the
+        # lookups and tax math, not the memo hit every repeat after the first
+        default_resolver.clear()
+        return get_params(config, reference)
+
+    bench("get_params", resolve_uncached)
+    bench("get_params[memoized]", lambda: get_params(config, reference))
+    bench("get_home_payment", lambda: get_home_payment(450_000.0))
+    for num_samples in samples_sweep:
+        for years in years_sweep:
+            bench(
+                f"simulate_core[n={num_samples},years={years}]",
+                lambda n=num_samples, y=years: simulate_core(params, tax_brackets, home_values, num_samples=n, years=y),
+                num_samples=num_samples,
+                years=years,
+            )
+
+    return {
+        "created": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+        "reference_checksum": reference.checksum,
+        "engine_version": ENGINE_VERSION,
+        "config": config,
+        "environment": {
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "pandas": pd.__version__,
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+        },
+        "cases": cases,
+    }
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list:
+    """Prints a comparison table and returns the names of regressed cases."""
+    if baseline.get("reference_checksum") != results["reference_checksum"]:
+        print("warning: baseline was recorded on different reference CSVs", file=sys.stderr)
+
+    regressions = []
+    print(f"{'case':<40} {'baseline ms':>12} {'current ms':>12} {'ratio':>7}")
+    for name, case in results["cases"].items():
+        old = baseline.get("cases", {}).get(name)
+        if old is None:
+            print(f"{name:<40} {'-':>12} {case['median_s'] * 1e3:12.3f} {'new':>7}")
+            continue
+        ratio = case["median_s"] / old["median_s"]
+        flag = ""
+        if ratio > 1 + threshold:
+            regressions.append(name)
+            flag = "  REGRESSION"
+        print(f"{name:<40} {old['median_s'] * 1e3:12.3f} {case['median_s'] * 1e3:12.3f} {ratio:7.2f}{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the simulation hot path")
+    parser.add_argument("--out", help="write results JSON here (default: stdout)")
+    parser.add_argument("--compare", help="baseline results JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=0.2, help="allowed slowdown before a case counts as a regression")
+    parser.add_argument("--quick", action="store_true", help="smaller sweep (no 100k-sample or 30-year runs)")
+    parser.add_argument("--min-time", type=float, default=0.2, help="seconds to spend timing each case")
+    parser.add_argument("--data-dir", default=DATA_DIR, help="directory with the reference CSVs")
+    args = parser.parse_args()
+
+    samples_sweep = QUICK_SAMPLES_SWEEP if args.quick else SAMPLES_SWEEP
+    years_sweep = QUICK_YEARS_SWEEP if args.quick else YEARS_SWEEP
+    results = run_benchmarks(args.data_dir, samples_sweep, years_sweep, args.min_time)
+
+    blob = json.dumps(results, indent=2)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(blob + "\n")
+    elif not args.compare:
+        print(blob)
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} case(s) slower than baseline by more than {args.threshold:.0%}")
+            sys.exit(1)
+        print("\nNo regressions")
+
+
+if __name__ == "__main__":
+    main()
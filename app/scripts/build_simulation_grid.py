@@ -0,0 +1,81 @@
+"""
+Builds app/simulation_grid.npy (+ .json) for /simulation/run, see
+app/services/simulation_grid.py. Rebuild whenever the reference CSVs
+change; until then /simulation/run ignores the stale grid.
+
+    python -m app.scripts.build_simulation_grid --workers 8
+"""
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from app.api.routes.simulations import get_params
+from app.services.monte_carlo import DEFAULT_SEED, ENGINE_VERSION
+from app.services.reference_data import DATA_DIR, worker_reference_data
+from app.services.simulation_grid import (
+    GRID_MAX_CHILDREN,
+    GRID_NUM_SAMPLES,
+    GRID_SPENDING,
+    GRID_YEARS,
+    SimulationGrid,
+    build_year_slice,
+    grid_axes,
+)
+
+
+def _build_year(years, data_dir):
+    reference = worker_reference_data(data_dir)
+    career_ids, states = grid_axes(reference)
+    return build_year_slice(reference, get_params, career_ids, states, years)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Precompute /simulation/run results for every discrete input")
+    parser.add_argument("--min-years", type=int, default=GRID_YEARS[0])
+    parser.add_argument("--max-years", type=int, default=GRID_YEARS[1])
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--data-dir", default=DATA_DIR, help="directory with the reference CSVs; the grid is written there")
+    args = parser.parse_args()
+
+    reference = worker_reference_data(args.data_dir)
+    career_ids, states = grid_axes(reference)
+    year_values = list(range(args.min_years, args.max_years + 1))
+    print(f"Grid: {len(career_ids)} careers x {len(states)} states x {len(GRID_SPENDING)} spending x {len(year_values)} years")
+
+    started = time.time()
+    values = np.empty((len(career_ids), len(states), len(GRID_SPENDING), len(year_values), 2))
+
+    def store(years, year_slice):
+        values[:, :, :, years - args.min_years] = year_slice
+        print(f"  years={years} done ({time.time() - started:.1f}s)")
+
+    if args.workers <= 1:
+        for years in year_values:
+            store(years, _build_year(years, args.data_dir))
+    else:
+        with ProcessPoolExecutor(max_workers=args.workers, initializer=worker_reference_data, initargs=(args.data_dir,)) as pool:
+            # longest runs first so the pool drains evenly
+            ordered = sorted(year_values, reverse=True)
+            for years, year_slice in zip(ordered, pool.map(_build_year, ordered, [args.data_dir] * len(ordered))):
+                store(years, year_slice)
+
+    meta = {
+        "reference_checksum": reference.checksum,
+        "engine_version": ENGINE_VERSION,
+        "seed": DEFAULT_SEED,
+        "num_samples": GRID_NUM_SAMPLES,
+        "max_children": GRID_MAX_CHILDREN,
+        "careers": career_ids,
+        "states": states,
+        "spending": list(GRID_SPENDING),
+        "years": [args.min_years, args.max_years],
+    }
+    SimulationGrid(values, meta).save(args.data_dir)
+    print(f"✅ Wrote {values.nbytes / 1e6:.1f} MB grid to {args.data_dir} in {time.time() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,145 +1,247 @@
+"""
+Generates simulation_training_data.csv for the surrogate model
+(app/scripts/train_surrogate.py).
+
+Configurations come from a Latin hypercube design over career, state,
+number of children, spending type and years: every dimension is split
+into N equal strata and each stratum is used exactly once, so even a small
+run covers every dimension evenly instead of clumping like independent
+random.choice draws. The design is fully determined by --seed.
+
+Chunks of configurations are simulated on a process pool (each worker
+loads the reference tables once and runs its chunk through the batch
+engine). Every finished chunk is written to <out>.parts/ as its own file,
+which doubles as the checkpoint: rerunning the same command after a crash
+skips the chunks already on disk. When all chunks are done they are
+merged into the final CSV (or a columnar .npz with --format npz).
+
+    python -m app.scripts.generate_training_data --configs 100000 --workers 8
+"""
+import argparse
+import json
 import os
-import random
-import csv
+import shutil
 import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
 
 import numpy as np
 import pandas as pd
 
-from app import create_app
-from app.api.routes.simulations import get_params, simulate_core
 CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
-PROJECT_ROOT = os.path.dirname(CURRENT_DIR)
+PROJECT_ROOT = os.path.dirname(os.path.dirname(CURRENT_DIR))
 if PROJECT_ROOT not in sys.path:
     sys.path.insert(0, PROJECT_ROOT)
 
+from app.api.routes.simulations import get_params
+from app.services.batch_simulation import run_batch
+from app.services.reference_data import worker_reference_data
+
 # how many different user configurations to simulate
-N_CONFIGS = 1200  # you can bump this later to 500/1000 offline
+N_CONFIGS = 1200
 SAMPLES_PER_CONFIG = 200  # same as your API
-YEARS_CHOICES = [10, 11, 12,13, 14, 15, 16, 17, 18, 19, 20, 21, 22, 23, 24, 25, 26, 27, 28, 29, 30, 31, 32, 33, 34, 35, 36, 37, 38, 39, 40, 41, 42, 43, 44, 45, 46, 47, 48, 49, 50, 51, 52, 53, 54, 55, 56, 57, 58, 59, 60]
+CHUNK_SIZE = 500  # configurations per worker task / part file
+YEARS_CHOICES = list(range(10, 61))
+NUM_CHILDREN_CHOICES = [0, 1, 2, 3]
+SPENDING_CHOICES = ["eager", "conservative"]
+
+DEFAULT_OUT = os.path.join(PROJECT_ROOT, "simulation_training_data.csv")
+
+FIELDNAMES = [
+    # raw "UI" inputs
+    "career_id",
+    "location",
+    "num_children",
+    "spending",
+    "years",
+
+    # numeric params from get_params
+    "starting_salary",
+    "salary_growth_mean",
+    "salary_growth_sd",
+    "home_growth_rate",
+    "salary_to_buy_house",
+    "annual_child_cost",
+    "savings_rate",
+    "hv_to_salary_ratio",
+    "effective_tax_rate_starting",
+    "effective_tax_rate_100k",
+
+    # simulation outputs
+    "mean_networth",
+    "stdev_networth",
+]
+PARAM_FIELDS = FIELDNAMES[5:15]
+TEXT_FIELDS = ("career_id", "location", "spending")
+INT_FIELDS = ("num_children", "years")
+
+
+def latin_hypercube(n: int, dimensions: list, seed: int) -> list:
+    """
+    n points over categorical dimensions (lists of choices). Each dimension's
+    [0, 1) range is cut into n strata; every stratum is hit once, in a random
+    order per dimension, and mapped onto the choices.
+    """
+    rng = np.random.default_rng(seed)
+    columns = []
+    for choices in dimensions:
+        u = (rng.permutation(n) + rng.random(n)) / n
+        columns.append([choices[i] for i in (u * len(choices)).astype(int)])
+    return list(zip(*columns))
+
+
+def build_design(reference, n: int, seed: int) -> list:
+    # only keep careers with a known starting salary
+    career_ids = sorted(
+        career.career_id for career in reference.careers.values() if career.starting_salary is not None
+    )
+    # only states that also have home/child data can be simulated
+    locations = sorted(state.state for state in reference.states.values() if state.home_growth_rate is not None)
+    print(f"Found {len(career_ids)} career_ids and {len(locations)} locations")
+
+    points = latin_hypercube(
+        n, [career_ids, locations, NUM_CHILDREN_CHOICES, SPENDING_CHOICES, YEARS_CHOICES], seed
+    )
+    return [
+        {"career_id": career_id, "location": location, "num_children": num_children,
+         "spending": spending, "years": years}
+        for career_id, location, num_children, spending, years in points
+    ]
+
+
+def simulate_chunk(configs: list, num_samples: int) -> tuple:
+    """Runs one chunk through the batch engine. Returns (rows, number skipped)."""
+    reference = worker_reference_data()
+    results = run_batch([dict(config, num_samples=num_samples) for config in configs], reference, get_params)
+
+    rows = []
+    skipped = 0
+    for config, result in zip(configs, results):
+        if "error" in result:
+            skipped += 1
+            continue
+        params = result["params"]
+        row = dict(config)
+        row.update({name: params[name] for name in PARAM_FIELDS})
+        row["mean_networth"] = result["summary"]["mean"]
+        row["stdev_networth"] = result["summary"]["stdev"]
+        rows.append(row)
+    return rows, skipped
+
+
+def _part_path(parts_dir: str, index: int, fmt: str) -> str:
+    return os.path.join(parts_dir, f"part-{index:05d}.{fmt}")
+
+
+def _column_array(series: pd.Series) -> np.ndarray:
+    # fixed dtypes so the .npz loads without pickle, even for an empty chunk
+    if series.name in TEXT_FIELDS:
+        return series.astype(str).to_numpy(dtype=str)
+    return series.to_numpy(dtype=np.int64 if series.name in INT_FIELDS else float)
+
+
+def write_table(df: pd.DataFrame, path: str, fmt: str):
+    """Writes atomically (temp file + rename) so a killed run never leaves half a file."""
+    tmp_path = path + ".tmp"
+    if fmt == "npz":
+        with open(tmp_path, "wb") as f:
+            np.savez(f, **{column: _column_array(df[column]) for column in FIELDNAMES})
+    else:
+        df.to_csv(tmp_path, index=False, columns=FIELDNAMES)
+    os.replace(tmp_path, path)
+
+
+def read_table(path: str, fmt: str) -> pd.DataFrame:
+    if fmt == "npz":
+        with np.load(path, allow_pickle=False) as columns:
+            return pd.DataFrame({column: columns[column] for column in FIELDNAMES})
+    return pd.read_csv(path, dtype={"career_id": str})
+
+
+def _prepare_parts_dir(parts_dir: str, run_config: dict, restart: bool):
+    """Creates the checkpoint dir, or validates that an existing one belongs to this run."""
+    manifest_path = os.path.join(parts_dir, "manifest.json")
+    if restart and os.path.isdir(parts_dir):
+        shutil.rmtree(parts_dir)
+    if os.path.exists(manifest_path):
+        with open(manifest_path, encoding="utf-8") as f:
+            previous = json.load(f)
+        if previous != run_config:
+            raise SystemExit(
+                f"{parts_dir} holds a run with different settings ({previous}); use --restart to discard it"
+            )
+        return
+    os.makedirs(parts_dir, exist_ok=True)
+    with open(manifest_path, "w", encoding="utf-8") as f:
+        json.dump(run_config, f, indent=2)
+
 
 def main():
-    app = create_app()
-
-    with app.app_context():
-        base_path = app.root_path
-
-        # load CSVs to get valid career_ids and states
-        salaries_path = os.path.join(base_path, "salary_table.csv")
-        locations_path = os.path.join(base_path, "locations_table.csv")
-
-        salary_table = pd.read_csv(salaries_path)
-        locations_table = pd.read_csv(locations_path)
-
-        # only keep rows with valid Category + Starting Salary for now
-        valid_salary_rows = salary_table[
-            salary_table["Starting Salary"].notna()
-        ]
-        career_ids = list(valid_salary_rows["Career_ID"].astype(str).unique())
-
-        # list of states that appear in both locations_table and home/child table is safer,
-        # but for now we'll just use locations_table states:
-        location_values = list(locations_table["State"].unique())
-
-        spending_options = ["eager", "conservative"]
-        num_children_options = [0, 1, 2, 3]
-
-        print(f"Found {len(career_ids)} career_ids and {len(location_values)} locations")
-
-        # output CSV
-        out_path = os.path.join(base_path, "..", "simulation_training_data.csv")
-        out_path = os.path.abspath(out_path)
-
-        fieldnames = [
-            # raw "UI" inputs
-            "career_id",
-            "location",
-            "num_children",
-            "spending",
-            "years",
-
-            # numeric params from get_params
-            "starting_salary",
-            "salary_growth_mean",
-            "salary_growth_sd",
-            "home_growth_rate",
-            "salary_to_buy_house",
-            "annual_child_cost",
-            "savings_rate",
-            "hv_to_salary_ratio",
-            "effective_tax_rate_starting",
-            "effective_tax_rate_100k",
-
-            # simulation outputs
-            "mean_networth",
-            "stdev_networth",
-            
-        ]
-
-        with open(out_path, "w", newline="", encoding="utf-8") as f_out:
-            writer = csv.DictWriter(f_out, fieldnames=fieldnames)
-            writer.writeheader()
-
-            n_written = 0
-
-            for i in range(N_CONFIGS):
-                career_id = random.choice(career_ids)
-                location = random.choice(location_values)
-                num_children = random.choice(num_children_options)
-                spending = random.choice(spending_options)
-                years = random.choice(YEARS_CHOICES)
-
-                data = {
-                    "career_id": career_id,
-                    "location": location,
-                    "num_children": num_children,
-                    "spending": spending,
-                    "years": years,
-                }
-
-                try:
-                    params, locations_df, home_and_rental_table = get_params(data)
-                except Exception as e:
-                    print(f"[{i}] Skipping config (params error): {e}")
-                    continue
-
-                try:
-                    summary = simulate_core(
-                        params,
-                        locations_df,
-                        home_and_rental_table,
-                        num_samples=SAMPLES_PER_CONFIG,
-                        years=years,
-                    )
-                except Exception as e:
-                    print(f"[{i}] Skipping config (simulation error): {e}")
-                    continue
-
-                row = {
-                    "career_id": career_id,
-                    "location": location,
-                    "num_children": num_children,
-                    "spending": spending,
-                    "years": years,
-                    "starting_salary": params["starting_salary"],
-                    "salary_growth_mean": params["salary_growth_mean"],
-                    "salary_growth_sd": params["salary_growth_sd"],
-                    "home_growth_rate": params["home_growth_rate"],
-                    "salary_to_buy_house": params["salary_to_buy_house"],
-                    "annual_child_cost": params["annual_child_cost"],
-                    "savings_rate": params["savings_rate"],
-                    "hv_to_salary_ratio": params["hv_to_salary_ratio"],
-                    "effective_tax_rate_starting": params["effective_tax_rate_starting"],
-                    "effective_tax_rate_100k": params["effective_tax_rate_100k"],
-                    "mean_networth": summary["mean"],
-                    "stdev_networth": summary["stdev"],
-                }
-
-                writer.writerow(row)
-                n_written += 1
-                print(f"[{i}] wrote config; total written: {n_written}")
-
-        print(f"\n✅ Done. Wrote {n_written} rows to {out_path}")
+    parser = argparse.ArgumentParser(description="Generate surrogate training data")
+    parser.add_argument("--configs", type=int, default=N_CONFIGS)
+    parser.add_argument("--samples", type=int, default=SAMPLES_PER_CONFIG)
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--seed", type=int, default=0, help="seed for the configuration design")
+    parser.add_argument("--format", choices=["csv", "npz"], default="csv")
+    parser.add_argument("--out", default=None, help="output file (default simulation_training_data.<format>)")
+    parser.add_argument("--restart", action="store_true", help="discard checkpointed chunks from an earlier run")
+    args = parser.parse_args()
+
+    out_path = os.path.abspath(args.out or os.path.splitext(DEFAULT_OUT)[0] + "." + args.format)
+    parts_dir = out_path + ".parts"
+
+    reference = worker_reference_data()
+    design = build_design(reference, args.configs, args.seed)
+    chunks = [design[i:i + args.chunk_size] for i in range(0, len(design), args.chunk_size)]
+
+    run_config = {
+        "configs": args.configs,
+        "samples": args.samples,
+        "chunk_size": args.chunk_size,
+        "seed": args.seed,
+        "format": args.format,
+        "reference_checksum": reference.checksum,
+    }
+    _prepare_parts_dir(parts_dir, run_config, args.restart)
+
+    todo = [i for i in range(len(chunks)) if not os.path.exists(_part_path(parts_dir, i, args.format))]
+    if len(todo) < len(chunks):
+        print(f"Resuming: {len(chunks) - len(todo)} of {len(chunks)} chunks already done")
+
+    started = time.time()
+    n_skipped = 0
+
+    def save(index, rows, skipped):
+        nonlocal n_skipped
+        n_skipped += skipped
+        write_table(pd.DataFrame(rows, columns=FIELDNAMES), _part_path(parts_dir, index, args.format), args.format)
+        done = len(chunks) - len(todo) + finished
+        print(f"[{done}/{len(chunks)}] chunk {index}: {len(rows)} rows, {skipped} skipped ({time.time() - started:.1f}s)")
+
+    finished = 0
+    if args.workers <= 1:
+        for index in todo:
+            rows, skipped = simulate_chunk(chunks[index], args.samples)
+            finished += 1
+            save(index, rows, skipped)
+    else:
+        with ProcessPoolExecutor(max_workers=args.workers, initializer=worker_reference_data) as pool:
+            futures = {pool.submit(simulate_chunk, chunks[index], args.samples): index for index in todo}
+            for future in as_completed(futures):
+                rows, skipped = future.result()
+                finished += 1
+                save(futures[future], rows, skipped)
+
+    # merge the parts in design order
+    df = pd.concat(
+        [read_table(_part_path(parts_dir, i, args.format), args.format) for i in range(len(chunks))],
+        ignore_index=True,
+    )
+    write_table(df, out_path, args.format)
+    shutil.rmtree(parts_dir)
+
+    print(f"\n✅ Done. Wrote {len(df)} rows to {out_path} ({n_skipped} configs skipped this session)")
 
 
 if __name__ == "__main__":
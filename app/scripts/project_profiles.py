@@ -0,0 +1,65 @@
+"""
+Bulk lifecycle projections for a file of extended profiles (the format of
+app/Washington__D_C__Software_Engineer_Use_Cases__5_rows_ (1).csv), see
+app/services/lifecycle.py.
+
+    python -m app.scripts.project_profiles profiles.csv --out projections.csv
+    python -m app.scripts.project_profiles profiles.csv --out projections.json --num-samples 5000
+
+CSV output has one row per profile with the retirement-age summary; JSON
+output also carries the mean net worth for every age.
+"""
+import argparse
+import json
+import sys
+import time
+
+import pandas as pd
+
+from app.services.lifecycle import ACCOUNTS, project_profiles, read_profiles
+
+
+def flatten(result: dict) -> dict:
+    """One CSV row for a projection (or an error)."""
+    if "error" in result:
+        return {"profile_id": result["profile_id"], "error": result["error"]}
+    row = {
+        "profile_id": result["profile_id"],
+        "current_age": result["current_age"],
+        "retire_age": result["retire_age"],
+        "years": result["years"],
+    }
+    row.update({f"net_worth_{name}": value for name, value in result["net_worth"].items()})
+    row.update({f"balance_{name}": result["accounts"][name] for name in ACCOUNTS})
+    row["home_equity"] = result["home_equity"]
+    row["remaining_debt"] = result["remaining_debt"]
+    row["error"] = ""
+    return row
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Project a file of extended profiles to retirement")
+    parser.add_argument("profiles", help="profile CSV")
+    parser.add_argument("--out", help="write results here (.csv or .json; default: CSV to stdout)")
+    parser.add_argument("--num-samples", type=int, default=1000)
+    args = parser.parse_args()
+
+    records = read_profiles(args.profiles)
+    started = time.time()
+    results = project_profiles(records, num_samples=args.num_samples)
+    errors = sum("error" in r for r in results)
+    print(
+        f"Projected {len(results) - errors} profiles ({errors} invalid) x {args.num_samples} samples "
+        f"in {time.time() - started:.1f}s",
+        file=sys.stderr,
+    )
+
+    if args.out and args.out.endswith(".json"):
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(results, f)
+        return
+    pd.DataFrame([flatten(r) for r in results]).to_csv(args.out or sys.stdout, index=False)
+
+
+if __name__ == "__main__":
+    main()
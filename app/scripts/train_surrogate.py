@@ -0,0 +1,58 @@
+import argparse
+import os
+import sys
+
+from app.scripts.generate_training_data import read_table
+from app.services.networth_regression import (
+    ACCURACY_THRESHOLDS,
+    SURROGATE_FILE,
+    TRAINING_DATA_FILE,
+    NetworthSurrogate,
+)
+from app.services.reference_data import DATA_DIR
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fit the net worth surrogate used by /simulation/sliders mode=fast")
+    parser.add_argument("--data", default=TRAINING_DATA_FILE, help="CSV or .npz from generate_training_data.py")
+    parser.add_argument("--out", default=os.path.join(DATA_DIR, SURROGATE_FILE))
+    parser.add_argument("--degree", type=int, default=3)
+    parser.add_argument("--ridge", type=float, default=1.0)
+    parser.add_argument(
+        "--max-mean-error",
+        type=float,
+        default=ACCURACY_THRESHOLDS["holdout_mean_error_in_stdevs_median"],
+        help="largest median holdout error of the mean, in true stdevs, the model may serve with",
+    )
+    parser.add_argument(
+        "--max-stdev-error",
+        type=float,
+        default=ACCURACY_THRESHOLDS["holdout_stdev_rel_error_median"],
+        help="largest median holdout relative error of the stdev the model may serve with",
+    )
+    args = parser.parse_args()
+
+    df = read_table(args.data, "npz" if args.data.endswith(".npz") else "csv")
+    thresholds = {
+        "holdout_mean_error_in_stdevs_median": args.max_mean_error,
+        "holdout_stdev_rel_error_median": args.max_stdev_error,
+    }
+    model = NetworthSurrogate.train(df, degree=args.degree, ridge=args.ridge, accuracy_thresholds=thresholds)
+
+    print(f"Trained on {model.metrics['rows']} rows")
+    for name, value in model.metrics.items():
+        if name.startswith("holdout_"):
+            limit = thresholds.get(name)
+            print(f"  {name}: {value:.4g}" + (f" (max {limit:.4g})" if limit is not None else ""))
+
+    # the thresholds are saved with the model and checked again when the API loads it
+    failures = model.accuracy_failures()
+    if failures:
+        print(f"❌ Holdout error above threshold ({', '.join(failures)}); not writing {args.out}")
+        sys.exit(1)
+    model.save(args.out)
+    print(f"✅ Wrote {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,206 @@
+"""
+Runs many simulation configurations in one call.
+
+Configs are resolved against a single reference snapshot, served from the
+result cache where possible, and the rest are grouped by
+(num_samples, years, sampling). Every config in a group uses the same seeded draws,
+so a group runs as one stacked pass of the engine instead of one
+simulate_core call per config. Groups can optionally be spread across a
+process pool. Results come back in input order with per-config errors.
+
+Configs take the /simulation/run options except the ones that change how
+many samples run or where (rel_tol, shards, deadline_ms), which are
+rejected per config. Stacked passes stay within the simulation memory
+limit; a config asking for percentile bands or float32, or too large for
+one pass on its own, is simulated in blocks, exactly as simulate_core
+would run it.
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from app.services.monte_carlo import (
+    BLOCK_SIZE,
+    DEFAULT_MEMORY_LIMIT_MB,
+    DEFAULT_SEED,
+    SimulationOptions,
+    fits_in_one_pass,
+    path_bytes,
+    run_size,
+    samples_per_block,
+    simulate_bands,
+    simulate_networths,
+    simulate_networths_batch,
+    summarize_networths,
+)
+from app.services.sampling import ShockSampler
+from app.services.simulation_cache import make_cache_key
+
+MAX_BATCH_CONFIGS = 500
+
+# upper bound on (configs x samples x years) cells stacked into one engine pass
+MAX_CELLS_PER_PASS = 2_000_000
+
+_process_pool = None
+
+
+def get_process_pool(max_workers: int = None) -> ProcessPoolExecutor:
+    """Process pool shared by the app, created on first use."""
+    global _process_pool
+    if _process_pool is None:
+        _process_pool = ProcessPoolExecutor(max_workers=max_workers or os.cpu_count())
+    return _process_pool
+
+
+def _run_group(params_list, tax_brackets_list, home_values, num_samples, years, sampling="pseudo"):
+    """
+    Simulates configs that share (num_samples, years, sampling). Returns one
+    summary dict or error string per config.
+    """
+    rng = np.random.default_rng(seed=DEFAULT_SEED)
+    shocks = ShockSampler(rng, years, sampling).draw(num_samples)
+    try:
+        networths = simulate_networths_batch(params_list, tax_brackets_list, home_values, shocks)
+        return [summarize_networths(row) for row in networths]
+    except Exception:
+        pass
+
+    # something in the group is malformed: rerun one by one to pin the error on its config
+    results = []
+    for params, tax_brackets in zip(params_list, tax_brackets_list):
+        try:
+            results.append(
+                summarize_networths(simulate_networths(params, tax_brackets, home_values, num_samples, years, shocks=shocks))
+            )
+        except Exception as e:
+            results.append(str(e))
+    return results
+
+
+def _run_blocked(params, tax_brackets, home_values, num_samples, years, options, block_size):
+    """
+    A config that does not join a stacked pass (bands, float32 or too large),
+    blocked as simulate_core blocks it. Returns [summary or error string].
+    """
+    try:
+        rng = np.random.default_rng(seed=DEFAULT_SEED)
+        return [
+            simulate_bands(
+                params, tax_brackets, home_values, num_samples, years, rng,
+                percentiles=options.percentiles,
+                block_size=block_size,
+                sampling=options.sampling,
+                precision=options.precision,
+            )
+        ]
+    except Exception as e:
+        return [str(e)]
+
+
+def _batch_options(config: dict) -> SimulationOptions:
+    """The config's /simulation/run options; raises ValueError on ones batch cannot honour."""
+    options = SimulationOptions.from_request(config)
+    if options.adaptive or options.shards > 1 or options.deadline_ms is not None:
+        raise ValueError("rel_tol, shards and deadline_ms are not supported in batch; use /simulation/run")
+    return options
+
+
+def _chunks(entries, num_samples, years, min_chunks=1, memory_limit_mb=DEFAULT_MEMORY_LIMIT_MB):
+    per_config = max(1, num_samples * years)
+    cells = min(MAX_CELLS_PER_PASS, int(memory_limit_mb * 2**20 // path_bytes(1, 1)))
+    size = max(1, cells // per_config)
+    # with a pool, split groups so every worker gets a share
+    size = min(size, max(1, -(-len(entries) // min_chunks)))
+    for start in range(0, len(entries), size):
+        yield entries[start:start + size]
+
+
+def run_batch(
+    configs,
+    reference,
+    resolve_params,
+    cache=None,
+    pool=None,
+    pool_workers=1,
+    memory_limit_mb=DEFAULT_MEMORY_LIMIT_MB,
+) -> list:
+    """
+    Simulates every config (a /simulation/run style dict) and returns a list
+    of {"summary", "years", "params"} or {"error"} entries in input order.
+
+    resolve_params(config, reference) -> (params, tax_brackets, home_values)
+    cache: optional SimulationCache shared with the single-run endpoints
+    pool: optional executor to spread groups across processes
+    pool_workers: number of workers in pool, used to size the chunks
+    memory_limit_mb: ceiling on the path matrices of any one engine pass
+    """
+    results = [None] * len(configs)
+    pending = {}  # (num_samples, years, sampling) -> [(index, params, tax_brackets, key)]
+    blocked = []  # (index, params, tax_brackets, key, num_samples, years, options)
+    home_values = reference.home_values
+
+    for i, config in enumerate(configs):
+        try:
+            if not isinstance(config, dict):
+                raise ValueError("Each config must be a JSON object")
+            years, num_samples = run_size(config)
+            options = _batch_options(config)
+            params, tax_brackets, _ = resolve_params(config, reference)
+        except Exception as e:
+            results[i] = {"error": str(e)}
+            continue
+
+        # same key as /simulation/run, so the two endpoints share results
+        key = make_cache_key(params, num_samples=num_samples, years=years, **options.cache_fields())
+        summary = cache.get(key) if cache is not None else None
+        if summary is not None:
+            results[i] = {"summary": summary, "years": years, "params": params}
+            continue
+        if options.percentiles or not fits_in_one_pass(num_samples, years, options, memory_limit_mb):
+            blocked.append((i, params, tax_brackets, key, num_samples, years, options))
+        else:
+            pending.setdefault((num_samples, years, options.sampling), []).append((i, params, tax_brackets, key))
+
+    jobs = []
+    for i, params, tax_brackets, key, num_samples, years, options in blocked:
+        try:
+            block_size = samples_per_block(
+                years, memory_limit_mb, options.precision, BLOCK_SIZE if options.percentiles else None
+            )
+        except ValueError as e:
+            results[i] = {"error": str(e)}
+            continue
+        args = (params, tax_brackets, home_values, num_samples, years, options, block_size)
+        future = pool.submit(_run_blocked, *args) if pool is not None else None
+        jobs.append(([(i, params, tax_brackets, key)], years, future, _run_blocked, args))
+
+    for (num_samples, years, sampling), entries in pending.items():
+        min_chunks = pool_workers if pool is not None else 1
+        for chunk in _chunks(entries, num_samples, years, min_chunks, memory_limit_mb):
+            args = (
+                [params for _, params, _, _ in chunk],
+                [tax_brackets for _, _, tax_brackets, _ in chunk],
+                home_values,
+                num_samples,
+                years,
+                sampling,
+            )
+            future = pool.submit(_run_group, *args) if pool is not None else None
+            jobs.append((chunk, years, future, _run_group, args))
+
+    for chunk, years, future, run, args in jobs:
+        try:
+            outcomes = future.result() if future is not None else run(*args)
+        except Exception as e:
+            outcomes = [str(e)] * len(chunk)
+
+        for (i, params, _, key), outcome in zip(chunk, outcomes):
+            if isinstance(outcome, str):
+                results[i] = {"error": outcome}
+                continue
+            if cache is not None:
+                cache.put(key, outcome)
+            results[i] = {"summary": outcome, "years": years, "params": params}
+
+    return results
@@ -0,0 +1,89 @@
+"""
+Wall-time model of the Monte Carlo engine, calibrated on the running machine.
+
+A run of n samples over y years costs roughly
+
+    fixed + per_year * y + per_cell * n * y
+
+milliseconds: the year loop in _project_networths has a per-year overhead
+that does not depend on the sample count, and everything else is
+proportional to the (samples, years) cells. create_app() times the engine
+on a few sizes at startup (a few tens of ms), separately for every
+precision, and fits the three coefficients by least squares.
+Deadline-bound runs (deadline_ms) use it to size their blocks.
+"""
+import time
+
+import numpy as np
+
+from app.services.monte_carlo import PRECISIONS, simulate_networths
+
+# (num_samples, years) points timed during calibration
+CALIBRATION_SIZES = ((50, 10), (50, 60), (2_000, 20), (2_000, 60))
+
+# a synthetic mid-range configuration; only its cost matters
+CALIBRATION_PARAMS = {
+    "starting_salary": 70_000.0,
+    "salary_growth_mean": 0.03,
+    "salary_growth_sd": 0.02,
+    "rent_pc_baseline": 0.3,
+    "salary_to_buy_house": 90_000.0,
+    "home_growth_rate": 0.03,
+    "savings_rate": 0.2,
+    "num_children": 1,
+    "annual_child_cost": 15_000.0,
+    "spending_type": "eager",
+}
+
+
+class CostModel:
+    def __init__(self, coefficients: dict):
+        self.coefficients = coefficients  # precision -> (fixed_ms, per_year_ms, per_cell_ms)
+
+    @classmethod
+    def calibrate(cls, tax_brackets, home_values, repeats: int = 3) -> "CostModel":
+        """Times simulate_networths at CALIBRATION_SIZES (best of `repeats`) and fits the model."""
+        rng = np.random.default_rng(0)
+        coefficients = {}
+        for precision, dtype in PRECISIONS.items():
+            rows, timings = [], []
+            for num_samples, years in CALIBRATION_SIZES:
+                best = float("inf")
+                for _ in range(repeats):
+                    # drawing the shocks is part of every block's cost
+                    started = time.perf_counter()
+                    shocks = rng.standard_normal((num_samples, years)).astype(dtype, copy=False)
+                    simulate_networths(CALIBRATION_PARAMS, tax_brackets, home_values, num_samples, years, shocks=shocks)
+                    best = min(best, time.perf_counter() - started)
+                rows.append((1.0, years, num_samples * years))
+                timings.append(best * 1000)
+            fit, *_ = np.linalg.lstsq(np.array(rows), np.array(timings), rcond=None)
+            # a noisy fit must never predict free work
+            coefficients[precision] = tuple(float(max(c, 0.0)) for c in fit[:2]) + (float(max(fit[2], 1e-7)),)
+        return cls(coefficients)
+
+    def predict_ms(self, num_samples: int, years: int, precision: str = "float64") -> float:
+        fixed, per_year, per_cell = self.coefficients[precision]
+        return fixed + per_year * years + per_cell * num_samples * years
+
+    def samples_within(self, budget_ms: float, years: int, precision: str = "float64") -> int:
+        """Largest sample count predicted to finish within budget_ms (0 when nothing fits)."""
+        fixed, per_year, per_cell = self.coefficients[precision]
+        return max(0, int((budget_ms - fixed - per_year * years) / (per_cell * years)))
+
+    def to_dict(self) -> dict:
+        return {
+            precision: {"fixed_ms": fixed, "per_year_ms": per_year, "per_cell_ns": per_cell * 1e6}
+            for precision, (fixed, per_year, per_cell) in self.coefficients.items()
+        }
+
+
+_default_model = None
+
+
+def default_cost_model(tax_brackets, home_values) -> CostModel:
+    """The process-wide model, calibrated on first use (create_app() does so at startup)."""
+    global _default_model
+    if _default_model is None:
+        _default_model = CostModel.calibrate(tax_brackets, home_values)
+    return _default_model
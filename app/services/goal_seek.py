@@ -0,0 +1,274 @@
+"""
+Goal seeking: the value of one free parameter that gets a net worth metric
+to a target ("what savings rate gives me a $1M median after 30 years?").
+
+Every solver step reuses the same random draws and the engine stage that
+parameter leaves untouched, so a step costs far less than a run:
+
+- savings_rate, num_children: downstream of everything else, so each step
+  is NetworthBase.networths(), an O(num_samples) combination of two
+  cached vectors (the same base /simulation/run and /simulation/sliders
+  keep in the stage cache)
+- salary_to_buy_house: salaries and taxes (IncomePaths) are computed once;
+  each step re-runs only the housing and cash-flow loop
+- years: one run at the upper bound yields end-of-year net worth for every
+  horizon at once, which locates the answer; it is then confirmed with
+  runs at exactly the candidate horizons, drawn as /simulation/run draws
+  them, so the reported years and metric reproduce
+
+Continuous parameters are bracketed on a coarse grid and then bisected to
+the tolerance. Integer parameters are scanned outright. The answer is the
+smallest savings rate or horizon meeting the target, and the largest
+number of children or purchase threshold (waiting longer to buy usually
+costs net worth).
+"""
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+
+from app.services.monte_carlo import RENT_PCT_OF_SALARY, IncomePaths
+
+# parameter -> (integer?, default bounds, default tolerance, prefer "min" or "max")
+SOLVABLE_PARAMS = {
+    "savings_rate": (False, None, 0.001, "min"),  # bounds depend on rent_pc_baseline
+    "salary_to_buy_house": (False, (0.0, 500_000.0), 100.0, "max"),
+    "years": (True, (1, 60), None, "min"),
+    "num_children": (True, (0, 6), None, "max"),
+}
+
+MAX_YEARS = 100
+MAX_CHILDREN = 20
+
+# points evaluated to bracket a continuous parameter before bisecting
+BRACKET_POINTS = 9
+MAX_BISECTIONS = 60
+
+
+@dataclass(frozen=True)
+class GoalSpec:
+    parameter: str
+    metric: str
+    target: float
+    bounds: tuple
+    tolerance: Optional[float]
+
+    @property
+    def integer(self) -> bool:
+        return SOLVABLE_PARAMS[self.parameter][0]
+
+    @property
+    def prefer(self) -> str:
+        return SOLVABLE_PARAMS[self.parameter][3]
+
+    @classmethod
+    def from_request(cls, data: dict, params: dict) -> "GoalSpec":
+        """Validates the "solve" block of a request. Raises ValueError."""
+        if not isinstance(data, dict):
+            raise ValueError("solve must be an object")
+        parameter = data.get("parameter")
+        if parameter not in SOLVABLE_PARAMS:
+            raise ValueError(f"parameter must be one of {', '.join(SOLVABLE_PARAMS)}")
+        integer, default_bounds, default_tolerance, _ = SOLVABLE_PARAMS[parameter]
+
+        metric = str(data.get("metric") or "median").lower()
+        metric_percentile(metric)  # validates
+
+        try:
+            target = float(data["target"])
+        except (KeyError, TypeError, ValueError):
+            raise ValueError("target must be a number") from None
+
+        if default_bounds is None:
+            default_bounds = (0.0, 1.0 - float(params.get("rent_pc_baseline", RENT_PCT_OF_SALARY)))
+        bounds = data.get("bounds") or default_bounds
+        try:
+            lo, hi = (int(b) if integer else float(b) for b in bounds)
+        except (TypeError, ValueError):
+            raise ValueError("bounds must be a pair of numbers") from None
+        if lo > hi:
+            raise ValueError("bounds must be [low, high]")
+        if parameter == "years" and not 1 <= lo <= hi <= MAX_YEARS:
+            raise ValueError(f"years bounds must be within 1-{MAX_YEARS}")
+        if parameter == "num_children" and not 0 <= lo <= hi <= MAX_CHILDREN:
+            raise ValueError(f"num_children bounds must be within 0-{MAX_CHILDREN}")
+        if parameter == "savings_rate" and not 0 <= lo <= hi <= default_bounds[1]:
+            raise ValueError(f"savings_rate bounds must be within 0-{default_bounds[1]:g}")
+
+        tolerance = None
+        if not integer:
+            tolerance = float(data.get("tolerance") or default_tolerance)
+            if tolerance <= 0:
+                raise ValueError("tolerance must be positive")
+        return cls(parameter, metric, target, (lo, hi), tolerance)
+
+
+def metric_percentile(metric: str) -> Optional[float]:
+    """Percentile a metric stands for (None for the mean). Raises ValueError on unknown metrics."""
+    if metric == "mean":
+        return None
+    if metric == "median":
+        return 50.0
+    if metric.startswith("p"):
+        try:
+            percentile = float(metric[1:])
+        except ValueError:
+            percentile = -1.0
+        if 0 < percentile < 100:
+            return percentile
+    raise ValueError("metric must be mean, median or p<percentile> (e.g. p25)")
+
+
+def metric_value(networths: np.ndarray, metric: str, axis: int = None):
+    percentile = metric_percentile(metric)
+    if percentile is None:
+        return np.mean(networths, axis=axis)
+    return np.percentile(networths, percentile, axis=axis)
+
+
+def solve_continuous(evaluate, lo: float, hi: float, target: float, tolerance: float, prefer: str = "min") -> dict:
+    """
+    Finds the smallest x in [lo, hi] with evaluate(x) >= target (the largest,
+    for prefer="max"): a grid of BRACKET_POINTS brackets the first crossing,
+    then bisection narrows it to `tolerance`. Net worth is not guaranteed to
+    be monotone in every parameter, so this is the first crossing the grid
+    sees. Returns the value (None when no grid point meets the target) and
+    every [x, metric] evaluated.
+    """
+    trace = []
+
+    def meets(x):
+        value = float(evaluate(x))
+        trace.append([float(x), value])
+        return value >= target
+
+    grid = np.linspace(lo, hi, BRACKET_POINTS)
+    if prefer == "max":
+        grid = grid[::-1]
+    previous = None
+    for x in grid:
+        if meets(x):
+            break
+        previous = x
+    else:
+        return {"value": None, "trace": trace}
+    if previous is None:
+        return {"value": float(x), "trace": trace}
+
+    # `previous` misses the target and `x` meets it
+    failing, passing = previous, x
+    for _ in range(MAX_BISECTIONS):
+        if abs(passing - failing) <= tolerance:
+            break
+        middle = (failing + passing) / 2
+        if meets(middle):
+            passing = middle
+        else:
+            failing = middle
+    return {"value": float(passing), "trace": trace}
+
+
+def solve_integer(metrics: dict, target: float, prefer: str = "min") -> dict:
+    """Smallest (or largest) key of {value: metric} whose metric meets the target."""
+    order = sorted(metrics, reverse=prefer == "max")
+    trace = [[int(k), float(metrics[k])] for k in sorted(metrics)]
+    value = next((k for k in order if metrics[k] >= target), None)
+    return {"value": None if value is None else int(value), "trace": trace}
+
+
+def solve_years(guesses: dict, evaluate, target: float, lo: int, hi: int) -> dict:
+    """
+    Smallest horizon in [lo, hi] whose run meets the target. guesses maps
+    horizons to a cheap estimate of the metric; evaluate(years) is the
+    metric of a run at exactly that horizon. Starting from the first
+    horizon the guesses put over the target, walks down while the shorter
+    horizon still meets it and up until one does, so the answer and the
+    horizon below it are both checked with exact runs.
+    """
+    exact = {}
+
+    def meets(years):
+        if years not in exact:
+            exact[years] = float(evaluate(years))
+        return exact[years] >= target
+
+    years = next((y for y in sorted(guesses) if guesses[y] >= target), hi)
+    value = None
+    if meets(years):
+        while years > lo and meets(years - 1):
+            years -= 1
+        value = years
+    else:
+        while years < hi:
+            years += 1
+            if meets(years):
+                value = years
+                break
+    return {"value": value, "trace": [[y, metric] for y, metric in sorted(exact.items())]}
+
+
+def seek_goal(
+    spec: GoalSpec,
+    params: dict,
+    home_values,
+    networth_base=None,
+    income_paths: IncomePaths = None,
+    run_horizon=None,
+) -> dict:
+    """
+    Solves spec for params. savings_rate and num_children evaluate on the
+    run's NetworthBase; salary_to_buy_house on its IncomePaths. years needs
+    IncomePaths spanning spec.bounds[1] years, and run_horizon(years) ->
+    final net worths of a run at exactly that horizon. Raises ValueError
+    when the stage the parameter needs is missing.
+    """
+    lo, hi = spec.bounds
+    if spec.parameter in ("savings_rate", "num_children"):
+        if networth_base is None:
+            raise ValueError(f"{spec.parameter} needs the run's NetworthBase")
+
+        def evaluate(x):
+            return metric_value(networth_base.networths({**params, spec.parameter: x}), spec.metric)
+
+    else:
+        if income_paths is None:
+            raise ValueError(f"{spec.parameter} needs the run's IncomePaths")
+
+        def evaluate(x):
+            changed = {**params, spec.parameter: x}
+            return metric_value(income_paths.networths(changed, home_values), spec.metric)
+
+    if spec.parameter == "years":
+        if run_horizon is None:
+            raise ValueError("years needs a run_horizon")
+        # end-of-year net worth of one long run estimates every shorter horizon;
+        # a run of that horizon draws its shocks differently, so confirm with those
+        by_year = income_paths.networths(params, home_values, yearly=True)
+        guesses = metric_value(by_year[:, lo - 1:hi], spec.metric, axis=0)
+        result = solve_years(
+            dict(zip(range(lo, hi + 1), guesses)),
+            lambda years: metric_value(run_horizon(years), spec.metric),
+            spec.target,
+            lo,
+            hi,
+        )
+    elif spec.integer:
+        result = solve_integer({n: evaluate(n) for n in range(lo, hi + 1)}, spec.target, spec.prefer)
+    else:
+        result = solve_continuous(evaluate, lo, hi, spec.target, spec.tolerance, spec.prefer)
+
+    value = result["value"]
+    achieved = None
+    if value is not None:
+        achieved = next(metric for x, metric in reversed(result["trace"]) if x == value)
+    return {
+        "parameter": spec.parameter,
+        "metric": spec.metric,
+        "target": spec.target,
+        "bounds": list(spec.bounds),
+        "value": value,
+        "achieved": achieved,
+        "feasible": value is not None,
+        "evaluations": len(result["trace"]),
+        "trace": result["trace"],
+    }
@@ -0,0 +1,60 @@
+"""
+Home values by salary bucket, compiled from the "Home Value & Rent Value
+Table".
+
+The table is keyed by starting salary in 20k steps. It is precompiled into
+dense arrays indexed by bucket number (round(salary / 20k)) for the eager
+and conservative columns, so looking up the home bought at any number of
+salaries is a single fancy-indexing pass. Buckets the table does not cover
+fall back to its first row, as the DataFrame lookup always has.
+"""
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+HOME_PRICE_BUCKET = 20_000
+
+EAGER_HOME_VALUE_COL = "Home Value (3x) (eager spending)"
+CONSERVATIVE_HOME_VALUE_COL = "Home Value (2.5x) (conservative spending)"
+
+
+@dataclass(frozen=True)
+class HomeValueTable:
+    # dense arrays indexed by salary bucket; the extra last slot holds the
+    # row-0 fallback used for any bucket outside the table
+    eager: np.ndarray
+    conservative: np.ndarray
+    bucket_size: int = HOME_PRICE_BUCKET
+
+    @classmethod
+    def from_df(cls, home_and_rental_table: pd.DataFrame, bucket_size: int = HOME_PRICE_BUCKET) -> "HomeValueTable":
+        salaries = home_and_rental_table["Starting Salary"].to_numpy(dtype=float)
+        columns = (
+            home_and_rental_table[EAGER_HOME_VALUE_COL].to_numpy(dtype=float),
+            home_and_rental_table[CONSERVATIVE_HOME_VALUE_COL].to_numpy(dtype=float),
+        )
+
+        # only rows sitting exactly on a bucket can ever be matched
+        on_bucket = (salaries >= 0) & (salaries % bucket_size == 0)
+        buckets = (salaries[on_bucket] // bucket_size).astype(np.int64)
+        size = int(buckets.max()) + 2 if len(buckets) else 1
+
+        dense = []
+        for values in columns:
+            # missing buckets (and the trailing slot) fall back to row 0
+            array = np.full(size, values[0] if len(values) else np.nan)
+            # reversed so that the first row wins for duplicate salaries
+            array[buckets[::-1]] = values[on_bucket][::-1]
+            dense.append(array)
+
+        return cls(eager=dense[0], conservative=dense[1], bucket_size=bucket_size)
+
+    def lookup(self, salaries, spending_type) -> np.ndarray:
+        """Home value bought at each salary, for "eager" or conservative spending."""
+        values = self.eager if spending_type == "eager" else self.conservative
+        buckets = np.round(np.asarray(salaries, dtype=float) / self.bucket_size)
+        fallback = len(values) - 1
+        in_table = (buckets >= 0) & (buckets < fallback)
+        index = np.where(in_table, buckets, fallback).astype(np.int64)
+        return values[index]
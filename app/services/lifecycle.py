@@ -0,0 +1,437 @@
+"""
+Multi-account lifecycle projections for advisor-supplied profiles.
+
+The extended profile format (see the Washington, D.C. use-case CSV in app/)
+describes someone mid-career: current 401k/IRA/taxable balances and
+contribution rates, any number of amortizing loans (loans_json), an
+existing mortgage and home, and a child-cost window. Each profile is
+projected from current_age to retire_age:
+
+- salary compounds at salary_growth_mu + salary_growth_sigma * z
+- the 401k contribution is pre-tax, then effective_tax_rate applies
+- lifestyle_spend_pct is a share of take-home pay
+- loans and the mortgage follow fixed annual amortization schedules
+- whatever is left after spending, the IRA contribution, debt payments and
+  child costs goes to the taxable account (a shortfall draws it down)
+- all three accounts earn the same stochastic market return; the taxable
+  account loses TAXABLE_RETURN_DRAG of it to tax on gains
+- the home appreciates at home_growth_mu + home_growth_sigma * z
+
+Salaries, spending and costs in the format are already in local dollars,
+so the location_cola column is informational and not read.
+
+Many profiles are stepped together, each account balance (and salary and
+home value) held as its own (profiles, samples) matrix, and debt schedules
+are computed in closed form for every loan of every profile at once. All profiles see the same seeded
+salary, home and market shocks, so a profile's result does not depend on
+which other profiles it was projected with.
+"""
+import json
+import math
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from app.services.monte_carlo import DEFAULT_MEMORY_LIMIT_MB, DEFAULT_SEED
+from app.services.streaming_stats import DEFAULT_PERCENTILES, percentile_label
+
+ACCOUNTS = ("401k", "ira", "taxable")
+
+MARKET_RETURN_MU = 0.06
+MARKET_RETURN_SIGMA = 0.15
+TAXABLE_RETURN_DRAG = 0.005
+
+MAX_HORIZON_YEARS = 80
+MAX_LIFECYCLE_PROFILES = 5_000
+
+# upper bound on profiles x samples stepped through the year loop together
+MAX_PROFILE_CELLS = 2_000_000
+
+# measured memory: state held per (profile, sample) cell of a chunk, and the
+# three shared shock matrices per (sample, year)
+PROFILE_BYTES_PER_CELL = 64
+SHOCK_BYTES_PER_CELL = 24
+
+# numeric columns of the profile format; loans_json and profile_id are handled separately
+NUMERIC_FIELDS = (
+    "current_age",
+    "retire_age",
+    "starting_salary",
+    "salary_growth_mu",
+    "salary_growth_sigma",
+    "lifestyle_spend_pct",
+    "effective_tax_rate",
+    "balance_401k",
+    "balance_ira",
+    "balance_taxable",
+    "annual_401k_contrib_pct",
+    "annual_ira_contrib",
+    "mortgage_balance",
+    "mortgage_apr",
+    "mortgage_term_years",
+    "home_value",
+    "home_growth_mu",
+    "home_growth_sigma",
+    "annual_children_cost",
+    "children_years",
+)
+
+# columns that default to 0 when left out (no account, loan, home or children)
+OPTIONAL_FIELDS = (
+    "balance_401k",
+    "balance_ira",
+    "balance_taxable",
+    "annual_401k_contrib_pct",
+    "annual_ira_contrib",
+    "mortgage_balance",
+    "mortgage_apr",
+    "mortgage_term_years",
+    "home_value",
+    "home_growth_mu",
+    "home_growth_sigma",
+    "annual_children_cost",
+    "children_years",
+)
+
+FRACTION_FIELDS = ("lifestyle_spend_pct", "effective_tax_rate", "annual_401k_contrib_pct")
+
+
+@dataclass(frozen=True)
+class Loan:
+    name: str
+    balance: float
+    apr: float
+    term_years: int
+
+
+@dataclass(frozen=True)
+class LifecycleProfile:
+    profile_id: str
+    intended_career: str
+    intended_location: str
+    current_age: int
+    retire_age: int
+    starting_salary: float
+    salary_growth_mu: float
+    salary_growth_sigma: float
+    lifestyle_spend_pct: float
+    effective_tax_rate: float
+    balance_401k: float
+    balance_ira: float
+    balance_taxable: float
+    annual_401k_contrib_pct: float
+    annual_ira_contrib: float
+    loans: tuple
+    mortgage_balance: float
+    mortgage_apr: float
+    mortgage_term_years: int
+    home_value: float
+    home_growth_mu: float
+    home_growth_sigma: float
+    annual_children_cost: float
+    children_years: int
+
+    @property
+    def horizon(self) -> int:
+        return self.retire_age - self.current_age
+
+    @classmethod
+    def from_record(cls, record: dict) -> "LifecycleProfile":
+        """Validates one CSV row or JSON object of the profile format. Raises ValueError."""
+        values = {}
+        for name in NUMERIC_FIELDS:
+            value = record.get(name)
+            if _missing(value):
+                if name not in OPTIONAL_FIELDS:
+                    raise ValueError(f"{name} is required")
+                value = 0.0
+            values[name] = _number(name, value)
+            if values[name] < 0 and name not in ("salary_growth_mu", "home_growth_mu"):
+                raise ValueError(f"{name} must not be negative")
+        for name in FRACTION_FIELDS:
+            if values[name] > 1:
+                raise ValueError(f"{name} must be between 0 and 1")
+        for name in ("current_age", "retire_age", "mortgage_term_years", "children_years"):
+            if values[name] != int(values[name]):
+                raise ValueError(f"{name} must be a whole number")
+            values[name] = int(values[name])
+
+        if values["starting_salary"] <= 0:
+            raise ValueError("starting_salary must be positive")
+        if not 0 < values["retire_age"] - values["current_age"] <= MAX_HORIZON_YEARS:
+            raise ValueError(f"retire_age must be 1-{MAX_HORIZON_YEARS} years after current_age")
+        if values["mortgage_balance"] > 0 and values["mortgage_term_years"] <= 0:
+            raise ValueError("mortgage_term_years must be positive when there is a mortgage_balance")
+
+        return cls(
+            profile_id=str(record.get("profile_id") or ""),
+            intended_career=str(record.get("intended_career") or ""),
+            intended_location=str(record.get("intended_location") or ""),
+            loans=parse_loans(record.get("loans_json")),
+            **values,
+        )
+
+
+def _missing(value) -> bool:
+    return value is None or value == "" or (isinstance(value, float) and math.isnan(value))
+
+
+def _number(name: str, value) -> float:
+    if isinstance(value, bool):
+        raise ValueError(f"{name} must be a number")
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"{name} must be a number") from None
+    if not math.isfinite(number):
+        raise ValueError(f"{name} must be a number")
+    return number
+
+
+def parse_loans(value) -> tuple:
+    """loans_json (a JSON string, or an already decoded list) -> tuple of Loan."""
+    if _missing(value):
+        return ()
+    if isinstance(value, str):
+        try:
+            value = json.loads(value)
+        except json.JSONDecodeError:
+            raise ValueError("loans_json must be a JSON list of loans") from None
+    if not isinstance(value, list):
+        raise ValueError("loans_json must be a JSON list of loans")
+
+    loans = []
+    for i, loan in enumerate(value):
+        if not isinstance(loan, dict):
+            raise ValueError(f"loans_json[{i}] must be an object")
+        balance = _number(f"loans_json[{i}].balance", loan.get("balance"))
+        apr = _number(f"loans_json[{i}].apr", loan.get("apr", 0.0))
+        term_years = _number(f"loans_json[{i}].term_years", loan.get("term_years"))
+        if balance < 0 or apr < 0:
+            raise ValueError(f"loans_json[{i}] balance and apr must not be negative")
+        if term_years != int(term_years) or (balance > 0 and term_years <= 0):
+            raise ValueError(f"loans_json[{i}].term_years must be a positive whole number")
+        loans.append(Loan(str(loan.get("name") or f"loan_{i}"), balance, apr, int(term_years)))
+    return tuple(loans)
+
+
+def amortization_schedules(balance, apr, term_years, years: int):
+    """
+    Fixed-payment annual amortization for arrays of loans at once. Returns
+    (payments, balances), each of shape balance.shape + (years,): the
+    payment made in each year and the balance left at its end. Loans are
+    paid off after term_years and cost nothing afterwards.
+    """
+    balance = np.asarray(balance, dtype=float)[..., None]
+    rate = np.asarray(apr, dtype=float)[..., None]
+    term = np.asarray(term_years, dtype=float)[..., None]
+    k = np.arange(1, years + 1, dtype=float)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        growth_term = (1.0 + rate) ** term
+        payment = np.where(
+            rate > 0, balance * rate * growth_term / (growth_term - 1.0), balance / term
+        )
+        growth_k = (1.0 + rate) ** k
+        remaining = np.where(
+            rate > 0, balance * growth_k - payment * (growth_k - 1.0) / rate, balance - payment * k
+        )
+    open_loan = (term > 0) & (balance > 0)
+    payments = np.where(open_loan & (k <= term), payment, 0.0)
+    balances = np.where(open_loan & (k < term), np.maximum(remaining, 0.0), 0.0)
+    return payments, balances
+
+
+class ProfileBatch:
+    """Profiles stacked into per-field arrays, with every debt padded into one (profiles, debts) table."""
+
+    def __init__(self, profiles: list):
+        self.profiles = list(profiles)
+
+        def column(name, dtype=float):
+            return np.array([getattr(p, name) for p in self.profiles], dtype=dtype)
+
+        self.columns = {name: column(name) for name in NUMERIC_FIELDS}
+        self.horizons = column("horizon", dtype=int)
+
+        # the mortgage is just one more amortizing debt
+        max_debts = 1 + max((len(p.loans) for p in self.profiles), default=0)
+        self.debt_balance = np.zeros((len(self.profiles), max_debts))
+        self.debt_apr = np.zeros_like(self.debt_balance)
+        self.debt_term = np.zeros_like(self.debt_balance)
+        for i, p in enumerate(self.profiles):
+            self.debt_balance[i, 0] = p.mortgage_balance
+            self.debt_apr[i, 0] = p.mortgage_apr
+            self.debt_term[i, 0] = p.mortgage_term_years
+            for j, loan in enumerate(p.loans, start=1):
+                self.debt_balance[i, j] = loan.balance
+                self.debt_apr[i, j] = loan.apr
+                self.debt_term[i, j] = loan.term_years
+
+    def __len__(self):
+        return len(self.profiles)
+
+
+def draw_market_shocks(num_samples: int, years: int, seed: int = DEFAULT_SEED):
+    """
+    Seeded (salary, home, market) shock matrices of shape (num_samples, years),
+    shared by every profile. Each comes from its own stream and is drawn year
+    by year, so the first k years are the same whatever `years` is.
+    """
+    streams = np.random.SeedSequence(seed).spawn(3)
+    return tuple(np.random.default_rng(s).standard_normal((years, num_samples)).T for s in streams)
+
+
+def project_batch(batch: ProfileBatch, shocks, percentiles=DEFAULT_PERCENTILES) -> list:
+    """
+    Projects every profile of the batch over the shared shocks and returns
+    one summary dict per profile, in order.
+    """
+    salary_shocks, home_shocks, market_shocks = shocks
+    num_samples = salary_shocks.shape[0]
+    horizon = int(batch.horizons.max())
+
+    # longest horizons first, so the profiles still working in a given year
+    # are a leading slice and retired ones simply stop being updated
+    order = np.argsort(-batch.horizons, kind="stable")
+    horizons = batch.horizons[order]
+    still_working = np.searchsorted(-horizons, -np.arange(horizon), side="left")
+    c = {name: values[order, None] for name, values in batch.columns.items()}
+
+    payments, balances = amortization_schedules(
+        batch.debt_balance[order], batch.debt_apr[order], batch.debt_term[order], horizon
+    )
+    mortgage_left = balances[:, 0, :]
+    debt_left = balances.sum(axis=1)
+
+    # per-profile cash flows that do not depend on the salary draw
+    contribution_rate = c["annual_401k_contrib_pct"]
+    surplus_rate = (1.0 - contribution_rate) * (1.0 - c["effective_tax_rate"]) * (1.0 - c["lifestyle_spend_pct"])
+    child_years = np.arange(horizon) < c["children_years"]
+    fixed_outflow = payments.sum(axis=1) + c["annual_ira_contrib"] + np.where(child_years, c["annual_children_cost"], 0.0)
+
+    def start(name):
+        return np.repeat(c[name], num_samples, axis=1)
+
+    salary = start("starting_salary")
+    balance_401k, balance_ira, balance_taxable = start("balance_401k"), start("balance_ira"), start("balance_taxable")
+    home_value = start("home_value")
+    mean_net_worth = np.zeros((len(batch), horizon))
+
+    for year in range(horizon):
+        n = still_working[year]
+        working_salary = salary[:n]
+        market_growth = 1.0 + MARKET_RETURN_MU + MARKET_RETURN_SIGMA * market_shocks[:, year]
+
+        # returns accrue on the start-of-year balance, contributions land at year end;
+        # a negative taxable balance (unfunded shortfall) earns nothing
+        balance_401k[:n] *= market_growth
+        balance_401k[:n] += working_salary * contribution_rate[:n]
+        balance_ira[:n] *= market_growth
+        balance_ira[:n] += c["annual_ira_contrib"][:n]
+        taxable = balance_taxable[:n]
+        np.multiply(taxable, market_growth - TAXABLE_RETURN_DRAG, out=taxable, where=taxable > 0)
+        taxable += working_salary * surplus_rate[:n] - fixed_outflow[:n, year, None]
+
+        home_value[:n] *= 1.0 + c["home_growth_mu"][:n] + c["home_growth_sigma"][:n] * home_shocks[:, year]
+        working_salary *= 1.0 + c["salary_growth_mu"][:n] + c["salary_growth_sigma"][:n] * salary_shocks[:, year]
+
+        mean_net_worth[:n, year] = (
+            balance_401k[:n].mean(axis=1) + balance_ira[:n].mean(axis=1) + taxable.mean(axis=1)
+            + home_value[:n].mean(axis=1) - debt_left[:n, year]
+        )
+
+    # state stops changing once a profile retires, so this is net worth at retirement
+    rows = np.arange(len(batch))
+    final_debt = debt_left[rows, horizons - 1]
+    final_mortgage = mortgage_left[rows, horizons - 1]
+    accounts = (balance_401k, balance_ira, balance_taxable)
+    net_worth = sum(accounts) + home_value - final_debt[:, None]
+    bands = np.percentile(net_worth, percentiles, axis=1) if percentiles else None
+
+    # back to input order
+    position = np.empty_like(order)
+    position[order] = rows
+
+    results = []
+    for profile, i in zip(batch.profiles, position):
+        summary = {"mean": float(net_worth[i].mean()), "stdev": float(net_worth[i].std())}
+        if bands is not None:
+            summary.update({percentile_label(p): float(bands[k, i]) for k, p in enumerate(percentiles)})
+        results.append(
+            {
+                "profile_id": profile.profile_id,
+                "current_age": profile.current_age,
+                "retire_age": profile.retire_age,
+                "years": profile.horizon,
+                "net_worth": summary,
+                "accounts": {name: float(balances[i].mean()) for name, balances in zip(ACCOUNTS, accounts)},
+                "home_equity": float(home_value[i].mean() - final_mortgage[i]),
+                "remaining_debt": float(final_debt[i]),
+                "mean_net_worth_by_age": [float(v) for v in mean_net_worth[i, :profile.horizon]],
+            }
+        )
+    return results
+
+
+def profile_chunk_size(num_samples: int, horizon: int, memory_limit_mb: float = DEFAULT_MEMORY_LIMIT_MB) -> int:
+    """
+    Profiles projected together: at most MAX_PROFILE_CELLS cells, and what
+    fits in memory_limit_mb next to the shocks. Raises ValueError when not
+    even one profile fits.
+    """
+    budget = memory_limit_mb * 2**20 - SHOCK_BYTES_PER_CELL * num_samples * horizon
+    fits = int(budget // (PROFILE_BYTES_PER_CELL * num_samples))
+    if fits < 1:
+        raise ValueError(
+            f"{num_samples} samples over {horizon} years do not fit in the "
+            f"{memory_limit_mb} MB simulation memory limit"
+        )
+    return min(fits, max(1, MAX_PROFILE_CELLS // num_samples))
+
+
+def project_profiles(
+    records,
+    num_samples: int = 1_000,
+    percentiles=DEFAULT_PERCENTILES,
+    memory_limit_mb: float = DEFAULT_MEMORY_LIMIT_MB,
+) -> list:
+    """
+    Bulk mode: validates and projects a whole list of profile records (CSV
+    rows or JSON objects) and returns results in input order. Invalid rows
+    come back as {"profile_id", "error"} instead of failing the run. Valid
+    profiles are projected in chunks sized by profile_chunk_size; a
+    num_samples too large for memory_limit_mb raises ValueError.
+    """
+    if num_samples <= 0:
+        raise ValueError("num_samples must be positive")
+
+    results = [None] * len(records)
+    valid = []
+    for i, record in enumerate(records):
+        try:
+            if not isinstance(record, dict):
+                raise ValueError("Each profile must be a JSON object")
+            valid.append((i, LifecycleProfile.from_record(record)))
+        except ValueError as e:
+            profile_id = record.get("profile_id") if isinstance(record, dict) else None
+            results[i] = {"profile_id": profile_id, "error": str(e)}
+
+    if valid:
+        horizon = max(profile.horizon for _, profile in valid)
+        chunk_size = profile_chunk_size(num_samples, horizon, memory_limit_mb)
+        shocks = draw_market_shocks(num_samples, horizon)
+        for start in range(0, len(valid), chunk_size):
+            chunk = valid[start:start + chunk_size]
+            batch = ProfileBatch([profile for _, profile in chunk])
+            chunk_shocks = tuple(s[:, : int(batch.horizons.max())] for s in shocks)
+            for (i, _), result in zip(chunk, project_batch(batch, chunk_shocks, percentiles)):
+                results[i] = result
+    return results
+
+
+def read_profiles(path: str) -> list:
+    """Profile records from a CSV in the extended profile format."""
+    df = pd.read_csv(path, dtype={"profile_id": str})
+    return df.to_dict("records")
@@ -0,0 +1,794 @@
+"""
+Vectorized Monte Carlo engine for the net worth simulation.
+
+The whole samples x years growth matrix is drawn up front and every sample
+path is moved forward together with array operations, so a run costs a few
+NumPy passes per simulated year instead of one Python iteration (plus pandas
+filtering) per (sample, year) cell. Taxes and home values come from the
+precompiled TaxBrackets and HomeValueTable arrays.
+
+Draws are taken from the generator in the same row-major order the old
+scalar loop used, so for a given seed each sample sees exactly the same
+growth shocks as before.
+"""
+import time
+from dataclasses import asdict, dataclass
+from typing import Optional
+
+import numpy as np
+
+from app.services.home_values import HomeValueTable
+from app.services.sampling import SAMPLING_MODES, ShockSampler
+from app.services.streaming_stats import (
+    DEFAULT_PERCENTILES,
+    RunningMoments,
+    YearlyQuantileSketch,
+    parse_percentiles,
+    percentile_label,
+)
+from app.services.tax_tables import TaxBrackets
+
+ENGINE_VERSION = "vectorized-1"
+DEFAULT_SEED = 42
+
+# samples simulated per block when results are streamed into running statistics
+BLOCK_SIZE = 10_000
+
+# smaller blocks when progress is reported to a client after each one
+STREAM_BLOCK_SIZE = 2_000
+
+# dtype of the (samples, years) path matrices; float32 halves their memory
+PRECISIONS = {"float64": np.float64, "float32": np.float32}
+
+# peak bytes per (sample, year) cell of one simulate_networths call: the
+# shocks plus the salary, tax and after-tax working arrays, measured with
+# tracemalloc (float32 runs still index the tax brackets with int64)
+PATH_BYTES_PER_CELL = {"float64": 57, "float32": 37}
+
+# default ceiling on the path matrices of one run (SIMULATION_MEMORY_LIMIT_MB)
+DEFAULT_MEMORY_LIMIT_MB = 256
+
+# a single run can be split into at most this many independently seeded shards
+MAX_SHARDS = 64
+
+# deadline runs plan their blocks against this share of the remaining budget,
+# leaving the rest for params, serialization and misprediction
+DEADLINE_HEADROOM = 0.8
+MAX_DEADLINE_MS = 60_000
+
+# adaptive runs start with MIN_ADAPTIVE_SAMPLES and never exceed MAX_ADAPTIVE_SAMPLES
+MIN_ADAPTIVE_SAMPLES = 50
+MAX_ADAPTIVE_SAMPLES = 20_000
+
+RENT_PCT_OF_SALARY = 0.3
+DOWN_PAYMENT_PCT = 0.09
+MORTGAGE_RATE = 0.05
+MORTGAGE_TERM_YEARS = 30
+
+# params that only enter the final cash-flow stage (see NetworthBase)
+DOWNSTREAM_PARAMS = ("num_children", "annual_child_cost", "savings_rate", "rent_pc_baseline")
+
+@dataclass(frozen=True)
+class SimulationOptions:
+    """
+    Optional engine behaviour requested by a client, on top of the params,
+    num_samples and years every run has. Part of the result cache key.
+    """
+    percentiles: Optional[tuple] = None  # per-year net worth bands
+    rel_tol: Optional[float] = None  # adaptive mode: target standard error / |mean|
+    max_samples: int = MAX_ADAPTIVE_SAMPLES  # adaptive mode sample cap
+    sampling: str = "pseudo"  # shock source, see app/services/sampling.py
+    precision: str = "float64"  # dtype of the path matrices, see PRECISIONS
+    shards: int = 1  # split the samples into this many independently seeded shards
+    deadline_ms: Optional[float] = None  # fit the sample count to this latency budget
+
+    @classmethod
+    def from_request(cls, data: dict) -> "SimulationOptions":
+        rel_tol = data.get("rel_tol")
+        if rel_tol is not None:
+            rel_tol = float(rel_tol)
+            if not 0 < rel_tol < 1:
+                raise ValueError("rel_tol must be between 0 and 1")
+
+        max_samples = int(data.get("max_samples", MAX_ADAPTIVE_SAMPLES))
+        if max_samples <= 0:
+            raise ValueError("max_samples must be positive")
+
+        sampling = str(data.get("sampling") or "pseudo").lower()
+        if sampling not in SAMPLING_MODES:
+            raise ValueError(f"sampling must be one of {', '.join(SAMPLING_MODES)}")
+
+        precision = str(data.get("precision") or "float64").lower()
+        if precision not in PRECISIONS:
+            raise ValueError(f"precision must be one of {', '.join(PRECISIONS)}")
+
+        shards = int(data.get("shards") or 1)
+        if not 1 <= shards <= MAX_SHARDS:
+            raise ValueError(f"shards must be between 1 and {MAX_SHARDS}")
+        if shards > 1 and rel_tol is not None:
+            raise ValueError("shards cannot be combined with rel_tol")
+
+        deadline_ms = data.get("deadline_ms")
+        if deadline_ms is not None:
+            deadline_ms = float(deadline_ms)
+            if not 0 < deadline_ms <= MAX_DEADLINE_MS:
+                raise ValueError(f"deadline_ms must be between 0 and {MAX_DEADLINE_MS}")
+            if shards > 1:
+                raise ValueError("shards cannot be combined with deadline_ms")
+
+        return cls(
+            percentiles=parse_percentiles(data.get("percentiles")),
+            rel_tol=rel_tol,
+            max_samples=max_samples,
+            sampling=sampling,
+            precision=precision,
+            shards=shards,
+            deadline_ms=deadline_ms,
+        )
+
+    @property
+    def adaptive(self) -> bool:
+        return self.rel_tol is not None
+
+    def cache_fields(self) -> dict:
+        return asdict(self)
+
+
+def run_size(data: dict, default_years: int = 20, default_num_samples: int = 100) -> tuple:
+    """(years, num_samples) of a request. Raises ValueError unless both are positive."""
+    years = int(data.get("years", default_years))
+    num_samples = int(data.get("num_samples", default_num_samples))
+    if years <= 0 or num_samples <= 0:
+        raise ValueError("years and num_samples must be positive")
+    return years, num_samples
+
+
+# gets a yearly home payment based on the principal (works on scalars and arrays)
+def get_home_payment(principal):
+    term_years = MORTGAGE_TERM_YEARS
+    annual_rate = MORTGAGE_RATE
+    yearly_payment_num = annual_rate * ((1 + annual_rate) ** term_years)
+    yearly_payment_denom = ((1 + annual_rate) ** term_years) - 1
+    yearly_payment = principal * (yearly_payment_num / yearly_payment_denom)
+    return yearly_payment
+
+
+def spending_fraction(params: dict) -> float:
+    """
+    Share of after-tax income spent each year: what is left after the rent
+    baseline and the savings rate (0.5 for eager, 0.4 for conservative with
+    the defaults get_params sets). Params without a savings_rate fall back to
+    those spending-type defaults.
+    """
+    savings_rate = params.get("savings_rate")
+    if savings_rate is None:
+        return 0.5 if params["spending_type"] == "eager" else 0.4
+    rent_pc = params.get("rent_pc_baseline", RENT_PCT_OF_SALARY)
+    # rounded so 1 - 0.3 - 0.2 is exactly the 0.5 the engine has always used
+    return round(1.0 - float(rent_pc) - float(savings_rate), 10)
+
+
+def draw_shocks(rng: np.random.Generator, num_samples: int, years: int) -> np.ndarray:
+    """
+    Standard normal salary shocks, one row per sample. Consumed row-major, in
+    the same order the scalar engine called rng.normal.
+    """
+    return rng.standard_normal((num_samples, years))
+
+
+def salary_paths(starting_salary, salary_mu, salary_sigma, shocks: np.ndarray) -> np.ndarray:
+    """Compounds the salary for every sample and year at once."""
+    num_samples, years = shocks.shape
+    factors = np.empty((num_samples, years + 1), dtype=shocks.dtype)
+    factors[:, 0] = starting_salary
+    factors[:, 1:] = 1.0 + (salary_mu + salary_sigma * shocks)
+    return np.cumprod(factors, axis=1)[:, 1:]
+
+
+def _project_networths(
+    salaries: np.ndarray,
+    after_tax_income: np.ndarray,
+    home_values: HomeValueTable,
+    eager,
+    home_growth_rate,
+    salary_to_buy_house,
+    spending_pct,
+    child_cost_total,
+    yearly: bool = False,
+) -> np.ndarray:
+    """
+    Steps the rent/buy/mortgage state machine and the cash balance across all
+    rows together. Row parameters are scalars or arrays with one entry per row.
+    Returns final net worth per row, or a (rows, years) matrix of end-of-year
+    net worth when yearly is set.
+    """
+    num_rows, years = salaries.shape
+    networth_by_year = np.empty((num_rows, years), dtype=salaries.dtype) if yearly else None
+    bought_a_house = np.zeros(num_rows, dtype=bool)
+    home_value = np.zeros(num_rows)
+    annual_payment = np.zeros(num_rows)
+    mortgage_balance = np.zeros(num_rows)
+    total_cash = np.zeros(num_rows)
+
+    # the housing state machine is path dependent, so it steps year by year
+    # across all samples together
+    for year in range(years):
+        local_salary = salaries[:, year]
+        owners = bought_a_house
+        buyers = ~owners & (local_salary >= salary_to_buy_house)
+        renters = ~owners & ~buyers
+
+        # existing owners: appreciate the home and pay down the mortgage
+        home_value = np.where(owners, home_value * (1.0 + home_growth_rate), home_value)
+        interest = mortgage_balance * MORTGAGE_RATE
+        principal_paid = annual_payment - interest
+        final_payment = principal_paid > mortgage_balance
+        principal_paid = np.where(final_payment, mortgage_balance, principal_paid)
+        effective_payment = np.where(final_payment, interest + principal_paid, annual_payment)
+        paying = owners & (mortgage_balance > 0)
+        mortgage_balance = np.where(paying, mortgage_balance - principal_paid, mortgage_balance)
+
+        rent_or_mortgage_payment = np.where(paying, effective_payment, 0.0)
+        rent_or_mortgage_payment = np.where(
+            renters, RENT_PCT_OF_SALARY * local_salary, rent_or_mortgage_payment
+        )
+
+        # first-time buyers: pick a home for their salary bracket and pay the down payment
+        if buyers.any():
+            buyer_salary = local_salary[buyers]
+            if np.ndim(eager) == 0:
+                new_home_value = home_values.lookup(buyer_salary, "eager" if eager else "conservative")
+            else:
+                new_home_value = np.where(
+                    eager[buyers],
+                    home_values.lookup(buyer_salary, "eager"),
+                    home_values.lookup(buyer_salary, "conservative"),
+                )
+            principal = (1 - DOWN_PAYMENT_PCT) * new_home_value
+            home_value[buyers] = new_home_value
+            annual_payment[buyers] = get_home_payment(principal)
+            mortgage_balance[buyers] = principal
+            rent_or_mortgage_payment[buyers] = DOWN_PAYMENT_PCT * new_home_value
+            bought_a_house = owners | buyers
+
+        income = after_tax_income[:, year]
+        total_cash += income - rent_or_mortgage_payment - spending_pct * income - child_cost_total
+        if yearly:
+            networth_by_year[:, year] = total_cash + home_value - mortgage_balance
+
+    if yearly:
+        return networth_by_year
+    return total_cash + home_value - mortgage_balance
+
+
+def simulate_networths(
+    params: dict,
+    tax_brackets: TaxBrackets,
+    home_values: HomeValueTable,
+    num_samples: int,
+    years: int,
+    rng: np.random.Generator = None,
+    shocks: np.ndarray = None,
+    yearly: bool = False,
+) -> np.ndarray:
+    """
+    Runs num_samples paths of `years` years and returns the final net worth
+    of every sample as a 1-D array (or a samples x years matrix of end-of-year
+    net worth with yearly=True). tax_brackets are the compiled brackets for
+    params["location"]. Pass precomputed `shocks` instead of `rng` to reuse
+    draws across runs.
+    """
+    if shocks is None:
+        shocks = draw_shocks(rng, num_samples, years)
+
+    salaries, after_tax_income = _after_tax_paths(params, tax_brackets, shocks)
+    return _project_networths(
+        salaries,
+        after_tax_income,
+        home_values,
+        eager=params["spending_type"] == "eager",
+        home_growth_rate=params["home_growth_rate"],
+        salary_to_buy_house=params["salary_to_buy_house"],
+        spending_pct=spending_fraction(params),
+        child_cost_total=params["annual_child_cost"] * params["num_children"],
+        yearly=yearly,
+    )
+
+
+def _after_tax_paths(params: dict, tax_brackets: TaxBrackets, shocks: np.ndarray):
+    salaries = salary_paths(
+        params["starting_salary"], params["salary_growth_mean"], params["salary_growth_sd"], shocks
+    )
+    # taxes depend only on salary, so they are computed for the whole matrix
+    return salaries, salaries - tax_brackets.tax(salaries)
+
+
+@dataclass(frozen=True)
+class IncomePaths:
+    """
+    Salary and after-tax income matrices for one set of shocks. They depend
+    only on the salary params, so runs that vary anything downstream of
+    them (the house purchase threshold, spending, children) can re-project
+    from the same arrays instead of recomputing salaries and taxes.
+    """
+    salaries: np.ndarray
+    after_tax_income: np.ndarray
+
+    @classmethod
+    def from_params(cls, params: dict, tax_brackets: TaxBrackets, shocks: np.ndarray) -> "IncomePaths":
+        return cls(*_after_tax_paths(params, tax_brackets, shocks))
+
+    def networths(self, params: dict, home_values: HomeValueTable, yearly: bool = False) -> np.ndarray:
+        """simulate_networths(params, ...) for params sharing these salary params and shocks."""
+        return _project_networths(
+            self.salaries,
+            self.after_tax_income,
+            home_values,
+            eager=params["spending_type"] == "eager",
+            home_growth_rate=params["home_growth_rate"],
+            salary_to_buy_house=params["salary_to_buy_house"],
+            spending_pct=spending_fraction(params),
+            child_cost_total=params["annual_child_cost"] * params["num_children"],
+            yearly=yearly,
+        )
+
+
+@dataclass(frozen=True)
+class NetworthBase:
+    """
+    The expensive part of a run, which none of DOWNSTREAM_PARAMS touch: salary
+    paths, taxes and the rent/buy/mortgage state machine (the purchase
+    trigger and home choice depend on salary and spending type only).
+    Spending and child costs are flat shares / amounts taken out of cash each
+    year, so the final net worth of any downstream variant is a per-sample
+    linear combination of two cached vectors.
+    """
+    base_networths: np.ndarray  # final net worth with nothing spent and no children
+    after_tax_totals: np.ndarray  # after-tax income summed over the run
+    years: int
+
+    @property
+    def nbytes(self) -> int:
+        """Memory held by the per-sample vectors (what the stage cache budgets)."""
+        return self.base_networths.nbytes + self.after_tax_totals.nbytes
+
+    def networths(self, params: dict) -> np.ndarray:
+        """Final net worth per sample for params that differ from the base only downstream."""
+        return (
+            self.base_networths
+            - spending_fraction(params) * self.after_tax_totals
+            - params["annual_child_cost"] * params["num_children"] * self.years
+        )
+
+
+def upstream_params(params: dict) -> dict:
+    """params without DOWNSTREAM_PARAMS: everything a NetworthBase depends on."""
+    return {name: value for name, value in params.items() if name not in DOWNSTREAM_PARAMS}
+
+
+def simulate_networth_base(
+    params: dict,
+    tax_brackets: TaxBrackets,
+    home_values: HomeValueTable,
+    num_samples: int,
+    years: int,
+    rng: np.random.Generator = None,
+    shocks: np.ndarray = None,
+) -> NetworthBase:
+    """Runs the upstream stages for params; see NetworthBase."""
+    if shocks is None:
+        shocks = draw_shocks(rng, num_samples, years)
+
+    salaries, after_tax_income = _after_tax_paths(params, tax_brackets, shocks)
+    base_networths = _project_networths(
+        salaries,
+        after_tax_income,
+        home_values,
+        eager=params["spending_type"] == "eager",
+        home_growth_rate=params["home_growth_rate"],
+        salary_to_buy_house=params["salary_to_buy_house"],
+        spending_pct=0.0,
+        child_cost_total=0.0,
+    )
+    return NetworthBase(base_networths, after_tax_income.sum(axis=1), years)
+
+
+def simulate_networths_batch(
+    params_list: list,
+    tax_brackets_list: list,
+    home_values: HomeValueTable,
+    shocks: np.ndarray,
+) -> np.ndarray:
+    """
+    Runs several configurations over the same (num_samples, years) shocks in
+    one pass: every config's samples are stacked into one set of rows so the
+    year loop runs once for the whole batch. Returns an array of shape
+    (len(params_list), num_samples); row i equals
+    simulate_networths(params_list[i], ..., shocks=shocks).
+    """
+    num_samples = shocks.shape[0]
+    salaries = []
+    after_tax_income = []
+    for params, tax_brackets in zip(params_list, tax_brackets_list):
+        config_salaries, config_after_tax = _after_tax_paths(params, tax_brackets, shocks)
+        salaries.append(config_salaries)
+        after_tax_income.append(config_after_tax)
+
+    def per_row(values, dtype=float):
+        return np.repeat(np.asarray(values, dtype=dtype), num_samples)
+
+    eager = [params["spending_type"] == "eager" for params in params_list]
+    networths = _project_networths(
+        np.concatenate(salaries),
+        np.concatenate(after_tax_income),
+        home_values,
+        eager=per_row(eager, dtype=bool),
+        home_growth_rate=per_row([params["home_growth_rate"] for params in params_list]),
+        salary_to_buy_house=per_row([params["salary_to_buy_house"] for params in params_list]),
+        spending_pct=per_row([spending_fraction(params) for params in params_list]),
+        child_cost_total=per_row(
+            [params["annual_child_cost"] * params["num_children"] for params in params_list]
+        ),
+    )
+    return networths.reshape(len(params_list), num_samples)
+
+
+def summarize_networths(networths: np.ndarray) -> dict:
+    return {"mean": float(np.mean(networths)), "stdev": float(np.std(networths))}
+
+
+def path_bytes(num_samples: int, years: int, precision: str = "float64") -> int:
+    """Estimated peak memory of the path matrices for one pass over num_samples samples."""
+    return PATH_BYTES_PER_CELL[precision] * num_samples * years
+
+
+def fits_in_one_pass(
+    num_samples: int, years: int, options: "SimulationOptions", memory_limit_mb: float = DEFAULT_MEMORY_LIMIT_MB
+) -> bool:
+    """Whether a plain run can hold all its samples' paths at once (float64 runs only)."""
+    return options.precision == "float64" and path_bytes(num_samples, years) <= memory_limit_mb * 2**20
+
+
+def samples_per_block(years: int, memory_limit_mb: float, precision: str = "float64", block_size: int = None) -> int:
+    """
+    Largest block of samples (capped at block_size, if given) whose path
+    matrices fit in memory_limit_mb. Raises ValueError when not even one
+    sample fits.
+    """
+    fits = int(memory_limit_mb * 2**20 // path_bytes(1, years, precision))
+    if fits < 1:
+        raise ValueError(f"A {years}-year run does not fit in the {memory_limit_mb} MB simulation memory limit")
+    return fits if block_size is None else min(block_size, fits)
+
+
+def iter_blocks(
+    params: dict,
+    tax_brackets: TaxBrackets,
+    home_values: HomeValueTable,
+    years: int,
+    rng: np.random.Generator,
+    block_sizes,
+    percentiles=None,
+    sampling: str = "pseudo",
+    precision: str = "float64",
+):
+    """
+    Simulates samples block by block, folding each block into running
+    moments (and a per-year quantile sketch when percentiles are wanted).
+    Yields (moments, sketch) after every block; callers stop iterating when
+    they have enough. Blocks consume the shock sampler in the same order as
+    one big run, so stopping after N samples gives the same paths as a run
+    of N. With precision="float32" the path matrices of each block are kept
+    in single precision (the running statistics stay float64).
+    """
+    dtype = PRECISIONS[precision]
+    sampler = ShockSampler(rng, years, sampling)
+    moments = RunningMoments()
+    sketch = YearlyQuantileSketch(years) if percentiles else None
+
+    for block in block_sizes:
+        if block <= 0:
+            continue
+        result = simulate_networths(
+            params, tax_brackets, home_values, block, years,
+            shocks=sampler.draw(block).astype(dtype, copy=False), yearly=sketch is not None,
+        )
+        if sketch is not None:
+            moments.update(result[:, -1])
+            sketch.update(result.T)
+        else:
+            moments.update(result)
+        yield moments, sketch
+
+
+def fixed_blocks(num_samples: int, block_size: int = BLOCK_SIZE):
+    """Splits num_samples into blocks of at most block_size."""
+    done = 0
+    while done < num_samples:
+        block = min(block_size, num_samples - done)
+        yield block
+        done += block
+
+
+def growing_blocks(max_samples: int, first_block: int, block_size: int = BLOCK_SIZE):
+    """Blocks that double from first_block up to block_size, stopping at max_samples."""
+    done = 0
+    block = max(1, first_block)
+    while done < max_samples:
+        block = min(block, block_size, max_samples - done)
+        yield block
+        done += block
+        block *= 2
+
+
+def summarize_blocks(moments: RunningMoments, sketch=None, percentiles=None) -> dict:
+    summary = moments.summary()
+    if sketch is not None:
+        bands = sketch.quantiles(percentiles)
+        summary["percentiles"] = {
+            percentile_label(p): [float(v) for v in row] for p, row in zip(percentiles, bands)
+        }
+        summary["percentiles_exact"] = sketch.exact
+    return summary
+
+
+def simulate_bands(
+    params: dict,
+    tax_brackets: TaxBrackets,
+    home_values: HomeValueTable,
+    num_samples: int,
+    years: int,
+    rng: np.random.Generator,
+    percentiles=DEFAULT_PERCENTILES,
+    block_size: int = BLOCK_SIZE,
+    sampling: str = "pseudo",
+    precision: str = "float64",
+) -> dict:
+    """
+    Summary plus per-year net worth percentile bands. Samples are simulated
+    in blocks and folded into running moments and a quantile sketch, so
+    memory stays at one block plus years x sketch size no matter how many
+    samples are requested. mean/stdev match simulate_networths.
+    """
+    moments, sketch = RunningMoments(), None
+    for moments, sketch in iter_blocks(
+        params, tax_brackets, home_values, years, rng,
+        fixed_blocks(num_samples, block_size), percentiles, sampling, precision,
+    ):
+        pass
+    return summarize_blocks(moments, sketch, percentiles)
+
+
+def shard_sizes(num_samples: int, shards: int) -> list:
+    """Splits num_samples as evenly as possible, the first shards taking the remainder."""
+    size, extra = divmod(num_samples, shards)
+    return [size + (i < extra) for i in range(shards)]
+
+
+def simulate_shard(
+    params: dict,
+    tax_brackets: TaxBrackets,
+    home_values: HomeValueTable,
+    num_samples: int,
+    years: int,
+    seed_sequence: np.random.SeedSequence,
+    block_size: int = BLOCK_SIZE,
+    percentiles=None,
+    sampling: str = "pseudo",
+    precision: str = "float64",
+):
+    """Runs one shard on its own child stream and returns its (moments, sketch)."""
+    rng = np.random.default_rng(seed_sequence)
+    moments, sketch = RunningMoments(), None
+    for moments, sketch in iter_blocks(
+        params, tax_brackets, home_values, years, rng,
+        fixed_blocks(num_samples, block_size), percentiles, sampling, precision,
+    ):
+        pass
+    return moments, sketch
+
+
+def simulate_sharded(
+    params: dict,
+    tax_brackets: TaxBrackets,
+    home_values: HomeValueTable,
+    num_samples: int,
+    years: int,
+    shards: int,
+    seed: int = DEFAULT_SEED,
+    block_size: int = BLOCK_SIZE,
+    percentiles=None,
+    sampling: str = "pseudo",
+    precision: str = "float64",
+    pool=None,
+) -> dict:
+    """
+    Splits num_samples into `shards` shards, each drawing from its own child
+    stream spawned from SeedSequence(seed), and merges their moments (and
+    quantile sketches) in shard order. The result depends only on the seed
+    and the shard count, never on which worker ran which shard or when, so
+    passing a process pool changes the wall time but not the answer.
+    """
+    streams = np.random.SeedSequence(seed).spawn(shards)
+    jobs = [
+        (params, tax_brackets, home_values, size, years, stream, block_size, percentiles, sampling, precision)
+        for size, stream in zip(shard_sizes(num_samples, shards), streams)
+    ]
+    if pool is None:
+        parts = [simulate_shard(*job) for job in jobs]
+    else:
+        futures = [pool.submit(simulate_shard, *job) for job in jobs]
+        parts = [future.result() for future in futures]
+
+    moments = RunningMoments()
+    sketch = YearlyQuantileSketch(years) if percentiles else None
+    for shard_moments, shard_sketch in parts:
+        moments.merge(shard_moments)
+        if sketch is not None and shard_sketch is not None:
+            sketch.merge(shard_sketch)
+    return summarize_blocks(moments, sketch, percentiles)
+
+
+def simulate_adaptive(
+    params: dict,
+    tax_brackets: TaxBrackets,
+    home_values: HomeValueTable,
+    years: int,
+    rng: np.random.Generator,
+    rel_tol: float,
+    max_samples: int = MAX_ADAPTIVE_SAMPLES,
+    min_samples: int = MIN_ADAPTIVE_SAMPLES,
+    percentiles=None,
+    sampling: str = "pseudo",
+    block_size: int = BLOCK_SIZE,
+    precision: str = "float64",
+) -> dict:
+    """
+    Runs growing blocks of samples until the standard error of the mean net
+    worth is within rel_tol of |mean|, or max_samples is reached. The
+    summary reports samples_used, standard_error, relative_error and whether
+    the tolerance was met. The standard error treats samples as independent,
+    which overstates it for the antithetic and qmc sampling modes, so those
+    stop no later than they should.
+    """
+    moments, sketch = RunningMoments(), None
+    for moments, sketch in iter_blocks(
+        params, tax_brackets, home_values, years, rng,
+        growing_blocks(max_samples, min_samples, block_size), percentiles, sampling, precision,
+    ):
+        if moments.count >= min_samples and _relative_error(moments) <= rel_tol:
+            break
+    return _adaptive_summary(moments, sketch, percentiles, rel_tol)
+
+
+def simulate_deadline(
+    params: dict,
+    tax_brackets: TaxBrackets,
+    home_values: HomeValueTable,
+    years: int,
+    rng: np.random.Generator,
+    deadline_ms: float,
+    cost_model,
+    max_samples: int = MAX_ADAPTIVE_SAMPLES,
+    rel_tol: float = None,
+    percentiles=None,
+    sampling: str = "pseudo",
+    block_size: int = None,
+    precision: str = "float64",
+) -> dict:
+    """
+    Simulates as many samples as fit in deadline_ms. cost_model (see
+    app/services/cost_model.py) sizes the first block to half the budget;
+    later blocks fill what is left, with predictions scaled by how far off
+    the previous block's was. Stops when the next block would be smaller
+    than MIN_ADAPTIVE_SAMPLES, at max_samples, or (with rel_tol) once the
+    tolerance is met. At least MIN_ADAPTIVE_SAMPLES are always simulated.
+    Samples are the same prefix of the stream as a fixed-size run, so the
+    result equals simulate_core's for num_samples=samples_used.
+    """
+    started = time.perf_counter()
+    timing = {"slowdown": 1.0, "block": 0, "block_started": started}
+
+    def elapsed_ms():
+        return (time.perf_counter() - started) * 1000
+
+    def deadline_blocks():
+        done = 0
+        while done < max_samples:
+            if timing["block"]:
+                actual = (time.perf_counter() - timing["block_started"]) * 1000
+                predicted = cost_model.predict_ms(timing["block"], years, precision)
+                timing["slowdown"] = max(actual / predicted, 0.1)
+            budget = (deadline_ms * DEADLINE_HEADROOM - elapsed_ms()) / timing["slowdown"]
+            if not done:
+                budget /= 2
+            block = min(cost_model.samples_within(budget, years, precision), max_samples - done)
+            if block_size is not None:
+                block = min(block, block_size)
+            if block < MIN_ADAPTIVE_SAMPLES:
+                if done:
+                    return
+                block = min(MIN_ADAPTIVE_SAMPLES, max_samples)
+            timing["block"], timing["block_started"] = block, time.perf_counter()
+            yield block
+            done += block
+
+    moments, sketch = RunningMoments(), None
+    for moments, sketch in iter_blocks(
+        params, tax_brackets, home_values, years, rng, deadline_blocks(), percentiles, sampling, precision,
+    ):
+        if rel_tol is not None and moments.count >= MIN_ADAPTIVE_SAMPLES and _relative_error(moments) <= rel_tol:
+            break
+
+    summary = summarize_blocks(moments, sketch, percentiles)
+    summary["samples_used"] = moments.count
+    summary["standard_error"] = moments.standard_error
+    summary["relative_error"] = _relative_error(moments)
+    if rel_tol is not None:
+        summary["converged"] = summary["relative_error"] <= rel_tol
+    summary["deadline_ms"] = deadline_ms
+    summary["elapsed_ms"] = elapsed_ms()
+    return summary
+
+
+def _adaptive_summary(moments: RunningMoments, sketch, percentiles, rel_tol: float) -> dict:
+    summary = summarize_blocks(moments, sketch, percentiles)
+    summary["samples_used"] = moments.count
+    summary["standard_error"] = moments.standard_error
+    summary["relative_error"] = _relative_error(moments)
+    summary["converged"] = summary["relative_error"] <= rel_tol
+    return summary
+
+
+def stream_progress(
+    params: dict,
+    tax_brackets: TaxBrackets,
+    home_values: HomeValueTable,
+    num_samples: int,
+    years: int,
+    rng: np.random.Generator,
+    options: SimulationOptions,
+    block_size: int = STREAM_BLOCK_SIZE,
+):
+    """
+    Runs the same simulation as simulate_core with these options, yielding
+    ("progress", {"mean", "stdev", "samples_done", "samples_total"}) after
+    every block and ("result", summary) at the end. Blocks are only
+    simulated as the consumer iterates, so closing the generator (e.g. the
+    client disconnected) stops the work at the next block boundary.
+    """
+    if options.adaptive:
+        samples_total = options.max_samples
+        blocks = growing_blocks(options.max_samples, MIN_ADAPTIVE_SAMPLES, block_size)
+    else:
+        samples_total = num_samples
+        blocks = fixed_blocks(num_samples, block_size)
+
+    moments, sketch = RunningMoments(), None
+    for moments, sketch in iter_blocks(
+        params, tax_brackets, home_values, years, rng, blocks,
+        options.percentiles, options.sampling, options.precision,
+    ):
+        progress = moments.summary()
+        progress["samples_done"] = moments.count
+        progress["samples_total"] = samples_total
+        if options.adaptive:
+            progress["relative_error"] = _relative_error(moments)
+        yield "progress", progress
+        if (
+            options.adaptive
+            and moments.count >= MIN_ADAPTIVE_SAMPLES
+            and progress["relative_error"] <= options.rel_tol
+        ):
+            break
+
+    if options.adaptive:
+        yield "result", _adaptive_summary(moments, sketch, options.percentiles, options.rel_tol)
+    else:
+        yield "result", summarize_blocks(moments, sketch, options.percentiles)
+
+
+def _relative_error(moments: RunningMoments) -> float:
+    if moments.mean == 0:
+        return 0.0 if moments.m2 == 0 else float("inf")
+    return moments.standard_error / abs(moments.mean)
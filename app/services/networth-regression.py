@@ -1,2 +0,0 @@
-def run_full_simulation(params):
-    pass
\ No newline at end of file
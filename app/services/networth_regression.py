@@ -0,0 +1,388 @@
+"""
+Surrogate model for the net worth simulation.
+
+A ridge regression over cubic interactions of a few engineered features
+(expected cumulative salary, growth x years, shock size, tax rate, ...),
+trained on simulation_training_data.csv (see
+app/scripts/generate_training_data.py) and serialized to JSON by
+app/scripts/train_surrogate.py. It predicts the mean and stdev of final
+net worth in microseconds, which is what slider drags need; it is not a
+replacement for the engine.
+
+The model only answers inside its training envelope. Discrete params
+(children, spending type, savings rate, ...) must take a value that was
+seen, and the request's standardized feature vector must lie within the
+coverage radius of some training row: a per-feature range check would
+accept combinations no training row came near (a top salary with the
+lowest growth, say). Anything else goes back to the full Monte Carlo.
+
+Training scores the model on a holdout share first. The accuracy
+thresholds it was held to are saved with it, and get_surrogate() does not
+serve a model whose holdout errors exceed them.
+"""
+import itertools
+import json
+import os
+import threading
+
+import numpy as np
+
+from app.services.monte_carlo import ENGINE_VERSION, RENT_PCT_OF_SALARY
+from app.services.reference_data import DATA_DIR
+
+SURROGATE_FILE = "networth_surrogate.json"
+TRAINING_DATA_FILE = os.path.join(os.path.dirname(DATA_DIR), "simulation_training_data.csv")
+
+FEATURE_NAMES = (
+    "log_starting_salary",
+    "growth_x_years",
+    "shock_x_sqrt_years",
+    "home_growth_x_years",
+    "log_house_threshold_to_salary",
+    "eager",
+    "years",
+    "effective_tax_rate",
+    "child_cost_share",
+)
+
+# holdout metric -> largest value a servable model may have
+ACCURACY_THRESHOLDS = {
+    "holdout_mean_error_in_stdevs_median": 0.3,
+    "holdout_stdev_rel_error_median": 0.25,
+}
+
+# training rows kept for the coverage check, and the share of training rows
+# whose nearest other row lies within the coverage radius
+MAX_COVERAGE_POINTS = 2000
+COVERAGE_QUANTILE = 0.99
+
+
+def _expected_cumulative_salary(starting_salary, growth_mean, years):
+    """Sum of expected salaries over the run (a geometric series)."""
+    growth = 1.0 + growth_mean
+    flat = np.abs(growth_mean) < 1e-9
+    safe_mean = np.where(flat, 1.0, growth_mean)
+    return np.where(
+        flat,
+        starting_salary * years,
+        starting_salary * growth * (growth ** years - 1.0) / safe_mean,
+    )
+
+
+def _features(starting_salary, growth_mean, growth_sd, home_growth_rate, salary_to_buy_house,
+              child_cost_total, eager, years, effective_tax_rate):
+    """Raw feature matrix (rows, len(FEATURE_NAMES)) plus the scale the targets are divided by."""
+    years = np.asarray(years, dtype=float)
+    scale = _expected_cumulative_salary(starting_salary, growth_mean, years)
+    features = np.column_stack([
+        np.log(starting_salary),
+        growth_mean * years,
+        growth_sd * np.sqrt(years),
+        home_growth_rate * years,
+        np.log(salary_to_buy_house / starting_salary),
+        np.asarray(eager, dtype=float),
+        years / 10.0,
+        effective_tax_rate,
+        child_cost_total * years / scale,
+    ])
+    return features, np.atleast_1d(scale)
+
+
+def _interaction_terms(num_features: int, degree: int) -> np.ndarray:
+    """
+    (terms, degree) matrix of feature indexes, one row per monomial up to
+    `degree`. Index num_features stands for a constant 1, which pads the
+    lower-degree terms (and makes the all-padding row the intercept).
+    """
+    terms = []
+    for d in range(degree + 1):
+        for combo in itertools.combinations_with_replacement(range(num_features), d):
+            terms.append(list(combo) + [num_features] * (degree - d))
+    return np.array(terms, dtype=np.intp)
+
+
+def _design_matrix(z: np.ndarray, terms: np.ndarray) -> np.ndarray:
+    padded = np.concatenate([z, np.ones((len(z), 1))], axis=1)
+    design = padded[:, terms[:, 0]]
+    for column in range(1, terms.shape[1]):
+        design = design * padded[:, terms[:, column]]
+    return design
+
+
+def _nearest_distances(points: np.ndarray, queries: np.ndarray, exclude_self: bool = False) -> np.ndarray:
+    """Euclidean distance from every query row to its nearest row of points, in chunks of queries."""
+    out = np.empty(len(queries))
+    for start in range(0, len(queries), 256):
+        chunk = queries[start:start + 256]
+        distances = np.sqrt(((chunk[:, None, :] - points[None, :, :]) ** 2).sum(axis=2))
+        if exclude_self:
+            distances[np.arange(len(chunk)), np.arange(start, start + len(chunk))] = np.inf
+        out[start:start + len(chunk)] = distances.min(axis=1)
+    return out
+
+
+def _ridge(design: np.ndarray, target: np.ndarray, ridge: float) -> np.ndarray:
+    penalty = ridge * np.eye(design.shape[1])
+    penalty[0, 0] = 0.0  # leave the intercept unpenalized
+    return np.linalg.solve(design.T @ design + penalty, design.T @ target)
+
+
+class NetworthSurrogate:
+    def __init__(self, degree, feature_mean, feature_scale, mean_coef, log_stdev_coef, envelope, metrics=None,
+                 engine_version=ENGINE_VERSION, coverage=None, accuracy_thresholds=None):
+        self.degree = degree
+        self.feature_mean = np.asarray(feature_mean, dtype=float)
+        self.feature_scale = np.asarray(feature_scale, dtype=float)
+        self.mean_coef = np.asarray(mean_coef, dtype=float)
+        self.log_stdev_coef = np.asarray(log_stdev_coef, dtype=float)
+        self.envelope = envelope
+        self.metrics = metrics or {}
+        self.engine_version = engine_version
+        # {"points": standardized training features, "radius": nearest-neighbour cutoff}
+        self.coverage = coverage
+        self.coverage_points = None if coverage is None else np.asarray(coverage["points"], dtype=float)
+        self.accuracy_thresholds = dict(ACCURACY_THRESHOLDS if accuracy_thresholds is None else accuracy_thresholds)
+        self._terms = _interaction_terms(len(FEATURE_NAMES), degree)
+
+    @classmethod
+    def train(cls, df, degree: int = 3, ridge: float = 1.0, holdout: float = 0.2, seed: int = 0,
+              accuracy_thresholds=None):
+        """
+        Fits the model on a training-data DataFrame (the generate_training_data
+        columns). A random holdout share is scored first and reported in
+        metrics; the returned model is then refit on every row. Check
+        accuracy_failures() before saving it.
+        """
+        df = df.dropna(subset=["mean_networth", "stdev_networth"])
+        df = df[df["stdev_networth"] > 0]
+        eager = (df["spending"] == "eager").to_numpy()
+        raw, scale = _features(
+            df["starting_salary"].to_numpy(float),
+            df["salary_growth_mean"].to_numpy(float),
+            df["salary_growth_sd"].to_numpy(float),
+            df["home_growth_rate"].to_numpy(float),
+            df["salary_to_buy_house"].to_numpy(float),
+            (df["annual_child_cost"] * df["num_children"]).to_numpy(float),
+            eager,
+            df["years"].to_numpy(float),
+            df["effective_tax_rate_starting"].to_numpy(float),
+        )
+        mean_target = df["mean_networth"].to_numpy(float) / scale
+        log_stdev_target = np.log(df["stdev_networth"].to_numpy(float) / scale)
+        terms = _interaction_terms(raw.shape[1], degree)
+
+        def fit(rows):
+            feature_mean = raw[rows].mean(axis=0)
+            feature_scale = raw[rows].std(axis=0)
+            feature_scale[feature_scale == 0] = 1.0
+            design = _design_matrix((raw[rows] - feature_mean) / feature_scale, terms)
+            return (
+                feature_mean,
+                feature_scale,
+                _ridge(design, mean_target[rows], ridge),
+                _ridge(design, log_stdev_target[rows], ridge),
+            )
+
+        metrics = {"rows": int(len(df)), "degree": degree, "ridge": ridge}
+        order = np.random.default_rng(seed).permutation(len(df))
+        n_test = int(len(df) * holdout)
+        if n_test > 0:
+            test, train = order[:n_test], order[n_test:]
+            feature_mean, feature_scale, mean_coef, log_stdev_coef = fit(train)
+            design = _design_matrix((raw[test] - feature_mean) / feature_scale, terms)
+            pred_mean = design @ mean_coef * scale[test]
+            pred_stdev = np.exp(design @ log_stdev_coef) * scale[test]
+            true_mean = df["mean_networth"].to_numpy(float)[test]
+            true_stdev = df["stdev_networth"].to_numpy(float)[test]
+            metrics["holdout_rows"] = int(n_test)
+            # mean error in units of the true stdev: how far off the answer is for the user
+            metrics["holdout_mean_error_in_stdevs_median"] = float(np.median(np.abs(pred_mean - true_mean) / true_stdev))
+            metrics["holdout_stdev_rel_error_median"] = float(np.median(np.abs(pred_stdev - true_stdev) / true_stdev))
+
+        feature_mean, feature_scale, mean_coef, log_stdev_coef = fit(np.arange(len(df)))
+
+        z = (raw - feature_mean) / feature_scale
+        kept = np.sort(order[:MAX_COVERAGE_POINTS]) if len(z) > MAX_COVERAGE_POINTS else np.arange(len(z))
+        points = z[kept]
+        if len(points) > 1:
+            # rows not kept are measured against the kept ones, kept rows against the other kept rows
+            distances = _nearest_distances(points, points, exclude_self=True)
+            rest = np.setdiff1d(np.arange(len(z)), kept)
+            if len(rest):
+                distances = np.concatenate([distances, _nearest_distances(points, z[rest])])
+            radius = float(np.quantile(distances, COVERAGE_QUANTILE))
+        else:
+            radius = 0.0
+        coverage = {
+            "radius": radius,
+            "points": [[float(f"{v:.6g}") for v in row] for row in points],
+        }
+
+        envelope = {
+            "values": {
+                "num_children": sorted(int(v) for v in df["num_children"].unique()),
+                "spending_type": sorted(str(v) for v in df["spending"].unique()),
+                "savings_rate": sorted(float(v) for v in df["savings_rate"].unique()),
+                "hv_to_salary_ratio": sorted(float(v) for v in df["hv_to_salary_ratio"].unique()),
+            },
+            # the savings rate sets the spending share, and training only saw each spending type's default
+            "spending_savings": sorted(
+                [str(spending), float(rate)]
+                for spending, rate in df[["spending", "savings_rate"]].drop_duplicates().itertuples(index=False)
+            ),
+        }
+
+        return cls(degree, feature_mean, feature_scale, mean_coef, log_stdev_coef, envelope, metrics,
+                   coverage=coverage, accuracy_thresholds=accuracy_thresholds)
+
+    def accuracy_failures(self) -> list:
+        """Holdout metrics above the model's accuracy thresholds (all of them when it was never scored)."""
+        return [
+            name for name, limit in self.accuracy_thresholds.items()
+            if not self.metrics.get(name, float("inf")) <= limit
+        ]
+
+    def serving_problem(self):
+        """None when the model may answer requests, else why it may not."""
+        if self.engine_version != ENGINE_VERSION:
+            return "trained on a different engine version"
+        if self.coverage_points is None:
+            return "no coverage data"
+        failures = self.accuracy_failures()
+        if failures:
+            return "holdout error above threshold: " + ", ".join(failures)
+        return None
+
+    def to_dict(self) -> dict:
+        return {
+            "engine_version": self.engine_version,
+            "degree": self.degree,
+            "features": list(FEATURE_NAMES),
+            "feature_mean": self.feature_mean.tolist(),
+            "feature_scale": self.feature_scale.tolist(),
+            "mean_coef": self.mean_coef.tolist(),
+            "log_stdev_coef": self.log_stdev_coef.tolist(),
+            "envelope": self.envelope,
+            "metrics": self.metrics,
+            "accuracy_thresholds": self.accuracy_thresholds,
+            "coverage": self.coverage,
+        }
+
+    @classmethod
+    def from_dict(cls, blob: dict) -> "NetworthSurrogate":
+        if tuple(blob["features"]) != FEATURE_NAMES:
+            raise ValueError("Surrogate was trained on a different feature set")
+        return cls(
+            blob["degree"],
+            blob["feature_mean"],
+            blob["feature_scale"],
+            blob["mean_coef"],
+            blob["log_stdev_coef"],
+            blob["envelope"],
+            blob.get("metrics"),
+            blob.get("engine_version"),
+            blob.get("coverage"),
+            # older files predate the accuracy gate and are held to the current thresholds
+            blob.get("accuracy_thresholds"),
+        )
+
+    def save(self, path: str):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, indent=1)
+
+    @classmethod
+    def load(cls, path: str) -> "NetworthSurrogate":
+        with open(path, encoding="utf-8") as f:
+            return cls.from_dict(json.load(f))
+
+    def out_of_domain(self, params: dict, years: int, effective_tax_rate: float):
+        """
+        None when params are inside the training envelope, else the offending
+        param name ("coverage" when the combination lies too far from every
+        training row).
+        """
+        values = dict(params, years=years)
+        for name, seen in self.envelope["values"].items():
+            value = values.get(name)
+            if name != "spending_type":
+                try:
+                    value = float(value)
+                except (TypeError, ValueError):
+                    return name
+            if value not in seen:
+                return name
+        if [values.get("spending_type"), float(values.get("savings_rate"))] not in self.envelope["spending_savings"]:
+            return "savings_rate"
+        # training data always used the default rent baseline
+        if values.get("rent_pc_baseline", RENT_PCT_OF_SALARY) != RENT_PCT_OF_SALARY:
+            return "rent_pc_baseline"
+
+        try:
+            with np.errstate(divide="ignore", invalid="ignore"):
+                z = (self._raw_features(params, years, effective_tax_rate)[0] - self.feature_mean) / self.feature_scale
+        except (KeyError, TypeError, ValueError):
+            return "coverage"
+        if self.coverage_points is None or not np.all(np.isfinite(z)):
+            return "coverage"
+        if not _nearest_distances(self.coverage_points, z)[0] <= self.coverage["radius"]:
+            return "coverage"
+        return None
+
+    def _raw_features(self, params: dict, years: int, effective_tax_rate: float):
+        return _features(
+            float(params["starting_salary"]),
+            float(params["salary_growth_mean"]),
+            float(params["salary_growth_sd"]),
+            float(params["home_growth_rate"]),
+            float(params["salary_to_buy_house"]),
+            float(params["annual_child_cost"]) * float(params["num_children"]),
+            params["spending_type"] == "eager",
+            years,
+            effective_tax_rate,
+        )
+
+    def predict(self, params: dict, years: int, effective_tax_rate: float) -> dict:
+        """{"mean", "stdev"} of final net worth; check out_of_domain first."""
+        raw, scale = self._raw_features(params, years, effective_tax_rate)
+        design = _design_matrix((raw - self.feature_mean) / self.feature_scale, self._terms)
+        return {
+            "mean": float(design[0] @ self.mean_coef * scale[0]),
+            "stdev": float(np.exp(design[0] @ self.log_stdev_coef) * scale[0]),
+        }
+
+
+_surrogate = None
+_surrogate_loaded = False
+_surrogate_lock = threading.Lock()
+
+
+def get_surrogate(data_dir: str = DATA_DIR):
+    """
+    Model from app/networth_surrogate.json, loaded on first use. None if it
+    is missing or may not serve (see NetworthSurrogate.serving_problem).
+    """
+    global _surrogate, _surrogate_loaded
+    if not _surrogate_loaded:
+        with _surrogate_lock:
+            if not _surrogate_loaded:
+                path = os.path.join(data_dir, SURROGATE_FILE)
+                model = NetworthSurrogate.load(path) if os.path.exists(path) else None
+                _surrogate = model if model is not None and model.serving_problem() is None else None
+                _surrogate_loaded = True
+    return _surrogate
+
+
+def fast_summary(params: dict, tax_brackets, years: int):
+    """
+    Surrogate prediction for a resolved params dict, or None when there is
+    no model or the params fall outside its training envelope (callers then
+    run the full simulation).
+    """
+    surrogate = get_surrogate()
+    if surrogate is None:
+        return None
+    starting_salary = float(params["starting_salary"])
+    effective_tax_rate = float(tax_brackets.tax(starting_salary)) / starting_salary
+    if surrogate.out_of_domain(params, years, effective_tax_rate) is not None:
+        return None
+    return surrogate.predict(params, years, effective_tax_rate)
@@ -0,0 +1,215 @@
+"""
+Resolves simulation inputs into validated, immutable parameters.
+
+/simulation/run style requests name a career, a state, a number of children
+and a spending type; ParameterResolver turns those into a ResolvedParams
+(salary, growth, housing, child cost and tax figures from the reference
+tables). The UI asks for the same few hundred career/state pairs over and
+over, so results are memoized in a bounded LRU keyed by the inputs and the
+reference snapshot's checksum (a reload never serves stale params).
+
+/simulation/sliders sends back an already-resolved params dict with some
+values changed; ResolvedParams.from_dict validates that instead of handing
+raw client JSON to the engine.
+"""
+import dataclasses
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional
+
+SPENDING_TYPES = ("eager", "conservative")
+
+# spending type -> (savings_rate, hv_to_salary_ratio) defaults
+SPENDING_DEFAULTS = {"eager": (0.2, 3), "conservative": (0.3, 2)}
+
+RENT_PC_BASELINE = 0.3
+
+
+@dataclass(frozen=True)
+class ResolvedParams:
+    starting_salary: float
+    salary_growth_mean: float
+    salary_growth_sd: float
+    rent_pc_baseline: float
+    salary_to_buy_house: float
+    hv_to_salary_ratio: float
+    home_growth_rate: float
+    savings_rate: float
+    num_children: int
+    annual_child_cost: float
+    effective_tax_rate_100k: float
+    effective_tax_rate_starting: float
+    location: str
+    spending_type: str
+    job_name: str
+    career_id: Optional[str] = None
+
+    def as_dict(self, years=None) -> dict:
+        """The params dict the engine, caches and API responses use."""
+        params = dataclasses.asdict(self)
+        params["years"] = years
+        return params
+
+    def replace(self, **changes) -> "ResolvedParams":
+        return dataclasses.replace(self, **changes)
+
+    @classmethod
+    def from_dict(cls, data: dict, reference) -> "ResolvedParams":
+        """
+        Validates a params dict sent back by a client (e.g. slider values).
+        The starting tax rate is recomputed, since the salary may have moved.
+        """
+        spending = _spending_type(data.get("spending_type"))
+        location = data.get("location")
+        state = reference.state(location)  # unknown locations are an error, not zero tax
+        savings_rate, hv_to_salary_ratio = SPENDING_DEFAULTS[spending]
+        # values the client may leave out; everything else is required
+        defaults = {
+            "rent_pc_baseline": RENT_PC_BASELINE,
+            "savings_rate": savings_rate,
+            "hv_to_salary_ratio": hv_to_salary_ratio,
+            "effective_tax_rate_100k": state.eff_tax_rate_100k,
+        }
+
+        values = {"location": location, "spending_type": spending}
+        for field in dataclasses.fields(cls):
+            name = field.name
+            if name in values or name == "effective_tax_rate_starting":
+                continue
+            value = data.get(name, defaults.get(name))
+            if name in ("job_name", "career_id"):
+                values[name] = None if value is None else str(value)
+            elif name == "num_children":
+                values[name] = _num_children(value)
+            else:
+                values[name] = _number(name, value)
+
+        if values["starting_salary"] <= 0:
+            raise ValueError("starting_salary must be positive")
+        if not 0 <= values["rent_pc_baseline"] <= 1:
+            raise ValueError("rent_pc_baseline must be between 0 and 1")
+        # whatever rent and savings leave is spent; spending cannot go negative
+        max_savings = 1 - values["rent_pc_baseline"]
+        if not 0 <= values["savings_rate"] <= max_savings:
+            raise ValueError(f"savings_rate must be between 0 and {max_savings:g}")
+        values["effective_tax_rate_starting"] = _effective_tax_rate(reference, location, values["starting_salary"])
+        return cls(**values)
+
+
+def _number(name: str, value) -> float:
+    if isinstance(value, bool):
+        raise ValueError(f"{name} must be a number")
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"{name} must be a number") from None
+
+
+def _num_children(value) -> int:
+    if isinstance(value, bool):
+        raise ValueError("num_children must be a non-negative integer")
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        raise ValueError("num_children must be a non-negative integer") from None
+    if number < 0 or number != int(number):
+        raise ValueError("num_children must be a non-negative integer")
+    return int(number)
+
+
+def _spending_type(value) -> str:
+    spending = str(value or "").strip().lower()
+    if spending not in SPENDING_TYPES:
+        raise ValueError(f"spending must be one of {', '.join(SPENDING_TYPES)}")
+    return spending
+
+
+def _effective_tax_rate(reference, location: str, salary: float) -> float:
+    return float(reference.tax_tables.for_state(location).tax(salary)) / salary
+
+
+class ParameterResolver:
+    def __init__(self, max_entries: int = 4096):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def resolve(self, reference, career_id, location, num_children, spending) -> ResolvedParams:
+        """Params for one career/state/children/spending combination. Raises ValueError on bad input."""
+        num_children = _num_children(num_children)
+        spending = _spending_type(spending)
+        key = (reference.checksum, career_id, location, num_children, spending)
+
+        with self._lock:
+            resolved = self._entries.get(key)
+            if resolved is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return resolved
+            self.misses += 1
+
+        resolved = self._resolve(reference, career_id, location, num_children, spending)
+        with self._lock:
+            self._entries[key] = resolved
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return resolved
+
+    def resolve_request(self, data: dict, reference) -> ResolvedParams:
+        """Resolves a /simulation/run style JSON body."""
+        return self.resolve(
+            reference, data.get("career_id"), data.get("location"), data.get("num_children"), data.get("spending")
+        )
+
+    @staticmethod
+    def _resolve(reference, career_id, location, num_children, spending) -> ResolvedParams:
+        # extracting relevant salary information
+        career = reference.career(career_id)
+        if career.starting_salary is None:
+            raise ValueError(f"No starting salary for career_id: {career_id}")
+
+        # extracting relevant location information and adjusting the starting salary for it
+        state = reference.state(location)
+        if state.home_growth_rate is None:
+            raise ValueError(f"No home and child data for location: {location}")
+        starting_salary = career.starting_salary * state.income_ratio
+
+        savings_rate, hv_to_salary_ratio = SPENDING_DEFAULTS[spending]
+        return ResolvedParams(
+            starting_salary=starting_salary,
+            salary_growth_mean=career.salary_growth_mean,
+            salary_growth_sd=career.salary_growth_sd,
+            rent_pc_baseline=RENT_PC_BASELINE,
+            salary_to_buy_house=state.salary_to_buy_house,
+            hv_to_salary_ratio=hv_to_salary_ratio,
+            home_growth_rate=state.home_growth_rate,
+            savings_rate=savings_rate,
+            num_children=num_children,
+            annual_child_cost=state.annual_child_cost,
+            effective_tax_rate_100k=state.eff_tax_rate_100k,
+            effective_tax_rate_starting=_effective_tax_rate(reference, location, starting_salary),
+            location=location,
+            spending_type=spending,
+            job_name=career.title,
+            career_id=career.career_id,
+        )
+
+    def clear(self, *_args):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+            }
+
+
+# shared by the routes, job workers and scripts in this process
+default_resolver = ParameterResolver()
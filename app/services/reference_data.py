@@ -0,0 +1,191 @@
+"""
+In-memory registry of the reference tables the simulation reads.
+
+The CSVs in app/ are parsed once (at create_app() time) into typed records
+with dict indexes by career id, category and state, plus the compiled tax
+tables and the salary-bucketed home value arrays. Routes and scripts resolve from the registry instead of calling
+pd.read_csv and scanning DataFrames on every request. Call
+ReferenceRegistry.reload() after the CSVs change on disk.
+"""
+import hashlib
+import os
+import threading
+from dataclasses import dataclass
+from typing import Optional
+
+import pandas as pd
+
+from app.services.home_values import HomeValueTable
+from app.services.tax_tables import TaxTables
+
+DATA_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))  # .../app
+
+SALARY_TABLE = "salary_table.csv"
+LOCATIONS_TABLE = "locations_table.csv"
+HOME_AND_RENTAL_TABLE = "Home Value & Rent Value Table - Sheet1.csv"
+HOME_AND_CHILD_TABLE = "State-Specific Home Data & Child Data - Sheet1.csv"
+
+REFERENCE_FILES = (SALARY_TABLE, LOCATIONS_TABLE, HOME_AND_RENTAL_TABLE, HOME_AND_CHILD_TABLE)
+
+
+@dataclass(frozen=True)
+class Career:
+    career_id: str
+    title: str
+    category: str
+    starting_salary: Optional[float]  # None when the sheet says "Unknown start"
+    salary_growth_mean: float
+    salary_growth_sd: float
+
+
+@dataclass(frozen=True)
+class StateData:
+    state: str
+    income_ratio: float  # state income / national income ("inc-nat ratio")
+    eff_tax_rate_100k: float
+
+    # from the home & child sheet; None for rows that only exist in the locations table
+    home_growth_rate: Optional[float]  # fraction per year, not percent
+    salary_to_buy_house: Optional[float]
+    annual_child_cost: Optional[float]
+
+
+@dataclass(frozen=True)
+class ReferenceData:
+    careers: dict
+    careers_by_category: dict
+    states: dict
+    tax_tables: TaxTables
+    home_values: HomeValueTable
+    checksum: str  # sha256 over the raw CSV bytes, changes whenever any table does
+
+    def career(self, career_id) -> Career:
+        career = self.careers.get(career_id)
+        if career is None:
+            raise ValueError(f"Unknown career_id: {career_id}")
+        return career
+
+    def state(self, state) -> StateData:
+        state_data = self.states.get(state)
+        if state_data is None:
+            raise ValueError(f"Unknown location: {state}")
+        return state_data
+
+
+def _optional_float(value) -> Optional[float]:
+    value = pd.to_numeric(value, errors="coerce")
+    return None if pd.isna(value) else float(value)
+
+
+def _checksum(data_dir: str) -> str:
+    digest = hashlib.sha256()
+    for name in REFERENCE_FILES:
+        with open(os.path.join(data_dir, name), "rb") as f:
+            digest.update(name.encode("utf-8"))
+            digest.update(f.read())
+    return digest.hexdigest()
+
+
+def load_reference_data(data_dir: str = DATA_DIR) -> ReferenceData:
+    """Parses every reference CSV in data_dir into a ReferenceData snapshot."""
+    salary_table = pd.read_csv(os.path.join(data_dir, SALARY_TABLE))
+    locations_table = pd.read_csv(os.path.join(data_dir, LOCATIONS_TABLE))
+    home_and_rental_table = pd.read_csv(os.path.join(data_dir, HOME_AND_RENTAL_TABLE))
+    home_and_child_table = pd.read_csv(os.path.join(data_dir, HOME_AND_CHILD_TABLE))
+
+    careers = {}
+    careers_by_category = {}
+    for row in salary_table.to_dict("records"):
+        career = Career(
+            career_id=str(row["Career_ID"]),
+            title=row["Career_Title"],
+            category=row["Category"],
+            starting_salary=_optional_float(row["Starting Salary"]),
+            salary_growth_mean=float(row["Salary_growth_mean"]),
+            salary_growth_sd=float(row["salary_growth_sd"]),
+        )
+        careers.setdefault(career.career_id, career)
+        careers_by_category.setdefault(career.category, []).append(career)
+
+    home_and_child = {row["State"]: row for row in home_and_child_table.to_dict("records")}
+
+    # the sheet has one row per tax bracket and repeats the state-level columns,
+    # so the first row of each state carries everything we need
+    states = {}
+    for row in locations_table.drop_duplicates("State").to_dict("records"):
+        state = row["State"]
+        home_row = home_and_child.get(state)
+        # states without an income tax carry "#VALUE!" here
+        eff_tax_rate_100k = _optional_float(row["eff_tax_rate_100k"])
+        states[state] = StateData(
+            state=state,
+            income_ratio=float(row["inc-nat ratio"]),
+            eff_tax_rate_100k=0.0 if eff_tax_rate_100k is None else eff_tax_rate_100k,
+            home_growth_rate=None if home_row is None else float(home_row["Average Home Growth Rate"]) / 100,
+            salary_to_buy_house=None if home_row is None else float(home_row["Salary Needed to Buy a House"]),
+            annual_child_cost=None if home_row is None else float(home_row["Cost of Raising Child"]),
+        )
+
+    return ReferenceData(
+        careers=careers,
+        careers_by_category=careers_by_category,
+        states=states,
+        tax_tables=TaxTables.from_locations_df(locations_table),
+        home_values=HomeValueTable.from_df(home_and_rental_table),
+        checksum=_checksum(data_dir),
+    )
+
+
+# snapshots loaded by worker_reference_data(), one per data_dir
+_worker_snapshots = {}
+
+
+def worker_reference_data(data_dir: str = DATA_DIR) -> ReferenceData:
+    """
+    Snapshot for a worker process (process pools, the Celery worker): loaded
+    on the first call for data_dir, then shared by every later task in the
+    process. Pass it as a ProcessPoolExecutor initializer to load up front.
+    """
+    data = _worker_snapshots.get(data_dir)
+    if data is None:
+        data = _worker_snapshots[data_dir] = load_reference_data(data_dir)
+    return data
+
+
+class ReferenceRegistry:
+    """
+    Holds the current ReferenceData snapshot for the process.
+
+    Snapshots are immutable, so readers never see a half-reloaded registry:
+    reload() builds a new snapshot and swaps it in, then notifies listeners
+    registered with on_reload() (e.g. caches keyed on the old tables).
+    """
+
+    def __init__(self, data_dir: str = DATA_DIR):
+        self.data_dir = data_dir
+        self._lock = threading.Lock()
+        self._listeners = []
+        self._data = load_reference_data(data_dir)
+
+    @property
+    def data(self) -> ReferenceData:
+        return self._data
+
+    def on_reload(self, callback):
+        """Registers callback(new_data) to run after every reload."""
+        self._listeners.append(callback)
+        return callback
+
+    def reload(self) -> ReferenceData:
+        with self._lock:
+            self._data = load_reference_data(self.data_dir)
+        for callback in self._listeners:
+            callback(self._data)
+        return self._data
+
+    def reload_if_changed(self) -> bool:
+        """Reloads only when the CSVs on disk differ from the loaded snapshot."""
+        if _checksum(self.data_dir) == self._data.checksum:
+            return False
+        self.reload()
+        return True
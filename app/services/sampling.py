@@ -0,0 +1,122 @@
+"""
+Sources of standard normal salary shocks for the Monte Carlo engine.
+
+- "pseudo": plain generator draws (the default, same stream as always)
+- "antithetic": each draw z is paired with -z, cancelling the odd moments
+  of the shock distribution within every pair
+- "qmc": scrambled Halton low-discrepancy points (one dimension per
+  simulated year, random digit permutations plus a random shift) pushed
+  through the inverse normal CDF
+
+The variance-reduced modes reach a given confidence interval with fewer
+samples. Samplers are stateful so that a run split into blocks draws the
+same points as one big run.
+"""
+import numpy as np
+
+SAMPLING_MODES = ("pseudo", "antithetic", "qmc")
+
+# Acklam's rational approximation to the inverse normal CDF (|rel error| < 1.2e-9)
+_A = (-3.969683028665376e01, 2.209460984245205e02, -2.759285104469687e02,
+      1.383577518672690e02, -3.066479806614716e01, 2.506628277459239e00)
+_B = (-5.447609879822406e01, 1.615858368580409e02, -1.556989798598866e02,
+      6.680131188771972e01, -1.328068155288572e01)
+_C = (-7.784894002430293e-03, -3.223964580411365e-01, -2.400758277161838e00,
+      -2.549732539343734e00, 4.374664141464968e00, 2.938163982698783e00)
+_D = (7.784695709041462e-03, 3.224671290700398e-01, 2.445134137142996e00,
+      3.754408661907416e00)
+_P_LOW = 0.02425
+
+
+def inverse_normal_cdf(u: np.ndarray) -> np.ndarray:
+    u = np.clip(np.asarray(u, dtype=float), 1e-12, 1 - 1e-12)
+    z = np.empty_like(u)
+
+    low = u < _P_LOW
+    high = u > 1 - _P_LOW
+    mid = ~(low | high)
+
+    q = u[mid] - 0.5
+    r = q * q
+    z[mid] = (((((_A[0] * r + _A[1]) * r + _A[2]) * r + _A[3]) * r + _A[4]) * r + _A[5]) * q / (
+        ((((_B[0] * r + _B[1]) * r + _B[2]) * r + _B[3]) * r + _B[4]) * r + 1
+    )
+
+    for mask, sign, tail in ((low, 1.0, u[low]), (high, -1.0, 1 - u[high])):
+        q = np.sqrt(-2 * np.log(tail))
+        z[mask] = sign * (((((_C[0] * q + _C[1]) * q + _C[2]) * q + _C[3]) * q + _C[4]) * q + _C[5]) / (
+            (((_D[0] * q + _D[1]) * q + _D[2]) * q + _D[3]) * q + 1
+        )
+    return z
+
+
+def _first_primes(count: int) -> list:
+    primes = []
+    candidate = 2
+    while len(primes) < count:
+        if all(candidate % p for p in primes if p * p <= candidate):
+            primes.append(candidate)
+        candidate += 1
+    return primes
+
+
+class ShockSampler:
+    def __init__(self, rng: np.random.Generator, years: int, mode: str = "pseudo"):
+        if mode not in SAMPLING_MODES:
+            raise ValueError(f"sampling must be one of {', '.join(SAMPLING_MODES)}")
+        self.rng = rng
+        self.years = years
+        self.mode = mode
+        self._pending = None  # antithetic partner left over from an odd-sized block
+        self._index = 0  # next low-discrepancy point
+
+        if mode == "qmc":
+            self._bases = _first_primes(years)
+            self._permutations = [rng.permutation(base) for base in self._bases]
+            self._shift = rng.random(years)
+
+    def draw(self, num_samples: int) -> np.ndarray:
+        """Returns a (num_samples, years) matrix of standard normal shocks."""
+        if self.mode == "antithetic":
+            return self._draw_antithetic(num_samples)
+        if self.mode == "qmc":
+            return self._draw_qmc(num_samples)
+        return self.rng.standard_normal((num_samples, self.years))
+
+    def _draw_antithetic(self, num_samples: int) -> np.ndarray:
+        rows = []
+        if self._pending is not None and num_samples > 0:
+            rows.append(self._pending[None, :])
+            self._pending = None
+
+        remaining = num_samples - sum(len(r) for r in rows)
+        pairs = (remaining + 1) // 2
+        z = self.rng.standard_normal((pairs, self.years))
+        interleaved = np.empty((2 * pairs, self.years))
+        interleaved[0::2] = z
+        interleaved[1::2] = -z
+        if 2 * pairs > remaining:
+            self._pending = interleaved[-1]
+            interleaved = interleaved[:-1]
+        rows.append(interleaved)
+        return np.concatenate(rows)
+
+    def _draw_qmc(self, num_samples: int) -> np.ndarray:
+        indices = np.arange(self._index, self._index + num_samples, dtype=np.int64)
+        self._index += num_samples
+
+        points = np.empty((num_samples, self.years))
+        for dim, (base, permutation) in enumerate(zip(self._bases, self._permutations)):
+            # scrambled radical inverse: permute every base-b digit of the index
+            ndigits = int(np.ceil(53 * np.log(2) / np.log(base)))
+            remaining = indices.copy()
+            value = np.zeros(num_samples)
+            scale = 1.0 / base
+            for _ in range(ndigits):
+                value += permutation[remaining % base] * scale
+                remaining //= base
+                scale /= base
+            points[:, dim] = value
+
+        points = (points + self._shift) % 1.0
+        return inverse_normal_cdf(points)
@@ -0,0 +1,126 @@
+"""
+LRU + TTL cache for simulation summaries.
+
+simulate_core seeds its generator with a fixed seed, so a given set of
+resolved params, sample count, year count and engine version always
+produces the same summary. Results are cached under a canonical hash of
+exactly those inputs; slider UIs re-send the same handful of
+configurations and most of them never reach the engine.
+"""
+import copy
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+from app.services.monte_carlo import ENGINE_VERSION
+
+
+def _jsonable(value):
+    # numpy scalars sneak into params (e.g. tax rates computed with NumPy)
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    raise TypeError(f"Cannot hash value of type {type(value).__name__}")
+
+
+def make_cache_key(params: dict, num_samples: int, years: int, **options) -> str:
+    """
+    Canonical hash of everything that determines a simulation result.
+    Extra keyword options (e.g. sampling mode) are folded into the key.
+    """
+    payload = {
+        "engine": ENGINE_VERSION,
+        "params": params,
+        "num_samples": int(num_samples),
+        "years": int(years),
+        "options": options,
+    }
+    blob = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=_jsonable)
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+class SimulationCache:
+    def __init__(self, max_entries: int = 1024, ttl_seconds: float = 3600.0, clock=time.monotonic,
+                 copy_values: bool = True, max_bytes: int = None):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        # values are deep-copied in and out unless the caller stores immutable objects
+        self.copy_values = copy_values
+        # optional budget on the values' `nbytes` (per-sample arrays); None counts entries only
+        self.max_bytes = max_bytes
+        self._clock = clock
+        self._entries = OrderedDict()  # key -> (expires_at, value, nbytes)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        """Returns the cached value (a copy with copy_values), or None on a miss or expired entry."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] <= self._clock():
+                self._bytes -= self._entries.pop(key)[2]
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return copy.deepcopy(entry[1]) if self.copy_values else entry[1]
+
+    def put(self, key, value):
+        if self.max_entries <= 0:
+            return
+        nbytes = int(getattr(value, "nbytes", 0))
+        if self.max_bytes is not None and nbytes > self.max_bytes:
+            return  # would evict everything else and still not fit
+        with self._lock:
+            value = copy.deepcopy(value) if self.copy_values else value
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= previous[2]
+            self._entries[key] = (self._clock() + self.ttl_seconds, value, nbytes)
+            self._bytes += nbytes
+            while len(self._entries) > self.max_entries or (
+                self.max_bytes is not None and self._bytes > self.max_bytes
+            ):
+                self._bytes -= self._entries.popitem(last=False)[1][2]
+                self.evictions += 1
+
+    def get_or_compute(self, key, compute):
+        """
+        Cached value for key, computing and storing it on a miss. Concurrent
+        misses on the same key may both compute; the result is identical.
+        """
+        value = self.get(key)
+        if value is None:
+            value = compute()
+            self.put(key, value)
+        return value
+
+    def clear(self, *_args):
+        """Drops every entry (usable directly as a registry on_reload callback)."""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "ttl_seconds": self.ttl_seconds,
+                "engine_version": ENGINE_VERSION,
+            }
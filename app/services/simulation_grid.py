@@ -0,0 +1,144 @@
+"""
+Precomputed grid of simulation summaries for every discrete UI input.
+
+/simulation/run takes a career, a state, 0-3 children, eager/conservative
+and a year count, and the engine is seeded, so each combination has exactly
+one answer. app/scripts/build_simulation_grid.py runs the engine over the
+whole grid offline and saves it next to the reference CSVs:
+
+- simulation_grid.npy: float64 array (careers, states, spending, years, 2)
+  holding mean and stdev of final net worth, opened memory-mapped
+- simulation_grid.json: the axis labels plus a freshness marker (reference
+  CSV checksum, engine version, sample count, seed)
+
+Children are not stored as an axis: child costs are a fixed yearly outflow
+that never feeds back into salaries or the house purchase, so n children
+shift every sample's final net worth by annual_child_cost * n * years and
+leave the stdev unchanged. The lookup applies that shift.
+
+A grid whose checksum does not match the loaded reference tables is never
+served; requests then fall through to the engine as before.
+"""
+import json
+import os
+
+import numpy as np
+
+from app.services.monte_carlo import (
+    DEFAULT_SEED,
+    ENGINE_VERSION,
+    SimulationOptions,
+    draw_shocks,
+    simulate_networths_batch,
+    summarize_networths,
+)
+from app.services.reference_data import DATA_DIR
+
+GRID_FILE = "simulation_grid.npy"
+GRID_META_FILE = "simulation_grid.json"
+
+GRID_NUM_SAMPLES = 100  # the /simulation/run default
+GRID_SPENDING = ("eager", "conservative")
+GRID_MAX_CHILDREN = 3
+GRID_YEARS = (10, 60)
+
+
+def grid_axes(reference) -> tuple:
+    """(career_ids, states) the grid covers: every career and state the engine can simulate."""
+    career_ids = sorted(c.career_id for c in reference.careers.values() if c.starting_salary is not None)
+    states = sorted(s.state for s in reference.states.values() if s.home_growth_rate is not None)
+    return career_ids, states
+
+
+def build_year_slice(reference, resolve_params, career_ids, states, years: int,
+                     num_samples: int = GRID_NUM_SAMPLES, configs_per_pass: int = 2000) -> np.ndarray:
+    """
+    Summaries for one year count, shape (careers, states, spending, 2). Every
+    cell sees the same seeded draws simulate_core would use for this year
+    count, and cells are stacked through the batch engine.
+    """
+    rng = np.random.default_rng(seed=DEFAULT_SEED)
+    shocks = draw_shocks(rng, num_samples, years)
+
+    cells = [
+        (i, j, k, {"career_id": career_id, "location": state, "num_children": 0,
+                   "spending": spending, "years": years})
+        for i, career_id in enumerate(career_ids)
+        for j, state in enumerate(states)
+        for k, spending in enumerate(GRID_SPENDING)
+    ]
+    out = np.full((len(career_ids), len(states), len(GRID_SPENDING), 2), np.nan)
+    for start in range(0, len(cells), configs_per_pass):
+        chunk = cells[start:start + configs_per_pass]
+        resolved = [resolve_params(data, reference) for _, _, _, data in chunk]
+        networths = simulate_networths_batch(
+            [params for params, _, _ in resolved],
+            [tax_brackets for _, tax_brackets, _ in resolved],
+            reference.home_values,
+            shocks,
+        )
+        for (i, j, k, _), row in zip(chunk, networths):
+            summary = summarize_networths(row)
+            out[i, j, k] = summary["mean"], summary["stdev"]
+    return out
+
+
+class SimulationGrid:
+    def __init__(self, values: np.ndarray, meta: dict):
+        self.values = values
+        self.meta = meta
+        self._careers = {career_id: i for i, career_id in enumerate(meta["careers"])}
+        self._states = {state: j for j, state in enumerate(meta["states"])}
+        self._spending = {spending: k for k, spending in enumerate(meta["spending"])}
+        self.min_years, self.max_years = meta["years"]
+
+    @classmethod
+    def load(cls, data_dir: str = DATA_DIR):
+        """Memory-maps a built grid, or returns None when there is none."""
+        grid_path = os.path.join(data_dir, GRID_FILE)
+        meta_path = os.path.join(data_dir, GRID_META_FILE)
+        if not (os.path.exists(grid_path) and os.path.exists(meta_path)):
+            return None
+        with open(meta_path, encoding="utf-8") as f:
+            meta = json.load(f)
+        return cls(np.load(grid_path, mmap_mode="r"), meta)
+
+    def save(self, data_dir: str = DATA_DIR):
+        # metadata last: a grid without its metadata is never loaded
+        np.save(os.path.join(data_dir, GRID_FILE), np.asarray(self.values))
+        with open(os.path.join(data_dir, GRID_META_FILE), "w", encoding="utf-8") as f:
+            json.dump(self.meta, f, indent=1)
+
+    def is_fresh(self, reference) -> bool:
+        return (
+            self.meta.get("reference_checksum") == reference.checksum
+            and self.meta.get("engine_version") == ENGINE_VERSION
+        )
+
+    def lookup(self, reference, params: dict, num_samples: int, years: int, options=None):
+        """
+        Summary for resolved /simulation/run params, or None when they are off the grid
+        (non-default options or sample count, unknown inputs, years out of
+        range) or the grid is stale.
+        """
+        if options is not None and options != SimulationOptions():
+            return None
+        if num_samples != self.meta["num_samples"] or not self.min_years <= years <= self.max_years:
+            return None
+        num_children = params["num_children"]
+        if not 0 <= num_children <= self.meta["max_children"]:
+            return None
+
+        i = self._careers.get(params.get("career_id"))
+        j = self._states.get(params["location"])
+        k = self._spending.get(params["spending_type"])
+        if i is None or j is None or k is None or not self.is_fresh(reference):
+            return None
+
+        mean, stdev = self.values[i, j, k, years - self.min_years]
+        if np.isnan(mean):
+            return None
+        return {
+            "mean": float(mean) - params["annual_child_cost"] * num_children * years,
+            "stdev": float(stdev),
+        }
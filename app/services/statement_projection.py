@@ -0,0 +1,113 @@
+"""
+Projects a user's stored balance-sheet items (the statements table) and
+folds them into the salary Monte Carlo.
+
+Every FinStatements row is either an asset (liab_status false) or a
+liability (liab_status true):
+
+- assets compound at `growth` per year for the whole horizon
+- liabilities are a balance charging `growth` as APR; with a `term` they
+  are paid off in equal annual installments over `term` years, without one
+  they are interest-only and the balance stays put
+
+A user's items arrive as column arrays (one query), and all assets and all
+liabilities are projected at once as (items, years) matrices, amortizing
+with the same closed-form schedules as the lifecycle engine.
+
+The items are deterministic, so they shift every sample's net worth in a
+year by the same amount: asset values minus liability balances minus the
+debt payments made so far (paid from the same cash the salary simulation
+accumulates). A per-year shift moves every quantile and the mean by that
+amount and leaves the stdev unchanged, which is how the statements are
+combined with the cached Monte Carlo bands without touching the samples.
+"""
+from dataclasses import dataclass
+
+import numpy as np
+
+from app.services.lifecycle import amortization_schedules
+
+
+@dataclass(frozen=True)
+class StatementArrays:
+    ids: np.ndarray
+    names: list
+    valuation: np.ndarray
+    growth: np.ndarray
+    term: np.ndarray  # 0 where the row has no term
+    is_liability: np.ndarray
+
+    @classmethod
+    def from_rows(cls, rows) -> "StatementArrays":
+        """(id, name, valuation, growth, term, liab_status) tuples, as returned by the statements query."""
+        if not rows:
+            empty = np.zeros(0)
+            return cls(np.zeros(0, dtype=np.int64), [], empty, empty, empty, np.zeros(0, dtype=bool))
+        ids, names, valuation, growth, term, liab_status = zip(*rows)
+        return cls(
+            ids=np.array(ids, dtype=np.int64),
+            names=list(names),
+            valuation=np.array(valuation, dtype=float),
+            growth=np.array(growth, dtype=float),
+            term=np.nan_to_num(np.array(term, dtype=float)),
+            is_liability=np.array(liab_status, dtype=bool),
+        )
+
+    def __len__(self):
+        return len(self.ids)
+
+
+def project_statements(statements: StatementArrays, years: int) -> dict:
+    """
+    End-of-year totals for every year of a horizon of `years` >= 1, as arrays
+    of that length ("assets", "liabilities", "payments", "cumulative_payments",
+    "networth_shift"), plus per-item "final_values" and "annual_payments".
+    """
+    assets = ~statements.is_liability
+    k = np.arange(1, years + 1, dtype=float)
+
+    asset_values = statements.valuation[assets, None] * (1.0 + statements.growth[assets, None]) ** k
+
+    balance = statements.valuation[statements.is_liability]
+    rate = statements.growth[statements.is_liability]
+    term = statements.term[statements.is_liability]
+    amortizing = term > 0
+    payments, balances = amortization_schedules(balance, rate, term, years)
+    # no term: interest-only, the balance never comes down
+    payments = np.where(amortizing[:, None], payments, (balance * rate)[:, None])
+    balances = np.where(amortizing[:, None], balances, balance[:, None])
+
+    yearly_payments = payments.sum(axis=0)
+    cumulative_payments = np.cumsum(yearly_payments)
+    asset_totals = asset_values.sum(axis=0)
+    liability_totals = balances.sum(axis=0)
+
+    final_values = np.empty(len(statements))
+    final_values[assets] = asset_values[:, -1]
+    final_values[statements.is_liability] = balances[:, -1]
+    annual_payments = np.zeros(len(statements))
+    annual_payments[statements.is_liability] = payments[:, 0]
+
+    return {
+        "assets": asset_totals,
+        "liabilities": liability_totals,
+        "payments": yearly_payments,
+        "cumulative_payments": cumulative_payments,
+        "networth_shift": asset_totals - liability_totals - cumulative_payments,
+        "final_values": final_values,
+        "annual_payments": annual_payments,
+    }
+
+
+def shift_summary(summary: dict, shift: np.ndarray) -> dict:
+    """
+    A Monte Carlo summary (mean/stdev of final net worth, optional per-year
+    percentile bands) with the statements' per-year net worth shift added.
+    """
+    shifted = dict(summary)
+    shifted["mean"] = summary["mean"] + float(shift[-1])
+    if "percentiles" in summary:
+        shifted["percentiles"] = {
+            label: [float(v) for v in np.asarray(band) + shift] for label, band in summary["percentiles"].items()
+        }
+    return shifted
@@ -0,0 +1,161 @@
+"""
+Mergeable summary statistics for simulations that run in blocks of samples.
+
+RunningMoments combines count/mean/M2 across blocks exactly (Chan et al.'s
+parallel update), so a run split into blocks, shards or chunks reports the
+same mean and stdev as one pass over every sample.
+
+YearlyQuantileSketch keeps per-year quantiles of net worth without storing
+the samples x years matrix. It is exact while it holds few enough values,
+then compresses each year to a fixed number of equal-weight centroids, so
+memory grows with years x compression rather than with the sample count.
+Sketches built on separate blocks or processes can be merged.
+"""
+import numpy as np
+
+DEFAULT_PERCENTILES = (5, 25, 50, 75, 95)
+
+
+class RunningMoments:
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0  # sum of squared deviations from the mean
+
+    def update(self, values):
+        values = np.asarray(values, dtype=float).ravel()
+        if len(values) == 0:
+            return self
+        block = RunningMoments()
+        block.count = len(values)
+        block.mean = float(np.mean(values))
+        block.m2 = float(np.sum((values - block.mean) ** 2))
+        return self.merge(block)
+
+    def merge(self, other: "RunningMoments"):
+        if other.count == 0:
+            return self
+        if self.count == 0:
+            self.count, self.mean, self.m2 = other.count, other.mean, other.m2
+            return self
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / count
+        self.m2 += other.m2 + delta * delta * self.count * other.count / count
+        self.count = count
+        return self
+
+    @property
+    def stdev(self) -> float:
+        """Population standard deviation (matches np.std)."""
+        return float(np.sqrt(self.m2 / self.count)) if self.count else 0.0
+
+    @property
+    def standard_error(self) -> float:
+        """Standard error of the mean, from the sample (ddof=1) variance."""
+        if self.count < 2:
+            return float("inf")
+        return float(np.sqrt(self.m2 / (self.count - 1) / self.count))
+
+    def summary(self) -> dict:
+        return {"mean": float(self.mean), "stdev": self.stdev}
+
+
+class YearlyQuantileSketch:
+    def __init__(self, years: int, compression: int = 500, capacity: int = 2000):
+        self.years = years
+        self.compression = compression
+        self.capacity = max(capacity, compression)
+        self.values = np.empty((years, 0))
+        self.weights = np.empty((years, 0))
+        self.minimum = np.full(years, np.inf)
+        self.maximum = np.full(years, -np.inf)
+        self.exact = True
+
+    def update(self, values_by_year: np.ndarray):
+        """Adds a (years, n) block of values, one row per year."""
+        values_by_year = np.asarray(values_by_year, dtype=float)
+        self._add(values_by_year, np.ones_like(values_by_year))
+        self.minimum = np.minimum(self.minimum, values_by_year.min(axis=1, initial=np.inf))
+        self.maximum = np.maximum(self.maximum, values_by_year.max(axis=1, initial=-np.inf))
+        return self
+
+    def merge(self, other: "YearlyQuantileSketch"):
+        self._add(other.values, other.weights)
+        self.exact = self.exact and other.exact
+        self.minimum = np.minimum(self.minimum, other.minimum)
+        self.maximum = np.maximum(self.maximum, other.maximum)
+        return self
+
+    def _add(self, values, weights):
+        self.values = np.concatenate([self.values, values], axis=1)
+        self.weights = np.concatenate([self.weights, weights], axis=1)
+        if self.values.shape[1] > self.capacity:
+            self._compress()
+
+    def _compress(self):
+        """Collapses every year to `compression` equal-weight centroids in one pass."""
+        k = self.compression
+        order = np.argsort(self.values, axis=1, kind="stable")
+        values = np.take_along_axis(self.values, order, axis=1)
+        weights = np.take_along_axis(self.weights, order, axis=1)
+
+        cumulative = np.cumsum(weights, axis=1)
+        total = cumulative[:, -1:]
+        bins = np.minimum(((cumulative - weights / 2) / total * k).astype(np.int64), k - 1)
+        flat = (bins + np.arange(self.years)[:, None] * k).ravel()
+
+        size = self.years * k
+        weight_sums = np.bincount(flat, weights=weights.ravel(), minlength=size).reshape(self.years, k)
+        value_sums = np.bincount(
+            flat, weights=np.where(weights > 0, weights * values, 0.0).ravel(), minlength=size
+        ).reshape(self.years, k)
+
+        with np.errstate(invalid="ignore", divide="ignore"):
+            self.values = np.where(weight_sums > 0, value_sums / weight_sums, 0.0)
+        self.weights = weight_sums
+        self.exact = False
+
+    def quantiles(self, percentiles=DEFAULT_PERCENTILES) -> np.ndarray:
+        """Returns an array of shape (len(percentiles), years)."""
+        q = np.asarray(percentiles, dtype=float) / 100
+        if self.exact:
+            return np.quantile(self.values, q, axis=1)
+
+        out = np.empty((len(q), self.years))
+        for year in range(self.years):
+            keep = self.weights[year] > 0
+            values = self.values[year, keep]
+            weights = self.weights[year, keep]
+            order = np.argsort(values, kind="stable")
+            values, weights = values[order], weights[order]
+            cumulative = np.cumsum(weights)
+            # each centroid sits at the middle of the probability mass it holds
+            positions = (cumulative - weights / 2) / cumulative[-1]
+            out[:, year] = np.interp(
+                q,
+                np.concatenate([[0.0], positions, [1.0]]),
+                np.concatenate([[self.minimum[year]], values, [self.maximum[year]]]),
+            )
+        return out
+
+
+def parse_percentiles(value):
+    """
+    Request option -> tuple of percentiles, or None when not requested.
+    Accepts true (the default bands) or a list of numbers in (0, 100).
+    """
+    if value is None or value is False:
+        return None
+    if value is True:
+        return DEFAULT_PERCENTILES
+    if not isinstance(value, (list, tuple)) or not value:
+        raise ValueError("percentiles must be true or a list of numbers between 0 and 100")
+    percentiles = tuple(float(p) for p in value)
+    if any(not 0 < p < 100 for p in percentiles):
+        raise ValueError("percentiles must be between 0 and 100")
+    return percentiles
+
+
+def percentile_label(p) -> str:
+    return f"p{float(p):g}"
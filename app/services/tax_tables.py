@@ -0,0 +1,96 @@
+"""
+Per-state progressive income tax tables compiled from locations_table.csv.
+
+Each state's brackets are parsed once into three sorted arrays (lower
+bounds, marginal rates and the cumulative tax owed at each lower bound), so
+the tax on any number of salaries is one searchsorted pass instead of a
+DataFrame filter and a Python walk over the brackets per salary.
+"""
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+NATIONAL_STATE = "United States overall"
+
+
+@dataclass(frozen=True)
+class TaxBrackets:
+    lower_bounds: np.ndarray
+    rates: np.ndarray
+    cumulative_tax: np.ndarray
+
+    @classmethod
+    def from_arrays(cls, lower_bounds, rates) -> "TaxBrackets":
+        lower_bounds = np.asarray(lower_bounds, dtype=float)
+        rates = np.asarray(rates, dtype=float)
+
+        keep = ~np.isnan(lower_bounds)
+        lower_bounds, rates = lower_bounds[keep], rates[keep]
+        order = np.argsort(lower_bounds, kind="stable")
+        lower_bounds, rates = lower_bounds[order], rates[order]
+
+        # tax owed on an income of exactly lower_bounds[i]
+        cumulative_tax = np.zeros_like(lower_bounds)
+        if len(lower_bounds) > 1:
+            cumulative_tax[1:] = np.cumsum(np.diff(lower_bounds) * rates[:-1])
+
+        return cls(lower_bounds, rates, cumulative_tax)
+
+    def tax(self, salaries):
+        """
+        Progressive tax owed on a salary or an array of salaries.
+        Salaries below the first bracket (or states without brackets) owe nothing.
+        """
+        salaries = np.asarray(salaries)
+        if salaries.dtype.kind != "f":
+            salaries = salaries.astype(float)
+        if len(self.lower_bounds) == 0:
+            tax = np.zeros_like(salaries)
+        else:
+            # float32 salary matrices are taxed (and returned) in float32
+            dtype = salaries.dtype
+            lower_bounds = self.lower_bounds.astype(dtype, copy=False)
+            idx = np.searchsorted(lower_bounds, salaries, side="right") - 1
+            safe = np.maximum(idx, 0)
+            tax = self.cumulative_tax.astype(dtype, copy=False)[safe]
+            tax += (salaries - lower_bounds[safe]) * self.rates.astype(dtype, copy=False)[safe]
+            tax = np.where(idx >= 0, tax, dtype.type(0))
+        return float(tax) if tax.ndim == 0 else tax
+
+
+EMPTY_BRACKETS = TaxBrackets.from_arrays([], [])
+
+
+class TaxTables:
+    """Compiled brackets for every state in the locations table."""
+
+    def __init__(self, brackets_by_state: dict):
+        self._brackets = brackets_by_state
+
+    @classmethod
+    def from_locations_df(cls, locations_df: pd.DataFrame) -> "TaxTables":
+        lower = pd.to_numeric(locations_df["Income range"], errors="coerce")
+        rates = pd.to_numeric(locations_df["tax rate"], errors="coerce")
+        brackets = {}
+        for state, rows in lower.groupby(locations_df["State"], sort=False):
+            brackets[state] = TaxBrackets.from_arrays(rows.to_numpy(), rates[rows.index].to_numpy())
+        return cls(brackets)
+
+    @property
+    def states(self):
+        return list(self._brackets)
+
+    def for_state(self, state) -> TaxBrackets:
+        """
+        Brackets for a state. A missing state (None) uses the national
+        brackets; a state that is not in the table has no brackets and owes
+        no tax, same as the original DataFrame lookup.
+        """
+        if state is None:
+            state = NATIONAL_STATE
+        return self._brackets.get(state, EMPTY_BRACKETS)
+
+    def tax(self, state, salaries):
+        return self.for_state(state).tax(salaries)
+
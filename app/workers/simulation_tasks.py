@@ -0,0 +1,149 @@
+"""
+Background simulation jobs.
+
+Large num_samples / years runs are submitted as jobs instead of tying up a
+gunicorn request thread. With USE_CELERY on, jobs go to the Celery worker
+(`make worker`); otherwise they run on an in-process thread pool with the
+same submit/status interface, so the API behaves the same in both setups.
+
+For tests, set CELERY_TASK_ALWAYS_EAGER=1 to run tasks inline; results are
+then kept in an in-memory backend unless CELERY_RESULT_BACKEND is set.
+"""
+import threading
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from celery import Celery
+
+from app.config import Settings
+
+settings = Settings()
+
+
+def _truthy(value) -> bool:
+    return str(value or "").strip().lower() in {"1", "true", "yes", "on"}
+
+
+celery_app = Celery(
+    "simulation_tasks",
+    broker=settings.CELERY_BROKER_URL or "redis://localhost:6379/0",
+    backend=settings.CELERY_RESULT_BACKEND
+    or ("cache+memory://" if _truthy(settings.CELERY_TASK_ALWAYS_EAGER) else None),
+)
+celery_app.conf.update(
+    task_serializer="json",
+    result_serializer="json",
+    accept_content=["json"],
+    task_track_started=True,
+    task_always_eager=_truthy(settings.CELERY_TASK_ALWAYS_EAGER),
+    task_store_eager_result=True,
+    result_expires=3600,
+)
+
+
+def run_simulation_job(data: dict, reference=None) -> dict:
+    """
+    Resolves params and runs the simulation for a /simulation/run style
+    payload. Returns the same body the synchronous endpoint does.
+    """
+    # imported here: the routes module imports this one to submit jobs
+    from app.api.routes.simulations import get_params, simulate_core
+    from app.services.monte_carlo import SimulationOptions, run_size
+    from app.services.reference_data import worker_reference_data
+
+    if reference is None:
+        # workers load their own copy of the reference tables on the first task
+        reference = worker_reference_data()
+
+    years, num_samples = run_size(data)
+    params, tax_brackets, home_values = get_params(data, reference)
+    summary = simulate_core(
+        params,
+        tax_brackets,
+        home_values,
+        num_samples=num_samples,
+        years=years,
+        options=SimulationOptions.from_request(data),
+    )
+    return {"summary": summary, "years": years, "params": params}
+
+
+@celery_app.task(name="simulations.run")
+def run_simulation_task(data: dict) -> dict:
+    return run_simulation_job(data)
+
+
+class CeleryJobExecutor:
+    """Submits jobs to the Celery worker and reads their state from the result backend."""
+
+    _STATES = {
+        "PENDING": "pending",
+        "RECEIVED": "pending",
+        "RETRY": "pending",
+        "STARTED": "running",
+        "SUCCESS": "succeeded",
+        "FAILURE": "failed",
+        "REVOKED": "failed",
+    }
+
+    def submit(self, data: dict, reference=None) -> str:
+        # workers load their own copy of the reference tables
+        return run_simulation_task.delay(data).id
+
+    def status(self, job_id: str):
+        result = celery_app.AsyncResult(job_id)
+        body = {"job_id": job_id, "status": self._STATES.get(result.state, "pending")}
+        if result.state == "SUCCESS":
+            body["result"] = result.result
+        elif result.state in ("FAILURE", "REVOKED"):
+            body["error"] = str(result.result)
+        return body
+
+
+class LocalJobExecutor:
+    """
+    In-process fallback when Celery is off. Keeps the most recent
+    max_jobs jobs; older finished ones are forgotten.
+    """
+
+    def __init__(self, max_workers: int = 2, max_jobs: int = 1000):
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="simulation-job")
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+        self.max_jobs = max_jobs
+
+    def submit(self, data: dict, reference=None) -> str:
+        job_id = str(uuid.uuid4())
+        future = self._pool.submit(run_simulation_job, data, reference)
+        with self._lock:
+            self._jobs[job_id] = future
+            while len(self._jobs) > self.max_jobs:
+                oldest_id, oldest = next(iter(self._jobs.items()))
+                if not oldest.done():
+                    break
+                del self._jobs[oldest_id]
+        return job_id
+
+    def status(self, job_id: str):
+        """Job state dict, or None for an unknown job id."""
+        with self._lock:
+            future = self._jobs.get(job_id)
+        if future is None:
+            return None
+
+        body = {"job_id": job_id}
+        if not future.done():
+            body["status"] = "running" if future.running() else "pending"
+        elif future.exception() is not None:
+            body["status"] = "failed"
+            body["error"] = str(future.exception())
+        else:
+            body["status"] = "succeeded"
+            body["result"] = future.result()
+        return body
+
+
+def create_job_executor(use_celery):
+    """Celery-backed executor when USE_CELERY is truthy, in-process otherwise."""
+    return CeleryJobExecutor() if _truthy(use_celery) else LocalJobExecutor()
@@ -0,0 +1,86 @@
+"""
+The original scalar implementations (one Python loop per sample, year and
+tax bracket), kept as the reference the vectorized code must reproduce.
+"""
+import numpy as np
+import pandas as pd
+
+
+def get_tax_value(locations_df, state, salary):
+    state_name = "United States overall" if state is None else state
+    brackets = locations_df[locations_df["State"] == state_name].copy()
+    brackets["Income range"] = pd.to_numeric(brackets["Income range"], errors="coerce")
+    eligible_brackets = brackets[brackets["Income range"] <= salary]
+
+    total_tax = 0
+    remaining_salary = salary
+    for i in reversed(range(len(eligible_brackets))):
+        lower_bound = eligible_brackets.iloc[i]["Income range"]
+        rate = eligible_brackets.iloc[i]["tax rate"]
+        if remaining_salary > lower_bound:
+            total_tax += (remaining_salary - lower_bound) * rate
+            remaining_salary = lower_bound
+    return total_tax
+
+
+def get_home_payment(principal):
+    annual_rate, term_years = 0.05, 30
+    growth = (1 + annual_rate) ** term_years
+    return principal * (annual_rate * growth / (growth - 1))
+
+
+def simulate_core(params, locations_df, home_and_rental_table, num_samples, years):
+    rng = np.random.default_rng(seed=42)
+    eager = params["spending_type"] == "eager"
+    hv_col = "Home Value (3x) (eager spending)" if eager else "Home Value (2.5x) (conservative spending)"
+
+    networths = []
+    for _ in range(num_samples):
+        local_salary = params["starting_salary"]
+        total_cash = 0.0
+        bought_a_house = False
+        home_value = annual_payment = mortgage_balance = 0.0
+
+        for _year in range(years):
+            local_salary *= 1.0 + rng.normal(params["salary_growth_mean"], params["salary_growth_sd"])
+
+            if not bought_a_house:
+                if local_salary < params["salary_to_buy_house"]:
+                    rent_or_mortgage_payment = 0.3 * local_salary
+                else:
+                    rounded_salary = round(local_salary / 20_000) * 20_000
+                    rows = home_and_rental_table[home_and_rental_table["Starting Salary"] == rounded_salary]
+                    if rows.empty:
+                        rows = home_and_rental_table.iloc[[0]]
+                    home_value = float(rows[hv_col].iloc[0])
+                    annual_payment = get_home_payment(0.91 * home_value)
+                    mortgage_balance = 0.91 * home_value
+                    bought_a_house = True
+                    rent_or_mortgage_payment = 0.09 * home_value
+            else:
+                home_value *= 1.0 + params["home_growth_rate"]
+                if mortgage_balance > 0:
+                    interest = mortgage_balance * 0.05
+                    principal_paid = annual_payment - interest
+                    if principal_paid > mortgage_balance:
+                        principal_paid = mortgage_balance
+                        effective_payment = interest + principal_paid
+                    else:
+                        effective_payment = annual_payment
+                    mortgage_balance -= principal_paid
+                    rent_or_mortgage_payment = effective_payment
+                else:
+                    rent_or_mortgage_payment = 0.0
+
+            after_tax_income = local_salary - get_tax_value(locations_df, params["location"], local_salary)
+            yearly_spending = (0.5 if eager else 0.4) * after_tax_income
+            total_cash += (
+                after_tax_income
+                - rent_or_mortgage_payment
+                - yearly_spending
+                - params["annual_child_cost"] * params["num_children"]
+            )
+
+        networths.append(total_cash + home_value - mortgage_balance)
+
+    return {"mean": float(np.mean(networths)), "stdev": float(np.std(networths))}
@@ -0,0 +1,44 @@
+import os
+
+import pandas as pd
+import pytest
+
+# create_app() reads its settings from the environment; the simulation routes never touch the database
+os.environ.setdefault("DATABASE_URL", "sqlite:///:memory:")
+os.environ.setdefault("SECRET_KEY", "test")
+
+APP_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app")
+
+
+@pytest.fixture(scope="session")
+def app():
+    from app import create_app
+
+    return create_app()
+
+
+@pytest.fixture
+def client(app):
+    app.simulation_cache.clear()
+    app.simulation_stage_cache.clear()
+    return app.test_client()
+
+
+@pytest.fixture(scope="session")
+def reference(app):
+    return app.reference_data.data
+
+
+@pytest.fixture(scope="session")
+def locations_df():
+    return pd.read_csv(os.path.join(APP_DIR, "locations_table.csv"))
+
+
+@pytest.fixture(scope="session")
+def home_and_rental_table():
+    return pd.read_csv(os.path.join(APP_DIR, "Home Value & Rent Value Table - Sheet1.csv"))
+
+
+@pytest.fixture
+def run_body():
+    return {"career_id": "15-1250", "location": "California", "num_children": 1, "spending": "eager", "years": 20}
@@ -0,0 +1,67 @@
+import numpy as np
+import pytest
+
+from app.api.routes.simulations import get_params
+from app.services.monte_carlo import simulate_adaptive, simulate_networths
+from app.services.sampling import ShockSampler
+
+
+@pytest.fixture
+def engine_inputs(app, run_body):
+    with app.app_context():
+        return get_params(run_body)
+
+
+def _adaptive(engine_inputs, **kwargs):
+    params, tax_brackets, home_values = engine_inputs
+    return simulate_adaptive(params, tax_brackets, home_values, years=20, rng=np.random.default_rng(42), **kwargs)
+
+
+def test_stops_once_the_tolerance_is_met(engine_inputs):
+    summary = _adaptive(engine_inputs, rel_tol=0.05, max_samples=20_000)
+    assert summary["converged"]
+    assert summary["relative_error"] <= 0.05
+    assert summary["samples_used"] < 20_000
+
+    tighter = _adaptive(engine_inputs, rel_tol=0.01, max_samples=20_000)
+    assert tighter["relative_error"] <= 0.01
+    assert tighter["samples_used"] > summary["samples_used"]
+
+
+def test_honours_the_sample_cap(engine_inputs):
+    summary = _adaptive(engine_inputs, rel_tol=1e-6, max_samples=300)
+    assert summary["samples_used"] == 300
+    assert not summary["converged"]
+    assert summary["relative_error"] > 1e-6
+
+
+def test_reports_the_samples_it_used(engine_inputs):
+    params, tax_brackets, home_values = engine_inputs
+    summary = _adaptive(engine_inputs, rel_tol=0.05)
+    n = summary["samples_used"]
+
+    # the adaptive run is a prefix of the fixed-size stream
+    shocks = ShockSampler(np.random.default_rng(42), 20).draw(n)
+    networths = simulate_networths(params, tax_brackets, home_values, n, 20, shocks=shocks)
+    assert summary["mean"] == pytest.approx(np.mean(networths), rel=1e-12)
+    assert summary["stdev"] == pytest.approx(np.std(networths), rel=1e-12)
+    standard_error = np.std(networths, ddof=1) / np.sqrt(n)
+    assert summary["standard_error"] == pytest.approx(standard_error, rel=1e-9)
+    assert summary["relative_error"] == pytest.approx(standard_error / abs(np.mean(networths)), rel=1e-9)
+
+
+def test_run_endpoint_reports_adaptive_fields(client, run_body):
+    body = client.post("/api/v1/simulation/run", json={**run_body, "rel_tol": 0.05, "max_samples": 5000}).get_json()
+    assert body["summary"]["converged"]
+    assert 0 < body["summary"]["samples_used"] <= 5000
+
+
+@pytest.mark.parametrize("route", ["/api/v1/simulation/run", "/api/v1/simulation/run/stream", "/api/v1/simulation/sliders"])
+@pytest.mark.parametrize("change", [{"num_samples": 0}, {"num_samples": -5}, {"years": 0}, {"years": "ten"}])
+def test_sample_and_year_counts_are_validated(client, run_body, route, change):
+    body = {**run_body, **change}
+    if route.endswith("sliders"):
+        body = {**client.post("/api/v1/simulation/run", json=run_body).get_json()["params"], **change}
+    response = client.post(route, json=body)
+    assert response.status_code == 400
+    assert "error" in response.get_json()
@@ -0,0 +1,67 @@
+import pytest
+
+from app.api.routes.simulations import get_params, simulate_core
+from app.services.batch_simulation import run_batch
+from app.services.monte_carlo import SimulationOptions, fits_in_one_pass, path_bytes
+
+
+def test_batch_matches_single_runs_in_input_order(client, run_body):
+    configs = [
+        {**run_body, "num_samples": 40},
+        {**run_body, "location": "Nowhere"},
+        {**run_body, "spending": "conservative", "num_samples": 40, "years": 10},
+        {**run_body, "num_samples": 40},
+    ]
+    response = client.post("/api/v1/simulation/batch", json={"configs": configs})
+    assert response.status_code == 200
+    results = response.get_json()["results"]
+
+    assert "error" in results[1]
+    for config, result in zip(configs, results):
+        if "error" in result:
+            continue
+        single = client.post("/api/v1/simulation/run", json=config).get_json()
+        assert result["summary"] == pytest.approx(single["summary"], rel=1e-12)
+        assert result["years"] == single["years"]
+
+
+@pytest.mark.parametrize("change", [{"rel_tol": 0.01}, {"shards": 2}, {"deadline_ms": 50}, {"sampling": "nope"}])
+def test_batch_reports_invalid_options_per_config(client, run_body, change):
+    configs = [{**run_body, "num_samples": 20}, {**run_body, "num_samples": 20, **change}]
+    results = client.post("/api/v1/simulation/batch", json={"configs": configs}).get_json()["results"]
+    assert "summary" in results[0]
+    assert "error" in results[1]
+
+
+def test_batch_and_run_share_cache_entries(app, client, run_body):
+    config = {**run_body, "num_samples": 30}
+    cache = app.simulation_cache
+
+    client.post("/api/v1/simulation/batch", json={"configs": [config]})
+    hits = cache.stats()["hits"]
+    client.post("/api/v1/simulation/run", json=config)
+    assert cache.stats()["hits"] == hits + 1
+
+    cache.clear()
+    client.post("/api/v1/simulation/run", json=config)
+    hits = cache.stats()["hits"]
+    client.post("/api/v1/simulation/batch", json={"configs": [config]})
+    assert cache.stats()["hits"] == hits + 1
+
+
+def test_fits_in_one_pass():
+    float64 = SimulationOptions()
+    limit_mb = path_bytes(1000, 20) / 2**20
+    assert fits_in_one_pass(1000, 20, float64, limit_mb)
+    assert not fits_in_one_pass(1001, 20, float64, limit_mb)
+    assert not fits_in_one_pass(10, 20, SimulationOptions(precision="float32"), limit_mb)
+
+
+def test_oversized_batch_configs_run_blocked_like_simulate_core(app, reference, run_body):
+    config = {**run_body, "num_samples": 500}
+    limit_mb = path_bytes(100, 20) / 2**20  # 500 samples need five blocks
+    with app.app_context():
+        [result] = run_batch([config], reference, get_params, memory_limit_mb=limit_mb)
+        params, tax_brackets, home_values = get_params(config, reference)
+        expected = simulate_core(params, tax_brackets, home_values, 500, 20, memory_limit_mb=limit_mb)
+    assert result["summary"] == pytest.approx(expected, rel=1e-12)
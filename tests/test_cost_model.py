@@ -0,0 +1,78 @@
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+import app.services.cost_model as cost_model
+import app.services.monte_carlo as monte_carlo
+from app.api.routes.simulations import get_params
+from app.services.cost_model import CostModel
+from app.services.monte_carlo import DEADLINE_HEADROOM, simulate_deadline
+
+# (fixed_ms, per_year_ms, per_cell_ms) of the pretend engine
+TRUE_COEFFICIENTS = (0.5, 0.01, 1e-3)
+
+
+class FakeClock:
+    """perf_counter that only advances when the pretend engine does work."""
+
+    def __init__(self):
+        self.ms = 0.0
+
+    def perf_counter(self):
+        return self.ms / 1000
+
+
+def _timed_engine(monkeypatch, module, clock, model, run=lambda *args, **kwargs: None):
+    """Replaces module.simulate_networths with one that costs model.predict_ms on the clock."""
+    monkeypatch.setattr(module, "time", SimpleNamespace(perf_counter=clock.perf_counter))
+
+    def simulate_networths(params, tax_brackets, home_values, num_samples, years, **kwargs):
+        clock.ms += model.predict_ms(num_samples, years)
+        return run(params, tax_brackets, home_values, num_samples, years, **kwargs)
+
+    monkeypatch.setattr(module, "simulate_networths", simulate_networths)
+
+
+@pytest.fixture
+def engine_inputs(app, run_body):
+    with app.app_context():
+        return get_params(run_body)
+
+
+def test_calibration_recovers_the_coefficients(monkeypatch, engine_inputs):
+    _, tax_brackets, home_values = engine_inputs
+    truth = CostModel({"float64": TRUE_COEFFICIENTS})
+    _timed_engine(monkeypatch, cost_model, FakeClock(), truth)
+
+    fitted = CostModel.calibrate(tax_brackets, home_values, repeats=1)
+    for precision in monte_carlo.PRECISIONS:
+        assert fitted.coefficients[precision] == pytest.approx(TRUE_COEFFICIENTS, rel=1e-6)
+
+
+def test_samples_within_inverts_predict_ms():
+    model = CostModel({"float64": TRUE_COEFFICIENTS})
+    samples = model.samples_within(100.0, 20)
+    assert model.predict_ms(samples, 20) <= 100.0 < model.predict_ms(samples + 1, 20)
+    assert model.samples_within(0.1, 20) == 0
+
+
+def test_tighter_deadline_runs_fewer_samples(monkeypatch, engine_inputs):
+    params, tax_brackets, home_values = engine_inputs
+    model = CostModel({"float64": TRUE_COEFFICIENTS})
+    clock = FakeClock()
+    _timed_engine(monkeypatch, monte_carlo, clock, model, run=monte_carlo.simulate_networths)
+
+    def run(deadline_ms):
+        clock.ms = 0.0
+        return simulate_deadline(
+            params, tax_brackets, home_values, years=20, rng=np.random.default_rng(42),
+            deadline_ms=deadline_ms, cost_model=model,
+        )
+
+    tight, loose = run(20), run(100)
+    assert tight["samples_used"] < loose["samples_used"]
+    for summary in (tight, loose):
+        assert summary["elapsed_ms"] <= summary["deadline_ms"] * DEADLINE_HEADROOM
+    # no room for even the first block: the minimum is still simulated
+    assert run(0.5)["samples_used"] == monte_carlo.MIN_ADAPTIVE_SAMPLES
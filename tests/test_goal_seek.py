@@ -0,0 +1,86 @@
+import numpy as np
+import pytest
+
+from app.api.routes.simulations import get_params
+from app.services.goal_seek import GoalSpec, solve_continuous, solve_integer, solve_years
+from app.services.monte_carlo import IncomePaths, simulate_networths
+from app.services.sampling import ShockSampler
+
+
+def test_solve_continuous_finds_the_crossing():
+    result = solve_continuous(lambda x: 10 * x, 0.0, 1.0, target=3.0, tolerance=1e-6)
+    assert result["value"] == pytest.approx(0.3, abs=1e-6)
+    assert solve_continuous(lambda x: 10 * x, 0.0, 1.0, target=30.0, tolerance=1e-6)["value"] is None
+
+    decreasing = solve_continuous(lambda x: 10 - x, 0.0, 10.0, target=4.0, tolerance=1e-6, prefer="max")
+    assert decreasing["value"] == pytest.approx(6.0, abs=1e-6)
+
+
+def test_solve_integer_and_years():
+    assert solve_integer({0: 5.0, 1: 3.0, 2: 1.0}, target=2.0, prefer="max")["value"] == 1
+    # the guesses are off by one; the exact runs decide
+    exact = {y: float(y) for y in range(1, 11)}
+    guesses = {y: y + 1.0 for y in range(1, 11)}
+    result = solve_years(guesses, exact.__getitem__, target=6.0, lo=1, hi=10)
+    assert result["value"] == 6
+    assert [5, 5.0] in result["trace"]  # the horizon below was checked too
+
+
+def test_spec_validation():
+    params = {"rent_pc_baseline": 0.3}
+    assert GoalSpec.from_request({"parameter": "savings_rate", "target": 1}, params).bounds == (0.0, 0.7)
+    for solve in (
+        {"parameter": "salary", "target": 1},
+        {"parameter": "years", "target": "a lot"},
+        {"parameter": "years", "target": 1, "bounds": [0, 500]},
+        {"parameter": "savings_rate", "target": 1, "metric": "p200"},
+    ):
+        with pytest.raises(ValueError):
+            GoalSpec.from_request(solve, params)
+
+
+def test_income_paths_reproject_downstream_changes(app, run_body):
+    with app.app_context():
+        params, tax_brackets, home_values = get_params(run_body)
+    shocks = ShockSampler(np.random.default_rng(42), 25).draw(200)
+    changed = {**params, "savings_rate": 0.35, "num_children": 3, "salary_to_buy_house": 150_000.0}
+    full = simulate_networths(changed, tax_brackets, home_values, 200, 25, shocks=shocks)
+
+    income = IncomePaths.from_params(params, tax_brackets, shocks)
+    np.testing.assert_array_equal(income.networths(changed, home_values), full)
+
+
+def test_savings_rate_answer_reproduces(app, client, run_body):
+    body = {**run_body, "years": 30, "num_samples": 300}
+    result = client.post(
+        "/api/v1/simulation/goal",
+        json={**body, "solve": {"parameter": "savings_rate", "metric": "mean", "target": 2_000_000}},
+    ).get_json()["result"]
+    assert result["feasible"] and result["achieved"] >= 2_000_000
+
+    with app.app_context():
+        params, tax_brackets, home_values = get_params(body)
+    shocks = ShockSampler(np.random.default_rng(42), 30).draw(300)
+    networths = simulate_networths(
+        {**params, "savings_rate": result["value"]}, tax_brackets, home_values, 300, 30, shocks=shocks
+    )
+    assert networths.mean() == pytest.approx(result["achieved"], rel=1e-9)
+
+
+def test_years_answer_reproduces_with_simulation_run(client, run_body):
+    body = {**run_body, "num_samples": 300}
+    result = client.post(
+        "/api/v1/simulation/goal",
+        json={**body, "solve": {"parameter": "years", "metric": "median", "target": 1_000_000}},
+    ).get_json()["result"]
+    years = result["value"]
+    assert years is not None
+
+    def median(horizon):
+        summary = client.post(
+            "/api/v1/simulation/run", json={**body, "years": horizon, "percentiles": [50]}
+        ).get_json()["summary"]
+        return summary["percentiles"]["p50"][-1]
+
+    assert median(years) == pytest.approx(result["achieved"], rel=1e-9)
+    assert median(years - 1) < 1_000_000
@@ -0,0 +1,79 @@
+import numpy as np
+import pytest
+
+from app.api.routes.simulations import get_params, simulate_core
+from app.services.monte_carlo import NetworthBase, simulate_networth_base, simulate_networths
+from app.services.param_resolver import ResolvedParams, default_resolver
+from app.services.sampling import ShockSampler
+from app.services.simulation_cache import SimulationCache
+
+
+@pytest.fixture
+def resolved(reference, run_body):
+    return default_resolver.resolve_request(run_body, reference).as_dict(years=20)
+
+
+def test_cached_stage_matches_a_full_run(app, run_body):
+    num_samples, years = 200, 25
+    with app.app_context():
+        params, tax_brackets, home_values = get_params(run_body)
+    shocks = ShockSampler(np.random.default_rng(42), years).draw(num_samples)
+    base = simulate_networth_base(params, tax_brackets, home_values, num_samples, years, shocks=shocks)
+
+    for downstream in ({}, {"savings_rate": 0.35}, {"num_children": 3}, {"annual_child_cost": 5000.0}):
+        changed = {**params, **downstream}
+        np.testing.assert_allclose(
+            base.networths(changed),
+            simulate_networths(changed, tax_brackets, home_values, num_samples, years, shocks=shocks),
+            rtol=1e-9,
+        )
+
+
+def test_sliders_recompute_only_the_cash_flow_stage(app, client, reference, resolved):
+    stage_cache = app.simulation_stage_cache
+    client.post("/api/v1/simulation/sliders", json=resolved)
+    misses = stage_cache.stats()["misses"]
+
+    changed = {**resolved, "savings_rate": 0.3, "num_children": 2}
+    body = client.post("/api/v1/simulation/sliders", json=changed).get_json()
+    assert stage_cache.stats()["misses"] == misses
+
+    tax_brackets = reference.tax_tables.for_state(changed["location"])
+    expected = simulate_core(body["params"], tax_brackets, reference.home_values, 100, 20)
+    assert body["summary"] == pytest.approx(expected, rel=1e-9)
+
+
+def test_stage_cache_evicts_by_bytes():
+    cache = SimulationCache(copy_values=False, max_bytes=4000)
+
+    def base(n):
+        return NetworthBase(np.zeros(n), np.zeros(n), years=10)
+
+    cache.put("a", base(100))  # 1600 bytes
+    cache.put("b", base(100))
+    cache.put("c", base(100))  # 4800 bytes in total: evicts a
+    assert cache.get("a") is None
+    assert cache.get("b") is not None
+    assert cache.stats()["bytes"] == 3200
+
+    cache.put("huge", base(1000))  # larger than the whole budget: not stored
+    assert cache.get("huge") is None
+    assert cache.stats()["size"] == 2
+
+
+@pytest.mark.parametrize("savings_rate", [-0.1, 0.71, 0.9])
+def test_savings_rate_must_leave_spending_non_negative(reference, resolved, savings_rate):
+    with pytest.raises(ValueError, match="savings_rate"):
+        ResolvedParams.from_dict({**resolved, "savings_rate": savings_rate}, reference)
+
+
+def test_savings_rate_bound_follows_rent_share(reference, resolved):
+    params = ResolvedParams.from_dict({**resolved, "rent_pc_baseline": 0.2, "savings_rate": 0.8}, reference)
+    assert params.savings_rate == 0.8
+    with pytest.raises(ValueError, match="rent_pc_baseline"):
+        ResolvedParams.from_dict({**resolved, "rent_pc_baseline": 1.5}, reference)
+
+
+def test_sliders_reject_out_of_range_savings(client, resolved):
+    response = client.post("/api/v1/simulation/sliders", json={**resolved, "savings_rate": 0.9})
+    assert response.status_code == 400
@@ -0,0 +1,91 @@
+import io
+import json
+import os
+
+import numpy as np
+import pytest
+
+from app.services.lifecycle import amortization_schedules, project_profiles, read_profiles
+from conftest import APP_DIR
+
+LIFECYCLE_URL = "/api/v1/simulation/lifecycle"
+PROFILES_CSV = os.path.join(APP_DIR, "Washington__D_C__Software_Engineer_Use_Cases__5_rows_ (1).csv")
+
+
+def _amortize_by_loop(balance, apr, term_years, years):
+    """Year-by-year amortization: interest accrues, then the fixed payment is made."""
+    if balance <= 0 or term_years <= 0:
+        return [0.0] * years, [0.0] * years
+    if apr > 0:
+        payment = balance * apr / (1 - (1 + apr) ** -term_years)
+    else:
+        payment = balance / term_years
+    payments, balances = [], []
+    for year in range(1, years + 1):
+        if year <= term_years:
+            balance = balance * (1 + apr) - payment
+            payments.append(payment)
+        else:
+            payments.append(0.0)
+        balances.append(max(balance, 0.0) if year < term_years else 0.0)
+    return payments, balances
+
+
+@pytest.mark.parametrize(
+    "balance, apr, term_years",
+    [(18_000.0, 0.045, 9), (350_000.0, 0.065, 30), (12_000.0, 0.0, 5), (0.0, 0.05, 10), (5_000.0, 0.07, 0)],
+)
+def test_closed_form_amortization_matches_a_loop(balance, apr, term_years):
+    years = 35
+    payments, balances = amortization_schedules(balance, apr, term_years, years)
+    expected_payments, expected_balances = _amortize_by_loop(balance, apr, term_years, years)
+    np.testing.assert_allclose(payments, expected_payments, rtol=1e-9, atol=1e-6)
+    np.testing.assert_allclose(balances, expected_balances, rtol=1e-9, atol=1e-6)
+
+
+def test_amortization_is_vectorized_over_loans():
+    balance = np.array([[18_000.0, 0.0], [350_000.0, 9_000.0]])
+    apr = np.array([[0.045, 0.0], [0.065, 0.0]])
+    term = np.array([[9, 0], [30, 3]])
+    payments, balances = amortization_schedules(balance, apr, term, 12)
+    assert payments.shape == balances.shape == (2, 2, 12)
+    for index in np.ndindex(balance.shape):
+        expected_payments, expected_balances = _amortize_by_loop(balance[index], apr[index], term[index], 12)
+        np.testing.assert_allclose(payments[index], expected_payments, rtol=1e-9, atol=1e-6)
+        np.testing.assert_allclose(balances[index], expected_balances, rtol=1e-9, atol=1e-6)
+
+
+def test_results_do_not_depend_on_the_other_profiles():
+    records = read_profiles(PROFILES_CSV)
+    together = project_profiles(records, num_samples=200)
+    alone = [project_profiles([record], num_samples=200)[0] for record in records]
+    for a, b in zip(together, alone):
+        assert a["net_worth"] == pytest.approx(b["net_worth"], rel=1e-12)
+        assert a["mean_net_worth_by_age"] == pytest.approx(b["mean_net_worth_by_age"], rel=1e-12)
+
+
+def test_csv_upload_matches_the_json_body(client):
+    with open(PROFILES_CSV, "rb") as f:
+        upload = client.post(
+            LIFECYCLE_URL,
+            data={"file": (io.BytesIO(f.read()), "profiles.csv"), "num_samples": "200"},
+            content_type="multipart/form-data",
+        )
+    assert upload.status_code == 200
+    uploaded = upload.get_json()
+    assert uploaded["num_samples"] == 200
+    assert uploaded["count"] == len(read_profiles(PROFILES_CSV))
+    assert all("error" not in result for result in uploaded["results"])
+    assert [r["profile_id"] for r in uploaded["results"]][:2] == ["DC_SE_01", "DC_SE_02"]
+
+    records = json.loads(json.dumps(read_profiles(PROFILES_CSV)))
+    posted = client.post(LIFECYCLE_URL, json={"profiles": records, "num_samples": 200}).get_json()
+    assert posted["results"] == uploaded["results"]
+
+
+def test_invalid_profiles_are_reported_in_place(client):
+    records = read_profiles(PROFILES_CSV)[:2]
+    records[1] = {**records[1], "retire_age": 20}
+    results = client.post(LIFECYCLE_URL, json={"profiles": records, "num_samples": 50}).get_json()["results"]
+    assert "net_worth" in results[0]
+    assert results[1]["profile_id"] == "DC_SE_02" and "error" in results[1]
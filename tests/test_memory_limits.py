@@ -0,0 +1,66 @@
+import tracemalloc
+
+import numpy as np
+import pytest
+
+from app.api.routes.simulations import get_params, simulate_core
+from app.services.lifecycle import profile_chunk_size
+from app.services.monte_carlo import SimulationOptions, path_bytes, samples_per_block
+from app.services.scenario_comparison import compare_scenarios
+from app.services.tax_tables import TaxTables
+
+SALARIES = [0.0, 9_999.0, 45_000.0, 85_000.0, 250_000.0, 1_000_000.0]
+
+
+@pytest.fixture
+def engine_inputs(app, run_body):
+    with app.app_context():
+        return get_params(run_body)
+
+
+def test_float32_salaries_are_taxed_in_float32(locations_df):
+    brackets = TaxTables.from_locations_df(locations_df).for_state("California")
+    salaries = np.array(SALARIES, dtype=np.float32)
+    tax = brackets.tax(salaries)
+    assert tax.dtype == np.float32
+    np.testing.assert_allclose(tax, brackets.tax(salaries.astype(float)), rtol=1e-5)
+
+
+def test_float32_runs_stay_close_to_float64(engine_inputs):
+    float64 = simulate_core(*engine_inputs, num_samples=2000, years=40)
+    float32 = simulate_core(*engine_inputs, num_samples=2000, years=40, options=SimulationOptions(precision="float32"))
+    assert float32["mean"] == pytest.approx(float64["mean"], rel=1e-6)
+    assert float32["stdev"] == pytest.approx(float64["stdev"], rel=1e-6)
+
+
+def test_oversized_runs_are_blocked_to_the_ceiling(engine_inputs):
+    num_samples, years = 20_000, 30
+    limit_mb = 4.0
+    assert path_bytes(num_samples, years) > limit_mb * 2**20
+
+    one_pass = simulate_core(*engine_inputs, num_samples=num_samples, years=years, memory_limit_mb=1024)
+    tracemalloc.start()
+    try:
+        blocked = simulate_core(*engine_inputs, num_samples=num_samples, years=years, memory_limit_mb=limit_mb)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    assert blocked == pytest.approx(one_pass, rel=1e-9)
+    assert peak < 1.25 * limit_mb * 2**20  # the path matrices plus a little bookkeeping
+
+
+def test_runs_that_cannot_fit_are_rejected(engine_inputs):
+    with pytest.raises(ValueError, match="memory limit"):
+        samples_per_block(60, memory_limit_mb=path_bytes(1, 60) / 2**20 / 2)
+    with pytest.raises(ValueError, match="memory limit"):
+        simulate_core(*engine_inputs, num_samples=10, years=60, memory_limit_mb=0.001)
+
+
+def test_compare_and_lifecycle_respect_the_ceiling(engine_inputs):
+    params, tax_brackets, home_values = engine_inputs
+    with pytest.raises(ValueError):
+        compare_scenarios([params] * 3, [tax_brackets] * 3, home_values, num_samples=200_000, years=20,
+                          memory_limit_mb=4)
+    with pytest.raises(ValueError):
+        profile_chunk_size(num_samples=1_000_000, horizon=60, memory_limit_mb=16)
+    assert profile_chunk_size(num_samples=1000, horizon=40, memory_limit_mb=16) >= 1
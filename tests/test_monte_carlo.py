@@ -0,0 +1,23 @@
+import pytest
+
+from baseline import simulate_core as baseline_simulate_core
+from app.api.routes.simulations import get_params, simulate_core
+
+
+@pytest.mark.parametrize(
+    "body",
+    [
+        {"career_id": "15-1250", "location": "California", "num_children": 2, "spending": "eager"},
+        {"career_id": "15-1250", "location": "Texas", "num_children": 0, "spending": "conservative"},
+    ],
+)
+def test_vectorized_engine_matches_scalar_baseline(app, locations_df, home_and_rental_table, body):
+    num_samples, years = 20, 15
+    with app.app_context():
+        params, tax_brackets, home_values = get_params({**body, "years": years})
+        summary = simulate_core(params, tax_brackets, home_values, num_samples=num_samples, years=years)
+
+    state_df = locations_df[locations_df["State"] == body["location"]]
+    expected = baseline_simulate_core(params, state_df, home_and_rental_table, num_samples, years)
+    assert summary["mean"] == pytest.approx(expected["mean"], rel=1e-9)
+    assert summary["stdev"] == pytest.approx(expected["stdev"], rel=1e-9)
@@ -0,0 +1,111 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.services import networth_regression
+from app.services.networth_regression import (
+    SURROGATE_FILE,
+    TRAINING_DATA_FILE,
+    NetworthSurrogate,
+    get_surrogate,
+)
+
+
+@pytest.fixture(scope="module")
+def training_df():
+    return pd.read_csv(TRAINING_DATA_FILE)
+
+
+@pytest.fixture(scope="module")
+def model(training_df):
+    return NetworthSurrogate.train(training_df)
+
+
+def _row_params(row) -> dict:
+    return {
+        "starting_salary": row.starting_salary,
+        "salary_growth_mean": row.salary_growth_mean,
+        "salary_growth_sd": row.salary_growth_sd,
+        "home_growth_rate": row.home_growth_rate,
+        "salary_to_buy_house": row.salary_to_buy_house,
+        "annual_child_cost": row.annual_child_cost,
+        "num_children": row.num_children,
+        "spending_type": row.spending,
+        "savings_rate": row.savings_rate,
+        "hv_to_salary_ratio": row.hv_to_salary_ratio,
+    }
+
+
+@pytest.fixture
+def fresh_surrogate(monkeypatch):
+    """get_surrogate() loads again on its next call."""
+    monkeypatch.setattr(networth_regression, "_surrogate", None)
+    monkeypatch.setattr(networth_regression, "_surrogate_loaded", False)
+
+
+def test_training_rows_are_covered(model, training_df):
+    rows = list(training_df.head(50).itertuples())
+    assert all(model.out_of_domain(_row_params(r), r.years, r.effective_tax_rate_starting) is None for r in rows)
+
+
+def test_combinations_never_sampled_together_are_not_covered(model, training_df):
+    # the richest training career with the slowest growth and the largest shocks
+    # seen, over the longest horizon: each value is within its training range,
+    # the combination is far from every training row
+    richest = training_df.loc[training_df["starting_salary"].idxmax()]
+    params = {
+        **_row_params(richest),
+        "salary_growth_mean": training_df["salary_growth_mean"].min(),
+        "salary_growth_sd": training_df["salary_growth_sd"].max(),
+    }
+    years = int(training_df["years"].max())
+    assert model.out_of_domain(params, years, richest.effective_tax_rate_starting) == "coverage"
+
+
+def test_unseen_discrete_values_are_out_of_domain(model, training_df):
+    row = next(training_df.itertuples())
+    assert model.out_of_domain({**_row_params(row), "num_children": 9}, row.years, 0.05) == "num_children"
+    assert model.out_of_domain({**_row_params(row), "rent_pc_baseline": 0.4}, row.years, 0.05) == "rent_pc_baseline"
+
+
+def test_accuracy_gate(model, tmp_path, fresh_surrogate):
+    assert model.accuracy_failures() == []
+    assert model.serving_problem() is None
+
+    strict = NetworthSurrogate.from_dict(
+        {**model.to_dict(), "accuracy_thresholds": {"holdout_stdev_rel_error_median": 0.01}}
+    )
+    assert strict.accuracy_failures() == ["holdout_stdev_rel_error_median"]
+    strict.save(str(tmp_path / SURROGATE_FILE))
+    assert get_surrogate(str(tmp_path)) is None
+
+
+def test_saved_model_round_trips(model, tmp_path, fresh_surrogate):
+    model.save(str(tmp_path / SURROGATE_FILE))
+    loaded = get_surrogate(str(tmp_path))
+    assert loaded is not None
+    np.testing.assert_array_equal(loaded.mean_coef, model.mean_coef)
+    assert loaded.coverage["radius"] == model.coverage["radius"]
+    assert loaded.accuracy_thresholds == model.accuracy_thresholds
+
+
+def test_models_without_coverage_are_not_served(model):
+    blob = model.to_dict()
+    del blob["coverage"]
+    assert NetworthSurrogate.from_dict(blob).serving_problem() == "no coverage data"
+
+
+def test_sliders_fast_mode_only_takes_default_options(client, training_df, fresh_surrogate):
+    row = next(training_df.itertuples())
+    body = {
+        "career_id": row.career_id, "location": row.location, "num_children": row.num_children,
+        "spending": row.spending, "years": row.years,
+    }
+    params = client.post("/api/v1/simulation/run", json=body).get_json()["params"]
+
+    fast = client.post("/api/v1/simulation/sliders", json={**params, "mode": "fast"}).get_json()
+    assert fast["source"] == "surrogate"
+
+    for option in ({"percentiles": [50]}, {"sampling": "qmc"}, {"precision": "float32"}):
+        body = client.post("/api/v1/simulation/sliders", json={**params, "mode": "fast", **option}).get_json()
+        assert body["source"] == "monte_carlo"
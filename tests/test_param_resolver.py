@@ -0,0 +1,48 @@
+import dataclasses
+
+import pytest
+
+from app.services.param_resolver import ParameterResolver, ResolvedParams, default_resolver
+
+
+@pytest.fixture
+def resolved(reference, run_body):
+    return default_resolver.resolve_request(run_body, reference).as_dict(years=20)
+
+
+def test_from_dict_round_trips(reference, resolved):
+    assert ResolvedParams.from_dict(resolved, reference).as_dict(years=20) == resolved
+
+
+def test_unknown_location_is_an_error(reference, resolved):
+    with pytest.raises(ValueError):
+        ResolvedParams.from_dict({**resolved, "location": "Atlantis"}, reference)
+
+
+def test_resolve_matches_the_reference_tables(reference, resolved, run_body):
+    career = reference.careers[run_body["career_id"]]
+    state = reference.states[run_body["location"]]
+    assert resolved["starting_salary"] == career.starting_salary * state.income_ratio
+    assert resolved["annual_child_cost"] == state.annual_child_cost
+    assert (resolved["savings_rate"], resolved["hv_to_salary_ratio"]) == (0.2, 3)
+
+
+def test_resolutions_are_memoized_per_snapshot(reference, run_body):
+    resolver = ParameterResolver(max_entries=2)
+    first = resolver.resolve_request(run_body, reference)
+    assert resolver.resolve_request(dict(run_body), reference) is first
+    assert resolver.stats()["hits"] == 1
+
+    resolver.resolve_request({**run_body, "num_children": 2}, reference)
+    resolver.resolve_request({**run_body, "num_children": 3}, reference)
+    assert resolver.stats()["size"] == 2
+    assert resolver.resolve_request(run_body, reference) is not first  # evicted, resolved again
+    assert resolver.resolve_request(run_body, dataclasses.replace(reference, checksum="other")) is not first
+
+
+@pytest.mark.parametrize(
+    "change", [{"career_id": "00-0000"}, {"location": "Atlantis"}, {"num_children": -1}, {"spending": "lavish"}]
+)
+def test_bad_requests_are_errors(reference, run_body, change):
+    with pytest.raises(ValueError):
+        ParameterResolver().resolve_request({**run_body, **change}, reference)
@@ -0,0 +1,78 @@
+import pytest
+
+from app import Base
+from app.models import FinStatements, User
+
+USER_ID = 1
+
+# a $20,000 car loan at 6% over 5 years pays this much every year
+CAR_PAYMENT = 20_000 * 0.06 * 1.06**5 / (1.06**5 - 1)
+
+
+@pytest.fixture
+def portfolio(app):
+    tables = [User.__table__, FinStatements.__table__]
+    Base.metadata.create_all(app.engine, tables=tables)
+    session = app.session
+    session.add(User(id=USER_ID, email="student@example.com", role="student", trophies=0))
+    session.add_all([
+        FinStatements(id=1, user_id=USER_ID, name="Brokerage", valuation=50_000, growth=0.05, liab_status=False),
+        FinStatements(id=2, user_id=USER_ID, name="Car loan", valuation=20_000, growth=0.06, term=5, liab_status=True),
+        FinStatements(id=3, user_id=USER_ID, name="Credit card", valuation=3_000, growth=0.2, liab_status=True),
+    ])
+    session.commit()
+    yield
+    session.remove()
+    Base.metadata.drop_all(app.engine, tables=tables)
+
+
+def _project(client, body, user_id=USER_ID):
+    return client.post(f"/api/v1/portfolios/{user_id}/projection", json=body)
+
+
+def test_shift_matches_the_hand_computed_schedules(client, portfolio, run_body):
+    body = {**run_body, "years": 10}
+    response = _project(client, body)
+    assert response.status_code == 200
+    projection = response.get_json()
+
+    statements = projection["statements"]
+    assert statements["assets"][0] == pytest.approx(52_500)
+    assert statements["liabilities"][0] == pytest.approx(20_000 * 1.06 - CAR_PAYMENT + 3_000)
+    assert statements["payments"][0] == pytest.approx(CAR_PAYMENT + 600)
+    # the car is paid off after year 5; the card is interest-only
+    assert statements["liabilities"][5:] == pytest.approx([3_000] * 5)
+    assert statements["payments"][5:] == pytest.approx([600] * 5)
+
+    final_shift = 50_000 * 1.05**10 - 3_000 - 5 * CAR_PAYMENT - 10 * 600
+    alone = client.post("/api/v1/simulation/run", json={**body, "percentiles": True}).get_json()["summary"]
+    assert projection["net_worth"]["mean"] == pytest.approx(alone["mean"] + final_shift, rel=1e-12)
+    assert projection["net_worth"]["stdev"] == pytest.approx(alone["stdev"], rel=1e-12)
+    assert projection["net_worth"]["percentiles"]["p50"][-1] == pytest.approx(
+        alone["percentiles"]["p50"][-1] + final_shift, rel=1e-12
+    )
+
+    items = {item["name"]: item for item in projection["items"]}
+    assert items["Car loan"]["final_value"] == 0
+    assert items["Car loan"]["annual_payment"] == pytest.approx(CAR_PAYMENT)
+    assert items["Credit card"]["kind"] == "liability"
+
+
+def test_single_percentile(client, portfolio, run_body):
+    response = _project(client, {**run_body, "percentiles": [50]})
+    assert response.status_code == 200
+    bands = response.get_json()["net_worth"]["percentiles"]
+    assert list(bands) == ["p50"]
+    assert len(bands["p50"]) == run_body["years"]
+
+
+def test_unknown_user(client, portfolio, run_body):
+    response = _project(client, run_body, user_id=999)
+    assert response.status_code == 404
+
+
+@pytest.mark.parametrize("change", [{"years": 0}, {"num_samples": 0}, {"num_samples": -5}])
+def test_bad_run_size(client, portfolio, run_body, change):
+    response = _project(client, {**run_body, **change})
+    assert response.status_code == 400
+    assert response.get_json()["error"] == "years and num_samples must be positive"
@@ -0,0 +1,62 @@
+from statistics import NormalDist
+
+import numpy as np
+import pytest
+
+from app.api.routes.simulations import get_params
+from app.services.monte_carlo import simulate_networths
+from app.services.sampling import SAMPLING_MODES, ShockSampler, inverse_normal_cdf
+
+
+def test_inverse_normal_cdf_matches_the_standard_library():
+    u = np.array([1e-6, 0.001, 0.02, 0.0243, 0.1, 0.5, 0.75, 0.975, 0.9999])
+    expected = [NormalDist().inv_cdf(p) for p in u]
+    np.testing.assert_allclose(inverse_normal_cdf(u), expected, rtol=1e-8)
+
+
+@pytest.mark.parametrize("mode", SAMPLING_MODES)
+def test_blocked_draws_equal_one_draw(mode):
+    years, blocks = 6, [3, 5, 1, 0, 7]  # odd sizes leave an antithetic partner pending
+    sampler = ShockSampler(np.random.default_rng(7), years, mode)
+    blocked = np.concatenate([sampler.draw(n) for n in blocks])
+    whole = ShockSampler(np.random.default_rng(7), years, mode).draw(sum(blocks))
+    np.testing.assert_array_equal(blocked, whole)
+
+
+def test_antithetic_pairs_survive_odd_blocks():
+    sampler = ShockSampler(np.random.default_rng(3), 4, "antithetic")
+    shocks = np.concatenate([sampler.draw(n) for n in (1, 3, 3, 1)])
+    np.testing.assert_array_equal(shocks[0::2], -shocks[1::2])
+
+
+def test_qmc_points_are_standard_normal():
+    shocks = ShockSampler(np.random.default_rng(0), 5, "qmc").draw(4096)
+    np.testing.assert_allclose(shocks.mean(axis=0), 0, atol=0.01)
+    np.testing.assert_allclose(shocks.std(axis=0), 1, atol=0.02)
+
+
+def test_variance_reduction_across_seeds(app, run_body):
+    num_samples, years, seeds = 128, 20, range(30)
+    with app.app_context():
+        params, tax_brackets, home_values = get_params(run_body)
+
+    def spread(mode):
+        means = [
+            np.mean(
+                simulate_networths(
+                    params, tax_brackets, home_values, num_samples, years,
+                    shocks=ShockSampler(np.random.default_rng(seed), years, mode).draw(num_samples),
+                )
+            )
+            for seed in seeds
+        ]
+        return np.std(means) / abs(np.mean(means))
+
+    pseudo = spread("pseudo")
+    assert spread("antithetic") < 0.5 * pseudo
+    assert spread("qmc") < 0.5 * pseudo
+
+
+def test_unknown_mode_is_rejected():
+    with pytest.raises(ValueError):
+        ShockSampler(np.random.default_rng(0), 3, "sobol")
@@ -0,0 +1,84 @@
+import numpy as np
+import pytest
+
+from app.api.routes.simulations import get_params, simulate_core
+from app.services.scenario_comparison import MAX_COMPARE_VARIANTS, Z_95, compare_scenarios, paired_difference
+
+COMPARE_URL = "/api/v1/simulation/compare"
+
+
+def test_paired_difference():
+    rng = np.random.default_rng(0)
+    base = rng.normal(100.0, 20.0, size=400)
+    variant = base + 5.0 + rng.normal(0.0, 1.0, size=400)
+
+    difference = paired_difference(base, variant)
+    diff = variant - base
+    standard_error = np.std(diff, ddof=1) / np.sqrt(len(diff))
+    assert difference["mean"] == pytest.approx(np.mean(diff))
+    assert difference["stdev"] == pytest.approx(np.std(diff))
+    assert difference["standard_error"] == pytest.approx(standard_error)
+    half_width = Z_95 * standard_error
+    assert difference["ci95"] == pytest.approx([np.mean(diff) - half_width, np.mean(diff) + half_width])
+    # the shared noise cancels: pairing is far tighter than two independent runs
+    assert difference["standard_error"] < difference["independent_standard_error"] / 10
+
+
+def test_identical_scenarios_differ_by_nothing():
+    values = np.arange(10.0)
+    difference = paired_difference(values, values)
+    assert difference["mean"] == 0.0
+    assert difference["standard_error"] == 0.0
+    assert difference["ci95"] == [0.0, 0.0]
+
+
+def test_base_summary_matches_simulate_core(app, run_body):
+    with app.app_context():
+        base = get_params(run_body)
+        variant = get_params({**run_body, "spending": "conservative"})
+    comparison = compare_scenarios([base[0], variant[0]], [base[1], variant[1]], base[2], num_samples=200, years=20)
+    assert comparison["summaries"][0] == pytest.approx(simulate_core(*base, num_samples=200, years=20), rel=1e-12)
+    assert comparison["summaries"][1] == pytest.approx(simulate_core(*variant, num_samples=200, years=20), rel=1e-12)
+
+
+def test_compare_endpoint(client, run_body):
+    response = client.post(COMPARE_URL, json={
+        "base": run_body,
+        "variants": [{"label": "same"}, {"label": "two kids", "num_children": 2}],
+        "num_samples": 200,
+    })
+    assert response.status_code == 200
+    body = response.get_json()
+    assert body["num_samples"] == 200 and body["years"] == run_body["years"]
+    assert [v["label"] for v in body["variants"]] == ["same", "two kids"]
+
+    same, kids = body["variants"]
+    assert same["difference"]["mean"] == 0.0
+    # children are a fixed yearly outflow: the paired difference is exact
+    extra_children = 2 - run_body["num_children"]
+    child_cost = body["base"]["params"]["annual_child_cost"] * extra_children * run_body["years"]
+    assert kids["difference"]["mean"] == pytest.approx(-child_cost)
+    assert kids["difference"]["standard_error"] == pytest.approx(0.0, abs=1e-6)
+
+
+@pytest.mark.parametrize("field", [{"years": 30}, {"num_samples": 500}, {"sampling": "qmc"}, {"percentiles": True}])
+def test_variants_cannot_change_shared_fields(client, run_body, field):
+    response = client.post(COMPARE_URL, json={"base": run_body, "variants": [{"label": "x", **field}]})
+    assert response.status_code == 400
+    assert next(iter(field)) in response.get_json()["error"]
+
+
+@pytest.mark.parametrize(
+    "body",
+    [
+        {"variants": [{}]},
+        {"base": {}, "variants": []},
+        {"base": {}, "variants": [{}] * (MAX_COMPARE_VARIANTS + 1)},
+        {"base": {}, "variants": [{}], "years": 0},
+        {"base": {}, "variants": [{"location": "Nowhere"}]},
+    ],
+)
+def test_invalid_comparisons_are_rejected(client, run_body, body):
+    if "base" in body:
+        body = {**body, "base": {**run_body, **body["base"]}}
+    assert client.post(COMPARE_URL, json=body).status_code == 400
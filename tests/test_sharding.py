@@ -0,0 +1,43 @@
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+
+from app.api.routes.simulations import get_params
+from app.services.monte_carlo import shard_sizes, simulate_sharded
+
+
+@pytest.fixture
+def engine_inputs(app, run_body):
+    with app.app_context():
+        return get_params(run_body)
+
+
+def _sharded(engine_inputs, **kwargs):
+    params, tax_brackets, home_values = engine_inputs
+    return simulate_sharded(params, tax_brackets, home_values, years=20, **kwargs)
+
+
+def test_shard_sizes_cover_every_sample():
+    assert shard_sizes(10, 4) == [3, 3, 2, 2]
+    assert shard_sizes(2, 4) == [1, 1, 0, 0]
+
+
+def test_pool_does_not_change_the_answer(engine_inputs):
+    serial = _sharded(engine_inputs, num_samples=2000, shards=4, percentiles=[10, 50, 90])
+    with ProcessPoolExecutor(max_workers=2) as pool:
+        pooled = _sharded(engine_inputs, num_samples=2000, shards=4, percentiles=[10, 50, 90], pool=pool)
+    assert pooled == serial
+
+
+def test_answer_depends_on_the_seed(engine_inputs):
+    first = _sharded(engine_inputs, num_samples=500, shards=2, seed=1)
+    second = _sharded(engine_inputs, num_samples=500, shards=2, seed=2)
+    assert first["mean"] != second["mean"]
+
+
+def test_more_shards_than_samples(engine_inputs):
+    summary = _sharded(engine_inputs, num_samples=3, shards=8, percentiles=[50])
+    # the five empty shards add nothing: the first three child streams are the same either way
+    assert summary == _sharded(engine_inputs, num_samples=3, shards=3, percentiles=[50])
+    assert summary["percentiles_exact"]
+    assert len(summary["percentiles"]["p50"]) == 20
@@ -0,0 +1,59 @@
+import numpy as np
+import pytest
+
+from app.services.simulation_cache import SimulationCache, make_cache_key
+
+
+def test_cache_key_is_canonical():
+    params = {"a": 1, "b": np.float64(2.5), "c": "x"}
+    reordered = {"c": "x", "b": 2.5, "a": 1}
+    assert make_cache_key(params, 100, 20) == make_cache_key(reordered, 100, 20)
+    assert make_cache_key(params, 100, 20) != make_cache_key(params, 101, 20)
+    assert make_cache_key(params, 100, 20) != make_cache_key(params, 100, 21)
+    assert make_cache_key(params, 100, 20, sampling="pseudo") != make_cache_key(params, 100, 20, sampling="qmc")
+
+
+def test_entries_expire_and_evict_least_recently_used():
+    now = [0.0]
+    cache = SimulationCache(max_entries=2, ttl_seconds=10, clock=lambda: now[0])
+    cache.put("a", {"mean": 1.0})
+    cache.put("b", {"mean": 2.0})
+    assert cache.get("a") == {"mean": 1.0}  # a is now the most recent
+    cache.put("c", {"mean": 3.0})
+    assert cache.get("b") is None
+    assert cache.stats()["evictions"] == 1
+
+    now[0] = 11.0
+    assert cache.get("a") is None
+    assert cache.get("c") is None
+
+
+def test_values_are_copied_in_and_out():
+    cache = SimulationCache()
+    summary = {"mean": 1.0}
+    cache.put("k", summary)
+    summary["mean"] = 2.0
+    cache.get("k")["mean"] = 3.0
+    assert cache.get("k") == {"mean": 1.0}
+
+
+def test_get_or_compute_computes_once():
+    cache = SimulationCache()
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return {"mean": 1.0}
+
+    assert cache.get_or_compute("k", compute) == cache.get_or_compute("k", compute)
+    assert len(calls) == 1
+
+
+def test_percentile_runs_do_not_share_plain_entries(client, run_body):
+    plain = client.post("/api/v1/simulation/run", json={**run_body, "num_samples": 50}).get_json()
+    banded = client.post(
+        "/api/v1/simulation/run", json={**run_body, "num_samples": 50, "percentiles": [10, 90]}
+    ).get_json()
+    assert "percentiles" not in plain["summary"]
+    assert list(banded["summary"]["percentiles"]) == ["p10", "p90"]
+    assert banded["summary"]["mean"] == pytest.approx(plain["summary"]["mean"], rel=1e-12)
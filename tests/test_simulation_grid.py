@@ -0,0 +1,108 @@
+import os
+import shutil
+import sys
+
+import pytest
+
+from app.api.routes.simulations import get_params, simulate_core
+from app.scripts import build_simulation_grid
+from app.services.monte_carlo import SimulationOptions
+from app.services.reference_data import REFERENCE_FILES, load_reference_data
+from app.services.simulation_grid import GRID_NUM_SAMPLES, SimulationGrid
+
+CAREERS = ["15-1250", "13-1010"]
+STATES = ["California", "Texas"]
+MIN_YEARS, MAX_YEARS = 10, 12
+
+
+@pytest.fixture(scope="module")
+def grid_dir(tmp_path_factory):
+    """A grid for a few careers and states, built by the script next to a copy of the reference CSVs."""
+    data_dir = tmp_path_factory.mktemp("grid")
+    for name in REFERENCE_FILES:
+        shutil.copy(os.path.join(build_simulation_grid.DATA_DIR, name), data_dir / name)
+
+    patch = pytest.MonkeyPatch()
+    patch.setattr(build_simulation_grid, "grid_axes", lambda reference: (CAREERS, STATES))
+    patch.setattr(sys, "argv", [
+        "build_simulation_grid", "--data-dir", str(data_dir), "--workers", "1",
+        "--min-years", str(MIN_YEARS), "--max-years", str(MAX_YEARS),
+    ])
+    try:
+        build_simulation_grid.main()
+    finally:
+        patch.undo()
+    return data_dir
+
+
+@pytest.fixture(scope="module")
+def grid(grid_dir):
+    return SimulationGrid.load(str(grid_dir))
+
+
+@pytest.fixture(scope="module")
+def grid_reference(grid_dir):
+    return load_reference_data(str(grid_dir))
+
+
+def _resolve(reference, **body):
+    return get_params({"career_id": CAREERS[0], "location": STATES[0], "num_children": 0, "spending": "eager",
+                       "years": MIN_YEARS, **body}, reference)
+
+
+@pytest.mark.parametrize("career_id", CAREERS)
+@pytest.mark.parametrize("location", STATES)
+@pytest.mark.parametrize("num_children", [0, 3])
+@pytest.mark.parametrize("spending", ["eager", "conservative"])
+@pytest.mark.parametrize("years", [MIN_YEARS, MAX_YEARS])
+def test_on_grid_lookups_match_the_engine(grid, grid_reference, career_id, location, num_children, spending, years):
+    params, tax_brackets, home_values = _resolve(
+        grid_reference, career_id=career_id, location=location, num_children=num_children,
+        spending=spending, years=years,
+    )
+    summary = grid.lookup(grid_reference, params, GRID_NUM_SAMPLES, years, SimulationOptions())
+    expected = simulate_core(params, tax_brackets, home_values, GRID_NUM_SAMPLES, years)
+    assert summary == pytest.approx(expected, rel=1e-12)
+
+
+def test_off_grid_requests_are_not_answered(grid, grid_reference):
+    params, _, _ = _resolve(grid_reference)
+    assert grid.lookup(grid_reference, params, GRID_NUM_SAMPLES, MIN_YEARS) is not None
+
+    assert grid.lookup(grid_reference, params, GRID_NUM_SAMPLES + 1, MIN_YEARS) is None
+    assert grid.lookup(grid_reference, params, GRID_NUM_SAMPLES, MAX_YEARS + 1) is None
+    assert grid.lookup(grid_reference, {**params, "num_children": 4}, GRID_NUM_SAMPLES, MIN_YEARS) is None
+    assert grid.lookup(grid_reference, {**params, "location": "New York"}, GRID_NUM_SAMPLES, MIN_YEARS) is None
+    for options in ({"percentiles": True}, {"sampling": "qmc"}, {"precision": "float32"}, {"rel_tol": 0.1}):
+        options = SimulationOptions.from_request(options)
+        assert grid.lookup(grid_reference, params, GRID_NUM_SAMPLES, MIN_YEARS, options) is None
+
+
+def test_stale_grids_are_not_served(grid, grid_dir, grid_reference, tmp_path):
+    params, _, _ = _resolve(grid_reference)
+    for name in REFERENCE_FILES:
+        shutil.copy(grid_dir / name, tmp_path / name)
+    with open(tmp_path / REFERENCE_FILES[0], "a", encoding="utf-8") as f:
+        f.write("\n")
+    changed = load_reference_data(str(tmp_path))
+    assert grid.lookup(changed, params, GRID_NUM_SAMPLES, MIN_YEARS) is None
+
+
+def test_run_endpoint_serves_from_the_grid(app, client, grid, monkeypatch, run_body):
+    answers = []
+    lookup = grid.lookup
+
+    def recording_lookup(*args, **kwargs):
+        answers.append(lookup(*args, **kwargs))
+        return answers[-1]
+
+    monkeypatch.setattr(app, "simulation_grid", grid)
+    monkeypatch.setattr(grid, "is_fresh", lambda reference: True)
+    monkeypatch.setattr(grid, "lookup", recording_lookup)
+    body = {**run_body, "career_id": CAREERS[0], "location": STATES[0], "years": MIN_YEARS}
+    served = client.post("/api/v1/simulation/run", json=body).get_json()
+    assert answers and answers[-1] == served["summary"]
+
+    monkeypatch.setattr(app, "simulation_grid", None)
+    simulated = client.post("/api/v1/simulation/run", json=body).get_json()
+    assert served["summary"] == pytest.approx(simulated["summary"], rel=1e-12)
@@ -0,0 +1,63 @@
+import time
+
+import pytest
+
+from app.workers import simulation_tasks
+from app.workers.simulation_tasks import CeleryJobExecutor, LocalJobExecutor
+
+
+def _poll(client, status_url, timeout=30.0):
+    deadline = time.monotonic() + timeout
+    while True:
+        body = client.get(status_url).get_json()
+        if body["status"] in ("succeeded", "failed") or time.monotonic() > deadline:
+            return body
+        time.sleep(0.05)
+
+
+@pytest.fixture
+def local_jobs(app, monkeypatch):
+    monkeypatch.setattr(app, "simulation_jobs", LocalJobExecutor(max_workers=1))
+
+
+@pytest.fixture
+def eager_celery_jobs(app, monkeypatch):
+    conf = simulation_tasks.celery_app.conf
+    monkeypatch.setattr(conf, "task_always_eager", True)
+    monkeypatch.setattr(conf, "result_backend", "cache+memory://")
+    monkeypatch.setattr(app, "simulation_jobs", CeleryJobExecutor())
+    # the backend is built lazily from the conf; drop any built before the patch
+    monkeypatch.delattr(simulation_tasks.celery_app._local, "backend", raising=False)
+
+
+@pytest.mark.parametrize("executor", ["local_jobs", "eager_celery_jobs"])
+def test_job_runs_to_the_synchronous_result(request, executor, client, run_body):
+    request.getfixturevalue(executor)
+    body = {**run_body, "num_samples": 50}
+
+    response = client.post("/api/v1/simulation/jobs", json=body)
+    assert response.status_code == 202
+    submitted = response.get_json()
+    assert submitted["status"] == "pending"
+
+    job = _poll(client, submitted["status_url"])
+    assert job["status"] == "succeeded", job
+    expected = client.post("/api/v1/simulation/run", json=body).get_json()
+    # /simulation/run combines cached engine stages, so allow for rounding
+    assert job["result"]["summary"] == pytest.approx(expected["summary"], rel=1e-12)
+    assert job["result"]["years"] == expected["years"]
+
+
+def test_unknown_job_id_is_not_found(client, local_jobs):
+    response = client.get("/api/v1/simulation/jobs/not-a-job")
+    assert response.status_code == 404
+
+
+@pytest.mark.parametrize(
+    "change",
+    [{"sampling": "sobol-ish"}, {"percentiles": [150]}, {"precision": "float16"}, {"location": "Nowhere"}],
+)
+def test_invalid_jobs_are_rejected_before_queueing(client, local_jobs, run_body, change):
+    response = client.post("/api/v1/simulation/jobs", json={**run_body, **change})
+    assert response.status_code == 400
+    assert "error" in response.get_json()
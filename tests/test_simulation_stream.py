@@ -0,0 +1,70 @@
+import json
+
+import pytest
+
+STREAM_URL = "/api/v1/simulation/run/stream"
+
+
+def _events(response) -> list:
+    """[(event, data)] parsed from a Server-Sent Events body."""
+    events = []
+    for chunk in response.get_data(as_text=True).split("\n\n"):
+        if not chunk.strip():
+            continue
+        fields = dict(line.split(": ", 1) for line in chunk.splitlines())
+        events.append((fields["event"], json.loads(fields["data"])))
+    return events
+
+
+def test_progress_then_result(client, run_body):
+    response = client.post(STREAM_URL, json={**run_body, "num_samples": 4500})
+    assert response.status_code == 200
+    assert response.mimetype == "text/event-stream"
+    events = _events(response)
+
+    names = [name for name, _ in events]
+    assert names == ["progress", "progress", "progress", "result"]  # blocks of 2000, 2000 and 500
+    done = [body["samples_done"] for _, body in events[:-1]]
+    assert done == [2000, 4000, 4500]
+    assert all(body["samples_total"] == 4500 for _, body in events[:-1])
+    assert events[-2][1]["mean"] == events[-1][1]["summary"]["mean"]
+
+
+@pytest.mark.parametrize("options", [{}, {"percentiles": [25, 75]}, {"sampling": "antithetic"}, {"rel_tol": 0.05}])
+def test_result_equals_the_run_endpoint(app, client, run_body, options):
+    body = {**run_body, "num_samples": 300, **options}
+    streamed = _events(client.post(STREAM_URL, json=body))[-1]
+    assert streamed[0] == "result"
+
+    app.simulation_cache.clear()
+    run = client.post("/api/v1/simulation/run", json=body).get_json()
+    # plain runs combine cached engine stages, so the moments may differ by rounding
+    summary, expected = dict(streamed[1]["summary"]), dict(run["summary"])
+    for moment in ("mean", "stdev"):
+        assert summary.pop(moment) == pytest.approx(expected.pop(moment), rel=1e-12)
+    assert summary == expected
+    assert streamed[1]["params"] == run["params"]
+
+
+def test_cached_results_short_circuit_the_stream(app, client, run_body):
+    body = {**run_body, "num_samples": 300}
+    run = client.post("/api/v1/simulation/run", json=body).get_json()
+    hits = app.simulation_cache.stats()["hits"]
+
+    events = _events(client.post(STREAM_URL, json=body))
+    assert [name for name, _ in events] == ["result"]
+    assert events[0][1]["summary"] == run["summary"]
+    assert app.simulation_cache.stats()["hits"] == hits + 1
+
+
+def test_finished_streams_serve_later_runs(app, client, run_body):
+    body = {**run_body, "num_samples": 300}
+    _events(client.post(STREAM_URL, json=body))
+    hits = app.simulation_cache.stats()["hits"]
+    client.post("/api/v1/simulation/run", json=body)
+    assert app.simulation_cache.stats()["hits"] == hits + 1
+
+
+@pytest.mark.parametrize("change", [{"shards": 2}, {"deadline_ms": 100}, {"location": "Nowhere"}])
+def test_unsupported_requests_are_rejected(client, run_body, change):
+    assert client.post(STREAM_URL, json={**run_body, **change}).status_code == 400
@@ -0,0 +1,76 @@
+import numpy as np
+import pytest
+
+from app.api.routes.simulations import get_params
+from app.services.monte_carlo import simulate_bands, simulate_networths
+from app.services.sampling import ShockSampler
+from app.services.streaming_stats import DEFAULT_PERCENTILES, RunningMoments, YearlyQuantileSketch
+
+
+def _lognormal(n, years, seed=0):
+    return np.random.default_rng(seed).lognormal(12, 1, size=(years, n))
+
+
+def test_running_moments_match_one_pass():
+    values = np.random.default_rng(1).normal(size=1001)
+    moments = RunningMoments()
+    for block in np.array_split(values, 7):
+        moments.update(block)
+    assert moments.mean == pytest.approx(np.mean(values), rel=1e-12)
+    assert moments.stdev == pytest.approx(np.std(values), rel=1e-12)
+
+
+def test_sketch_is_exact_below_capacity():
+    values = _lognormal(1500, 3)
+    sketch = YearlyQuantileSketch(3, capacity=2000)
+    for block in np.array_split(values, 4, axis=1):
+        sketch.update(block)
+    assert sketch.exact
+    np.testing.assert_array_equal(
+        sketch.quantiles(DEFAULT_PERCENTILES), np.percentile(values, DEFAULT_PERCENTILES, axis=1)
+    )
+
+
+def test_sketch_error_is_bounded_above_capacity():
+    values = _lognormal(50_000, 2)
+    sketch = YearlyQuantileSketch(2)
+    for block in np.array_split(values, 25, axis=1):
+        sketch.update(block)
+    assert not sketch.exact
+    error = sketch.quantiles(DEFAULT_PERCENTILES) - np.percentile(values, DEFAULT_PERCENTILES, axis=1)
+    # in units of each year's standard deviation
+    assert np.max(np.abs(error) / values.std(axis=1)) < 0.01
+
+
+def test_merged_sketches_equal_one_sketch_over_the_union():
+    left, right = _lognormal(700, 4, seed=1), _lognormal(900, 4, seed=2)
+    merged = YearlyQuantileSketch(4).update(left).merge(YearlyQuantileSketch(4).update(right))
+    union = YearlyQuantileSketch(4).update(np.concatenate([left, right], axis=1))
+    np.testing.assert_array_equal(merged.quantiles(), union.quantiles())
+
+    # past capacity merging compresses, but stays as close as one sketch does
+    left, right = _lognormal(20_000, 2, seed=1), _lognormal(30_000, 2, seed=2)
+    both = np.concatenate([left, right], axis=1)
+    merged = YearlyQuantileSketch(2).update(left).merge(YearlyQuantileSketch(2).update(right))
+    assert not merged.exact
+    error = merged.quantiles() - np.percentile(both, DEFAULT_PERCENTILES, axis=1)
+    assert np.max(np.abs(error) / both.std(axis=1)) < 0.01
+    assert merged.minimum.tolist() == both.min(axis=1).tolist()
+    assert merged.maximum.tolist() == both.max(axis=1).tolist()
+
+
+def test_bands_match_the_full_path_matrix(app, run_body):
+    num_samples, years = 600, 20
+    with app.app_context():
+        params, tax_brackets, home_values = get_params(run_body)
+    summary = simulate_bands(
+        params, tax_brackets, home_values, num_samples, years, np.random.default_rng(42), block_size=128
+    )
+    shocks = ShockSampler(np.random.default_rng(42), years).draw(num_samples)
+    paths = simulate_networths(params, tax_brackets, home_values, num_samples, years, shocks=shocks, yearly=True)
+
+    assert summary["mean"] == pytest.approx(np.mean(paths[:, -1]), rel=1e-12)
+    assert summary["stdev"] == pytest.approx(np.std(paths[:, -1]), rel=1e-12)
+    assert summary["percentiles_exact"]
+    for p in DEFAULT_PERCENTILES:
+        np.testing.assert_allclose(summary["percentiles"][f"p{p:g}"], np.percentile(paths, p, axis=0), rtol=1e-12)
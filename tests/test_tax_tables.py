@@ -0,0 +1,19 @@
+import numpy as np
+import pytest
+
+from baseline import get_tax_value as baseline_get_tax_value
+from app.api.routes.simulations import get_tax_value
+from app.services.tax_tables import TaxTables
+
+SALARIES = [0.0, 9_999.0, 15_000.0, 85_000.0, 250_000.0, 1_500_000.0]
+
+
+@pytest.mark.parametrize("state", ["California", "Texas", "New York", None, "Nowhere"])
+def test_tax_tables_match_the_baseline(locations_df, state):
+    tables = TaxTables.from_locations_df(locations_df)
+    expected = [baseline_get_tax_value(locations_df, state, salary) for salary in SALARIES]
+
+    np.testing.assert_allclose(tables.tax(state, np.array(SALARIES)), expected, rtol=1e-12, atol=1e-9)
+    for salary, tax in zip(SALARIES, expected):
+        assert tables.tax(state, salary) == pytest.approx(tax, rel=1e-12, abs=1e-9)
+        assert get_tax_value(locations_df, state, salary) == pytest.approx(tax, rel=1e-12, abs=1e-9)
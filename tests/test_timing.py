@@ -0,0 +1,66 @@
+import time
+
+import pytest
+from flask import Flask
+
+from app.api.timing import init_server_timing, stage, stage_timings, timings_requested
+from app.config import Settings
+
+
+@pytest.fixture(scope="module")
+def timed_client():
+    """An app created with SERVER_TIMING on."""
+    from app import create_app
+
+    patch = pytest.MonkeyPatch()
+    patch.setattr("app.Settings", lambda: Settings(SERVER_TIMING=True))
+    try:
+        timed_app = create_app()
+    finally:
+        patch.undo()
+    return timed_app.test_client()
+
+
+def _stages(header: str) -> list:
+    return [entry.split(";")[0] for entry in header.split(", ")]
+
+
+def test_server_timing_lists_the_stages(timed_client, run_body):
+    response = timed_client.post("/api/v1/simulation/run", json=run_body)
+    assert response.status_code == 200
+    header = response.headers["Server-Timing"]
+    assert _stages(header) == ["params", "simulate", "serialize", "total"]
+    assert all(float(entry.split("dur=")[1]) >= 0 for entry in header.split(", "))
+
+
+def test_timings_are_in_the_body_only_when_requested(timed_client, run_body):
+    plain = timed_client.post("/api/v1/simulation/run", json=run_body).get_json()
+    assert "timings" not in plain
+
+    timed = timed_client.post("/api/v1/simulation/run", json={**run_body, "timings": True}).get_json()
+    # serialize is still running when the body is built
+    assert set(timed["timings"]) == {"params", "simulate"}
+
+
+def test_timing_off_adds_nothing(client, run_body):
+    response = client.post("/api/v1/simulation/run", json={**run_body, "timings": True})
+    assert "Server-Timing" not in response.headers
+    assert "timings" not in response.get_json()
+
+
+def test_repeated_stages_add_up():
+    app = Flask(__name__)
+    init_server_timing(app, True)
+
+    @app.route("/")
+    def index():
+        for _ in range(3):
+            with stage("simulate"):
+                time.sleep(0.002)
+        assert timings_requested({"timings": True})
+        return stage_timings()
+
+    response = app.test_client().get("/")
+    assert list(response.get_json()) == ["simulate"]
+    assert response.get_json()["simulate"] >= 6.0
+    assert _stages(response.headers["Server-Timing"]) == ["simulate", "total"]